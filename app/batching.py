@@ -0,0 +1,70 @@
+import asyncio
+from typing import Any, Callable, List, Optional, Tuple
+from app.inference import InferenceExecutor
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-item requests and scores them together.
+
+    A batch is flushed when it reaches `max_batch_size` items or when the
+    oldest pending item has waited `max_wait_ms`, whichever comes first.
+    When an executor is given, batches are scored on its thread pool.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        executor: Optional[InferenceExecutor] = None
+    ):
+        self.predict_batch = predict_batch
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000.0, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._run_batch(batch))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        items = [item for item, _ in batch]
+        try:
+            if self.executor is not None:
+                results = await self.executor.run(self.predict_batch, items)
+            else:
+                results = self.predict_batch(items)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class InMemoryCacheBackend:
+    """
+    Process-local stand-in for Redis with the same async get/set/delete surface.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, str]] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        if len(self._entries) >= self.max_entries and key not in self._entries:
+            # Drop the oldest insertion to stay bounded
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (time.monotonic() + ttl, value)
+
+    async def delete(self, *keys: str) -> None:
+        self.delete_sync(*keys)
+
+    def delete_sync(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+
+class RedisCacheBackend:
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+        self.url = url
+        self._client = redis.from_url(url, decode_responses=True)
+        self._sync_client = None
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        await self._client.set(key, value, ex=ttl)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._client.delete(*keys)
+
+    def delete_sync(self, *keys: str) -> None:
+        # Blocking client for the sync CRUD functions, created on first use
+        if not keys:
+            return
+        if self._sync_client is None:
+            import redis
+            self._sync_client = redis.Redis.from_url(self.url, decode_responses=True)
+        self._sync_client.delete(*keys)
+
+
+class _InflightLoad:
+    """
+    One loader call shared by concurrent misses on a key. An invalidation
+    detaches it from the key and marks it stale.
+    """
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.invalidated = False
+
+
+class ReadThroughCache:
+    """
+    JSON read-through cache with per-key single-flight loading.
+
+    Concurrent misses on the same key share one loader call. A load that
+    races with an invalidation is returned to the callers that joined it
+    before the invalidation, but it is not stored and later misses start a
+    fresh load, so stale rows never outlive the write that invalidated them.
+    """
+
+    def __init__(self, backend, prefix: str = "digitrust"):
+        self.backend = backend
+        self.prefix = prefix
+        self._inflight: Dict[str, _InflightLoad] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def key(self, *parts: Any) -> str:
+        return ":".join([self.prefix, *(str(part) for part in parts)])
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: int) -> Any:
+        try:
+            cached = await self.backend.get(key)
+        except Exception as e:
+            # A cache outage degrades to direct database reads
+            self.errors += 1
+            print(f"Cache read error for {key}: {e}")
+            cached = None
+
+        if cached is not None:
+            self.hits += 1
+            return json.loads(cached)
+        self.misses += 1
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(inflight.future)
+            except asyncio.CancelledError:
+                # The leading load was cancelled, not this caller: load again
+                if not inflight.future.cancelled():
+                    raise
+                return await self.get_or_load(key, loader, ttl)
+
+        future = asyncio.get_running_loop().create_future()
+        load = self._inflight[key] = _InflightLoad(future)
+        try:
+            value = await loader()
+            if not load.invalidated:
+                try:
+                    await self.backend.set(key, json.dumps(value), ttl)
+                except Exception as e:
+                    self.errors += 1
+                    print(f"Cache write error for {key}: {e}")
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            # A cancelled leader (CancelledError is not an Exception) must still release its waiters
+            if not future.done():
+                future.cancel()
+            # An invalidation may already have replaced this load with a newer one
+            if self._inflight.get(key) is load:
+                del self._inflight[key]
+
+    def _detach_inflight(self, keys) -> None:
+        # Loads already in flight read rows from before the write; keep them
+        # out of the cache and away from callers that arrive after it
+        for key in keys:
+            load = self._inflight.pop(key, None)
+            if load is not None:
+                load.invalidated = True
+
+    async def invalidate(self, *keys: str) -> None:
+        self._detach_inflight(keys)
+        try:
+            await self.backend.delete(*keys)
+        except Exception as e:
+            self.errors += 1
+            print(f"Cache invalidation error for {keys}: {e}")
+
+    def invalidate_sync(self, *keys: str) -> None:
+        """
+        invalidate() for the sync CRUD functions, which run outside the event loop.
+        """
+        self._detach_inflight(keys)
+        try:
+            self.backend.delete_sync(*keys)
+        except Exception as e:
+            self.errors += 1
+            print(f"Cache invalidation error for {keys}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+def create_backend():
+    # Use Redis when configured, otherwise keep the cache in-process
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        return RedisCacheBackend(redis_url)
+    return InMemoryCacheBackend(max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "10000")))
+
+
+cache = ReadThroughCache(create_backend())
@@ -1,7 +1,23 @@
+from sqlalchemy import func, insert, tuple_
 from sqlalchemy.orm import Session
-from models.database_models import User, Account, Transaction, ChatSession, ChatMessage
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from models.database_models import User, Account, Transaction, ChatSession, ChatMessage, DailyCategoryRollup
+from models.velocity_store import velocity_store
+from app.cache import cache
+from app.pagination import decode_cursor, next_cursor
+from app.rollups import insights_from_rows, rollup_deltas, rollup_upsert
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import date, datetime
+import csv
+import io
+import json
+import math
+
+# Read-through cache keys, shared with app/crud_async.py so both write paths invalidate them
+def accounts_cache_key(user_id: int) -> str:
+    return cache.key("accounts", user_id)
+
+def recent_transactions_cache_key(user_id: int) -> str:
+    return cache.key("recent_transactions", user_id)
 
 # User operations
 def create_user(db: Session, email: str, hashed_password: str, full_name: str) -> User:
@@ -42,9 +58,14 @@ def update_account_balance(db: Session, account_id: int, new_balance: float) ->
         db_account.balance = new_balance
         db.commit()
         db.refresh(db_account)
+        cache.invalidate_sync(accounts_cache_key(db_account.user_id))
     return db_account
 
 # Transaction operations
+def _apply_rollup(db: Session, rows: List[Dict[str, Any]]) -> None:
+    # Runs inside the caller's transaction so the rollup commits with the rows
+    db.execute(rollup_upsert(db.get_bind().dialect.name), rollup_deltas(rows))
+
 def create_transaction(
     db: Session,
     user_id: int,
@@ -58,6 +79,7 @@ def create_transaction(
     fraud_score: float = 0.0,
     metadata: Dict[str, Any] = None
 ) -> Transaction:
+    now = datetime.utcnow()
     db_transaction = Transaction(
         user_id=user_id,
         account_id=account_id,
@@ -68,13 +90,119 @@ def create_transaction(
         category=category,
         location=location,
         fraud_score=fraud_score,
-        metadata=metadata or {}
+        timestamp=now,
+        extra_data=metadata or {}
     )
     db.add(db_transaction)
+    _apply_rollup(db, [{"user_id": user_id, "timestamp": now, "category": category, "amount": amount}])
     db.commit()
     db.refresh(db_transaction)
+
+    # Keep the fraud velocity features in step with the transactions table
+    velocity_store.record(user_id, db_transaction.timestamp, amount, merchant)
+    cache.invalidate_sync(recent_transactions_cache_key(user_id))
     return db_transaction
 
+# Columns written by the bulk ingestion path, in COPY order. Inserts render NULLs
+# explicitly, so a None fraud_score or is_fraudulent is stored rather than defaulted
+BULK_TRANSACTION_COLUMNS = [
+    "user_id", "account_id", "transaction_type", "amount", "currency", "description",
+    "merchant", "category", "timestamp", "location", "is_fraudulent", "fraud_score", "extra_data"
+]
+
+def _bulk_amount(value: Any) -> float:
+    # Rollups and velocity features add amounts up, so they must be real finite numbers
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid transaction amount: {value!r}")
+    try:
+        amount = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid transaction amount: {value!r}")
+    if not math.isfinite(amount):
+        raise ValueError(f"Invalid transaction amount: {value!r}")
+    return amount
+
+def bulk_transaction_row(transaction: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """
+    Build a transactions table row from an ingested dict. Raises ValueError
+    for a missing or non-numeric amount or an unparseable timestamp.
+    """
+    timestamp = transaction.get("timestamp") or now
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    # None means scoring failed for this row and is stored as NULL, not as "not fraud"
+    is_fraudulent = transaction.get("is_fraudulent", False)
+    return {
+        "user_id": transaction["user_id"],
+        "account_id": transaction["account_id"],
+        "transaction_type": transaction.get("transaction_type"),
+        "amount": _bulk_amount(transaction.get("amount")),
+        "currency": transaction.get("currency", "USD"),
+        "description": transaction.get("description"),
+        "merchant": transaction.get("merchant"),
+        "category": transaction.get("category"),
+        "timestamp": timestamp,
+        "location": transaction.get("location"),
+        "is_fraudulent": None if is_fraudulent is None else bool(is_fraudulent),
+        "fraud_score": transaction.get("fraud_score", 0.0),
+        "extra_data": transaction.get("metadata") or transaction.get("extra_data") or {}
+    }
+
+def _copy_transactions(db: Session, rows: List[Dict[str, Any]]) -> None:
+    # Stream the rows through PostgreSQL COPY as CSV
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            json.dumps(row[column]) if column == "extra_data"
+            else "" if row[column] is None
+            else row[column]
+            for column in BULK_TRANSACTION_COLUMNS
+        ])
+    buffer.seek(0)
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY transactions ({', '.join(BULK_TRANSACTION_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+def create_transactions_bulk(
+    db: Session,
+    transactions: List[Dict[str, Any]],
+    use_copy: bool = False
+) -> int:
+    """
+    Insert many transactions in a single database transaction.
+
+    Uses an executemany INSERT by default; `use_copy` switches to
+    PostgreSQL COPY FROM STDIN for very large loads.
+    """
+    if not transactions:
+        return 0
+
+    now = datetime.utcnow()
+    rows = [bulk_transaction_row(transaction, now) for transaction in transactions]
+
+    try:
+        if use_copy and db.get_bind().dialect.name == "postgresql":
+            _copy_transactions(db, rows)
+        else:
+            db.execute(insert(Transaction).execution_options(render_nulls=True), rows)
+        _apply_rollup(db, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    for row in rows:
+        velocity_store.record(row["user_id"], row["timestamp"], row["amount"], row["merchant"])
+    cache.invalidate_sync(*{recent_transactions_cache_key(row["user_id"]) for row in rows})
+    return len(rows)
+
 def get_user_transactions(
     db: Session,
     user_id: int,
@@ -101,6 +229,49 @@ def get_account_transactions(
         .limit(limit)\
         .all()
 
+def _transactions_page(query, limit: int, cursor: Optional[str]) -> Tuple[List[Transaction], Optional[str]]:
+    # Newest first; the cursor resumes strictly after the last (timestamp, id) seen
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(Transaction.timestamp, Transaction.id) < tuple_(timestamp, row_id))
+    rows = query.order_by(Transaction.timestamp.desc(), Transaction.id.desc())\
+        .limit(limit + 1)\
+        .all()
+    return next_cursor(rows, limit)
+
+def get_user_transactions_page(
+    db: Session,
+    user_id: int,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Tuple[List[Transaction], Optional[str]]:
+    query = db.query(Transaction).filter(Transaction.user_id == user_id)
+    return _transactions_page(query, limit, cursor)
+
+def get_account_transactions_page(
+    db: Session,
+    account_id: int,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Tuple[List[Transaction], Optional[str]]:
+    query = db.query(Transaction).filter(Transaction.account_id == account_id)
+    return _transactions_page(query, limit, cursor)
+
+def get_spending_insights_range(db: Session, user_id: int, start: date, end: date) -> Dict[str, Any]:
+    """
+    Category totals and counts for [start, end] read from the daily rollup.
+    """
+    rows = db.query(
+        DailyCategoryRollup.category,
+        func.sum(DailyCategoryRollup.total_amount),
+        func.sum(DailyCategoryRollup.transaction_count)
+    ).filter(
+        DailyCategoryRollup.user_id == user_id,
+        DailyCategoryRollup.day >= start,
+        DailyCategoryRollup.day <= end
+    ).group_by(DailyCategoryRollup.category).all()
+    return insights_from_rows(rows)
+
 # Chat operations
 def create_chat_session(db: Session, user_id: int, session_id: str) -> ChatSession:
     db_session = ChatSession(
@@ -127,7 +298,7 @@ def create_chat_message(
         role=role,
         intent=intent,
         confidence=confidence,
-        metadata=metadata or {}
+        message_data=metadata or {}
     )
     db.add(db_message)
     db.commit()
@@ -145,4 +316,20 @@ def get_chat_history(
         .order_by(ChatMessage.timestamp.asc())\
         .offset(skip)\
         .limit(limit)\
-        .all() 
\ No newline at end of file
+        .all()
+
+def get_chat_history_page(
+    db: Session,
+    session_id: str,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Tuple[List[ChatMessage], Optional[str]]:
+    # Oldest first, so the cursor resumes strictly after the last (timestamp, id) seen
+    query = db.query(ChatMessage).filter(ChatMessage.session_id == session_id)
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(ChatMessage.timestamp, ChatMessage.id) > tuple_(timestamp, row_id))
+    rows = query.order_by(ChatMessage.timestamp.asc(), ChatMessage.id.asc())\
+        .limit(limit + 1)\
+        .all()
+    return next_cursor(rows, limit)
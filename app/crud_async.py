@@ -0,0 +1,366 @@
+from sqlalchemy import func, insert, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.database_models import User, Account, Transaction, ChatSession, ChatMessage, DailyCategoryRollup
+from models.velocity_store import velocity_store
+from app.cache import cache
+from app.realtime import hub
+from app.crud import accounts_cache_key, bulk_transaction_row, recent_transactions_cache_key
+from app.serializers import serialize_account, serialize_transaction
+from app.pagination import decode_cursor, next_cursor
+from app.rollups import DEFAULT_CATEGORY, insights_from_rows, rollup_deltas, rollup_upsert
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import date, datetime, time, timedelta
+import os
+
+# Async counterparts of app/crud.py for the FastAPI request path
+
+ACCOUNTS_CACHE_TTL = int(os.getenv("CACHE_ACCOUNTS_TTL", "30"))
+RECENT_TRANSACTIONS_CACHE_TTL = int(os.getenv("CACHE_RECENT_TRANSACTIONS_TTL", "30"))
+RECENT_TRANSACTIONS_LIMIT = 50
+
+# User operations
+async def create_user(db: AsyncSession, email: str, hashed_password: str, full_name: str) -> User:
+    db_user = User(
+        email=email,
+        hashed_password=hashed_password,
+        full_name=full_name
+    )
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+async def get_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    return await db.scalar(select(User).where(User.id == user_id))
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    return await db.scalar(select(User).where(User.email == email))
+
+# Account operations
+async def create_account(db: AsyncSession, user_id: int, account_type: str, account_number: str) -> Account:
+    db_account = Account(
+        user_id=user_id,
+        account_type=account_type,
+        account_number=account_number
+    )
+    db.add(db_account)
+    await db.commit()
+    await db.refresh(db_account)
+    return db_account
+
+async def get_user_accounts(db: AsyncSession, user_id: int) -> List[Account]:
+    result = await db.scalars(select(Account).where(Account.user_id == user_id))
+    return list(result)
+
+async def get_user_accounts_cached(db: AsyncSession, user_id: int) -> List[Dict[str, Any]]:
+    async def load():
+        return [serialize_account(account) for account in await get_user_accounts(db, user_id)]
+    return await cache.get_or_load(accounts_cache_key(user_id), load, ACCOUNTS_CACHE_TTL)
+
+async def update_account_balance(db: AsyncSession, account_id: int, new_balance: float) -> Account:
+    db_account = await db.scalar(select(Account).where(Account.id == account_id))
+    if db_account:
+        db_account.balance = new_balance
+        await db.commit()
+        await db.refresh(db_account)
+        await cache.invalidate(accounts_cache_key(db_account.user_id))
+        await hub.publish(db_account.user_id, "balance_updated", serialize_account(db_account))
+    return db_account
+
+# Transaction operations
+async def _apply_rollup(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    # Runs inside the caller's transaction so the rollup commits with the rows
+    await db.execute(rollup_upsert(db.get_bind().dialect.name), rollup_deltas(rows))
+
+async def create_transaction(
+    db: AsyncSession,
+    user_id: int,
+    account_id: int,
+    amount: float,
+    transaction_type: str,
+    description: str,
+    merchant: str,
+    category: str,
+    location: str,
+    fraud_score: float = 0.0,
+    metadata: Dict[str, Any] = None
+) -> Transaction:
+    now = datetime.utcnow()
+    db_transaction = Transaction(
+        user_id=user_id,
+        account_id=account_id,
+        amount=amount,
+        transaction_type=transaction_type,
+        description=description,
+        merchant=merchant,
+        category=category,
+        location=location,
+        fraud_score=fraud_score,
+        timestamp=now,
+        extra_data=metadata or {}
+    )
+    db.add(db_transaction)
+    await _apply_rollup(db, [{"user_id": user_id, "timestamp": now, "category": category, "amount": amount}])
+    await db.commit()
+    await db.refresh(db_transaction)
+
+    velocity_store.record(user_id, db_transaction.timestamp, amount, merchant)
+    await cache.invalidate(recent_transactions_cache_key(user_id))
+    await hub.publish(user_id, "transaction_created", serialize_transaction(db_transaction))
+    return db_transaction
+
+async def create_transactions_bulk(db: AsyncSession, transactions: List[Dict[str, Any]]) -> int:
+    """
+    Insert many transactions with one executemany INSERT in a single database transaction.
+    """
+    if not transactions:
+        return 0
+
+    now = datetime.utcnow()
+    rows = [bulk_transaction_row(transaction, now) for transaction in transactions]
+
+    try:
+        await db.execute(insert(Transaction).execution_options(render_nulls=True), rows)
+        await _apply_rollup(db, rows)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    for row in rows:
+        velocity_store.record(row["user_id"], row["timestamp"], row["amount"], row["merchant"])
+    await cache.invalidate(*{recent_transactions_cache_key(row["user_id"]) for row in rows})
+    # One summary event per user instead of one per row
+    counts: Dict[Any, int] = {}
+    for row in rows:
+        counts[row["user_id"]] = counts.get(row["user_id"], 0) + 1
+    for user_id, count in counts.items():
+        await hub.publish(user_id, "transactions_created", {"count": count})
+    return len(rows)
+
+async def get_user_transactions(
+    db: AsyncSession,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100
+) -> List[Transaction]:
+    result = await db.scalars(
+        select(Transaction)
+        .where(Transaction.user_id == user_id)
+        .order_by(Transaction.timestamp.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return list(result)
+
+async def get_user_recent_transactions_cached(
+    db: AsyncSession,
+    user_id: int,
+    limit: int = RECENT_TRANSACTIONS_LIMIT
+) -> List[Dict[str, Any]]:
+    # Always cache the full recent window so every smaller limit shares one entry
+    async def load():
+        transactions = await get_user_transactions(db, user_id, limit=RECENT_TRANSACTIONS_LIMIT)
+        return [serialize_transaction(transaction) for transaction in transactions]
+    transactions = await cache.get_or_load(recent_transactions_cache_key(user_id), load, RECENT_TRANSACTIONS_CACHE_TTL)
+    return transactions[:limit]
+
+async def get_account_transactions(
+    db: AsyncSession,
+    account_id: int,
+    skip: int = 0,
+    limit: int = 100
+) -> List[Transaction]:
+    result = await db.scalars(
+        select(Transaction)
+        .where(Transaction.account_id == account_id)
+        .order_by(Transaction.timestamp.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return list(result)
+
+async def _transactions_page(
+    db: AsyncSession,
+    statement,
+    limit: int,
+    cursor: Optional[str]
+) -> Tuple[List[Transaction], Optional[str]]:
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        statement = statement.where(tuple_(Transaction.timestamp, Transaction.id) < tuple_(timestamp, row_id))
+    result = await db.scalars(
+        statement
+        .order_by(Transaction.timestamp.desc(), Transaction.id.desc())
+        .limit(limit + 1)
+    )
+    return next_cursor(list(result), limit)
+
+async def get_user_transactions_page(
+    db: AsyncSession,
+    user_id: int,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Tuple[List[Transaction], Optional[str]]:
+    statement = select(Transaction).where(Transaction.user_id == user_id)
+    return await _transactions_page(db, statement, limit, cursor)
+
+async def get_account_transactions_page(
+    db: AsyncSession,
+    account_id: int,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Tuple[List[Transaction], Optional[str]]:
+    statement = select(Transaction).where(Transaction.account_id == account_id)
+    return await _transactions_page(db, statement, limit, cursor)
+
+async def get_spending_insights_range(db: AsyncSession, user_id: int, start: date, end: date) -> Dict[str, Any]:
+    """
+    Category totals and counts for [start, end] read from the daily rollup.
+    """
+    result = await db.execute(
+        select(
+            DailyCategoryRollup.category,
+            func.sum(DailyCategoryRollup.total_amount),
+            func.sum(DailyCategoryRollup.transaction_count)
+        ).where(
+            DailyCategoryRollup.user_id == user_id,
+            DailyCategoryRollup.day >= start,
+            DailyCategoryRollup.day <= end
+        ).group_by(DailyCategoryRollup.category)
+    )
+    return insights_from_rows(result.all())
+
+async def get_spending_insights_from_transactions(
+    db: AsyncSession,
+    user_id: int,
+    start: date,
+    end: date
+) -> Dict[str, Any]:
+    """
+    Same aggregation computed with GROUP BY directly on transactions.
+    """
+    category = func.coalesce(Transaction.category, DEFAULT_CATEGORY)
+    result = await db.execute(
+        select(category, func.sum(Transaction.amount), func.count(Transaction.id))
+        .where(
+            Transaction.user_id == user_id,
+            Transaction.timestamp >= datetime.combine(start, time.min),
+            Transaction.timestamp < datetime.combine(end + timedelta(days=1), time.min)
+        )
+        .group_by(category)
+    )
+    return insights_from_rows(result.all())
+
+# Chat operations
+async def create_chat_session(db: AsyncSession, user_id: int, session_id: str) -> ChatSession:
+    db_session = ChatSession(
+        user_id=user_id,
+        session_id=session_id
+    )
+    db.add(db_session)
+    await db.commit()
+    await db.refresh(db_session)
+    return db_session
+
+async def get_or_create_chat_session(db: AsyncSession, session_id: str, user_id: Optional[int] = None) -> ChatSession:
+    db_session = await db.scalar(select(ChatSession).where(ChatSession.session_id == session_id))
+    if db_session is not None:
+        return db_session
+    try:
+        return await create_chat_session(db, user_id, session_id)
+    except IntegrityError:
+        # A concurrent request created the same session first
+        await db.rollback()
+        return await db.scalar(select(ChatSession).where(ChatSession.session_id == session_id))
+
+async def create_chat_message(
+    db: AsyncSession,
+    session_id: str,
+    message: str,
+    role: str,
+    intent: str = None,
+    confidence: float = None,
+    metadata: Dict[str, Any] = None
+) -> ChatMessage:
+    db_message = ChatMessage(
+        session_id=session_id,
+        message=message,
+        role=role,
+        intent=intent,
+        confidence=confidence,
+        message_data=metadata or {}
+    )
+    db.add(db_message)
+    await db.commit()
+    await db.refresh(db_message)
+    return db_message
+
+async def create_chat_messages_bulk(db: AsyncSession, messages: List[Dict[str, Any]]) -> int:
+    """
+    Insert many chat messages with one executemany INSERT.
+    """
+    if not messages:
+        return 0
+    rows = [
+        {
+            "session_id": message["session_id"],
+            "message": message["message"],
+            "role": message["role"],
+            "intent": message.get("intent"),
+            "confidence": message.get("confidence"),
+            "timestamp": message.get("timestamp") or datetime.utcnow(),
+            "message_data": message.get("metadata") or {}
+        }
+        for message in messages
+    ]
+    try:
+        await db.execute(insert(ChatMessage), rows)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return len(rows)
+
+async def get_recent_chat_messages(db: AsyncSession, session_id: str, limit: int = 20) -> List[ChatMessage]:
+    # Newest first from the index, returned oldest first
+    result = await db.scalars(
+        select(ChatMessage)
+        .where(ChatMessage.session_id == session_id)
+        .order_by(ChatMessage.timestamp.desc(), ChatMessage.id.desc())
+        .limit(limit)
+    )
+    return list(reversed(list(result)))
+
+async def get_chat_history(
+    db: AsyncSession,
+    session_id: str,
+    skip: int = 0,
+    limit: int = 100
+) -> List[ChatMessage]:
+    result = await db.scalars(
+        select(ChatMessage)
+        .where(ChatMessage.session_id == session_id)
+        .order_by(ChatMessage.timestamp.asc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return list(result)
+
+async def get_chat_history_page(
+    db: AsyncSession,
+    session_id: str,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Tuple[List[ChatMessage], Optional[str]]:
+    statement = select(ChatMessage).where(ChatMessage.session_id == session_id)
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        statement = statement.where(tuple_(ChatMessage.timestamp, ChatMessage.id) > tuple_(timestamp, row_id))
+    result = await db.scalars(
+        statement
+        .order_by(ChatMessage.timestamp.asc(), ChatMessage.id.asc())
+        .limit(limit + 1)
+    )
+    return next_cursor(list(result), limit)
@@ -0,0 +1,159 @@
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from app.inference import InferenceQueueFull
+
+
+class FraudStreamSession:
+    """
+    Pipelined fraud scoring over one WebSocket.
+
+    Clients send frames holding one or more transactions, each tagged with
+    a correlation id:
+
+        {"id": "tx-1", "transaction": {...}}
+        {"items": [{"id": "tx-1", "transaction": {...}}, ...]}
+
+    Transactions are micro-batched per connection: a batch is scored when
+    it reaches `max_batch_size` or when its oldest transaction has waited
+    `max_wait_ms`. Several batches can be in flight at once, so results
+    come back in batches and not necessarily in the order sent:
+
+        {"type": "results", "results": [{"id": "tx-1", "risk_score": ...}], "credit": 1}
+
+    Flow control is a credit window. The server announces `window` on
+    connect; a client may have at most that many transactions unanswered,
+    and each result, or error for an accepted transaction, returns one
+    credit. Transactions sent without credit are answered with a
+    "credit_exceeded" error carrying no credit. A batch that cannot be
+    scored is answered with "overloaded" or "scoring_failed" errors, which
+    do return their credit.
+    """
+
+    def __init__(
+        self,
+        websocket,
+        score_batch: Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]],
+        on_results: Optional[Callable[[List[Dict[str, Any]], List[Dict[str, Any]]], Awaitable[None]]] = None,
+        window: int = 4096,
+        max_batch_size: int = 512,
+        max_wait_ms: float = 2.0
+    ):
+        self.websocket = websocket
+        self.score_batch = score_batch
+        self.on_results = on_results
+        self.window = max(1, window)
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self.outstanding = 0
+        self.received = 0
+        self.scored = 0
+        self._pending: List[Tuple[Any, Dict[str, Any]]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._send_lock = asyncio.Lock()
+
+    async def _send(self, payload: Dict[str, Any]) -> None:
+        text = json.dumps(payload, default=str)
+        async with self._send_lock:
+            await self.websocket.send_text(text)
+
+    async def _send_errors(self, ids: List[Any], error: str) -> None:
+        await self._send({
+            "type": "error",
+            "errors": [{"id": correlation_id, "error": error} for correlation_id in ids],
+            "credit": len(ids)
+        })
+
+    async def run(self) -> None:
+        await self._send({
+            "type": "ready",
+            "window": self.window,
+            "max_batch_size": self.max_batch_size
+        })
+        try:
+            while True:
+                await self._receive(await self.websocket.receive_text())
+        finally:
+            self._cancel()
+
+    async def _receive(self, text: str) -> None:
+        try:
+            frame = json.loads(text)
+        except ValueError:
+            frame = None
+        items = frame.get("items", [frame]) if isinstance(frame, dict) else None
+        if not isinstance(items, list):
+            await self._send({"type": "error", "errors": [{"id": None, "error": "invalid_frame"}], "credit": 0})
+            return
+
+        rejected: List[Any] = []
+        invalid: List[Any] = []
+        for item in items:
+            correlation_id = item.get("id") if isinstance(item, dict) else None
+            transaction = item.get("transaction") if isinstance(item, dict) else None
+            if correlation_id is None or not isinstance(transaction, dict):
+                invalid.append(correlation_id)
+            elif self.outstanding >= self.window:
+                rejected.append(correlation_id)
+            else:
+                self.outstanding += 1
+                self._pending.append((correlation_id, transaction))
+        self.received += len(items)
+
+        # Invalid and rejected items never held credit, so none is returned for them
+        if invalid:
+            await self._send({"type": "error", "errors": [{"id": i, "error": "invalid_item"} for i in invalid], "credit": 0})
+        if rejected:
+            await self._send({"type": "error", "errors": [{"id": i, "error": "credit_exceeded"} for i in rejected], "credit": 0})
+
+        while len(self._pending) >= self.max_batch_size:
+            self._flush(self.max_batch_size)
+        if self._pending and self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait_ms / 1000.0, self._flush)
+
+    def _flush(self, size: Optional[int] = None) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        size = size or len(self._pending)
+        batch, self._pending = self._pending[:size], self._pending[size:]
+        task = asyncio.ensure_future(self._score(batch))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _score(self, batch: List[Tuple[Any, Dict[str, Any]]]) -> None:
+        ids = [correlation_id for correlation_id, _ in batch]
+        transactions = [transaction for _, transaction in batch]
+        try:
+            results = await self.score_batch(transactions)
+        except InferenceQueueFull:
+            self.outstanding -= len(batch)
+            await self._send_errors(ids, "overloaded")
+            return
+        except Exception as e:
+            # Exception text can describe internals, so the client only gets a fixed code
+            print(f"Fraud stream scoring error: {e}")
+            self.outstanding -= len(batch)
+            await self._send_errors(ids, "scoring_failed")
+            return
+
+        self.outstanding -= len(batch)
+        self.scored += len(batch)
+        await self._send({
+            "type": "results",
+            "results": [{"id": correlation_id, **result} for correlation_id, result in zip(ids, results)],
+            "credit": len(batch)
+        })
+        if self.on_results is not None:
+            await self.on_results(transactions, results)
+
+    def _cancel(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for task in list(self._tasks):
+            task.cancel()
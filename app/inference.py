@@ -0,0 +1,140 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class InferenceQueueFull(Exception):
+    """Raised when a model's inference queue is at capacity."""
+
+
+class InferenceExecutor:
+    """
+    Runs blocking model calls on a bounded thread pool so they never hold
+    the event loop. Calls beyond `max_concurrency + max_queue_depth` are
+    rejected with InferenceQueueFull instead of piling up.
+    """
+
+    def __init__(self, name: str, max_concurrency: int = 2, max_queue_depth: int = 256):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue_depth = max(0, max_queue_depth)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix=f"inference-{name}"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.max_concurrency + self.max_queue_depth:
+                self.rejected += 1
+                raise InferenceQueueFull(f"Inference queue for '{self.name}' is full")
+            self._pending += 1
+            self.submitted += 1
+
+        # The slot is released when the pool job finishes or is cancelled before
+        # it starts, so a caller cancelled while queued does not leak it
+        try:
+            job = self._pool.submit(self._call, time.perf_counter(), fn, args)
+        except Exception:
+            self._release(None)
+            raise
+        job.add_done_callback(self._release)
+        return await asyncio.wrap_future(job)
+
+    def _release(self, job) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _call(self, enqueued_at: float, fn: Callable[..., Any], args: tuple) -> Any:
+        started_at = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            wait = started_at - enqueued_at
+            self.total_wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+        failed = False
+        try:
+            return fn(*args)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+                self.total_run_seconds += time.perf_counter() - started_at
+                if failed:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "max_concurrency": self.max_concurrency,
+                "max_queue_depth": self.max_queue_depth,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_wait_ms": self.total_wait_seconds / finished * 1000 if finished else 0.0,
+                "max_wait_ms": self.max_wait_seconds * 1000,
+                "avg_run_ms": self.total_run_seconds / finished * 1000 if finished else 0.0
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
+
+
+_executors: Dict[str, InferenceExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name: str) -> InferenceExecutor:
+    """
+    Return the shared executor for a model, creating it on first use.
+
+    Sizing comes from INFERENCE_<NAME>_CONCURRENCY / INFERENCE_<NAME>_QUEUE_DEPTH,
+    falling back to INFERENCE_CONCURRENCY / INFERENCE_QUEUE_DEPTH.
+    """
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            prefix = f"INFERENCE_{name.upper()}"
+            executor = InferenceExecutor(
+                name,
+                max_concurrency=int(os.getenv(f"{prefix}_CONCURRENCY", os.getenv("INFERENCE_CONCURRENCY", "2"))),
+                max_queue_depth=int(os.getenv(f"{prefix}_QUEUE_DEPTH", os.getenv("INFERENCE_QUEUE_DEPTH", "256")))
+            )
+            _executors[name] = executor
+        return executor
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    with _executors_lock:
+        executors = list(_executors.values())
+    return {executor.name: executor.stats() for executor in executors}
+
+
+def shutdown_executors() -> None:
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown()
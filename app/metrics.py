@@ -0,0 +1,109 @@
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Primitives and model metrics live in config.metrics; re-exported for main and the scripts
+from config.metrics import (
+    COUNT_BUCKETS,
+    METRICS_ENABLED,
+    MODEL_ERRORS,
+    MODEL_INFERENCE,
+    Counter,
+    Histogram,
+    Registry,
+    observe_phases,
+    registry,
+    stats_families,
+)
+
+REQUESTS = registry.counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+REQUEST_LATENCY = registry.histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+DB_QUERY_LATENCY = registry.histogram("db_query_duration_seconds", "Time spent in each SQL statement", ("dialect",))
+DB_QUERY_ERRORS = registry.counter("db_query_errors_total", "SQL statements that raised", ("dialect",))
+DB_QUERIES_PER_REQUEST = registry.histogram(
+    "db_queries_per_request", "SQL statements issued per HTTP request", ("route",), buckets=COUNT_BUCKETS
+)
+DB_TIME_PER_REQUEST = registry.histogram("db_time_per_request_seconds", "SQL time per HTTP request", ("route",))
+
+# [statement count, seconds] for the request being served, shared with the SQL hooks
+_request_db: ContextVar[Optional[List[Any]]] = ContextVar("request_db", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    DB_QUERY_LATENCY.observe(elapsed, conn.dialect.name)
+    request_db = _request_db.get()
+    if request_db is not None:
+        request_db[0] += 1
+        request_db[1] += elapsed
+
+
+def _handle_error(context):
+    connection = context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+    DB_QUERY_ERRORS.inc(context.dialect.name)
+
+
+def instrument_sqlalchemy() -> None:
+    # Listening on the Engine class covers every engine, including the sync side of async engines
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and SQL work per route.
+    Routes are labelled by their path template, so ids in URLs do not
+    create new series; requests that match no route share "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths: Optional[Dict[Any, str]] = None
+
+    def _route_label(self, scope) -> str:
+        if self._route_paths is None:
+            self._route_paths = {
+                route.endpoint: route.path
+                for route in getattr(scope.get("app"), "routes", [])
+                if hasattr(route, "endpoint")
+            }
+        return self._route_paths.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        request_db = [0, 0.0]
+        token = _request_db.set(request_db)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_db.reset(token)
+            elapsed = time.perf_counter() - start
+            route = self._route_label(scope)
+            method = scope["method"]
+            REQUEST_LATENCY.observe(elapsed, method, route)
+            REQUESTS.inc(method, route, str(status))
+            DB_QUERIES_PER_REQUEST.observe(request_db[0], route)
+            DB_TIME_PER_REQUEST.observe(request_db[1], route)
@@ -0,0 +1,32 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """
+    Build an opaque cursor pointing just past the row with this (timestamp, id).
+    """
+    payload = json.dumps({"t": timestamp.isoformat(), "i": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["t"]), int(payload["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+def next_cursor(rows: List[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Split a `limit + 1` fetch into the page and the cursor for the following page.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(last.timestamp, last.id)
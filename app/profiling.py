@@ -0,0 +1,173 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+MAX_PROFILE_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+MAX_STACK_DEPTH = 128
+
+# Top frames of threads that are parked waiting for work, left out unless include_idle is set
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("process.py", "_wait"),
+}
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _collapse(frame) -> str:
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+def _is_idle(frame) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES
+
+
+class ProfileSession:
+    def __init__(self, interval: float, block_threshold: float, include_idle: bool):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.lags: List[float] = []
+        self.blocking: List[Dict[str, Any]] = []
+        self.loop_thread_id = threading.get_ident()
+        self.last_tick = time.perf_counter()
+        # Loop-thread stacks seen while the current heartbeat is overdue
+        self._block_stacks: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def take_block_stacks(self) -> Counter:
+        with self._lock:
+            stacks, self._block_stacks = self._block_stacks, Counter()
+        return stacks
+
+    def summary(self) -> Dict[str, Any]:
+        lags = sorted(self.lags)
+        return {
+            "samples": self.samples,
+            "interval_ms": self.interval * 1000,
+            "loop_lag": {
+                "ticks": len(lags),
+                "p50_ms": lags[len(lags) // 2] * 1000 if lags else 0.0,
+                "p99_ms": lags[int(0.99 * (len(lags) - 1))] * 1000 if lags else 0.0,
+                "max_ms": lags[-1] * 1000 if lags else 0.0
+            },
+            "blocking_threshold_ms": self.block_threshold * 1000,
+            "blocking": self.blocking
+        }
+
+    def collapsed(self) -> str:
+        """
+        One "frame;frame;frame count" line per stack, root first, the
+        input format of flamegraph.pl, speedscope and similar tools.
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class SamplingProfiler:
+    """
+    On-demand wall-clock profiler for the running worker.
+
+    While a profile runs, a daemon thread samples every Python thread's
+    stack through sys._current_frames(), and a heartbeat coroutine
+    measures event-loop lag. When the heartbeat is late by more than the
+    blocking threshold, the loop thread's stacks from that window are
+    kept as a blocking event, which names the coroutine holding the
+    loop. Nothing runs between profiles.
+    """
+
+    def __init__(self):
+        self.active = False
+        self.profiles = 0
+
+    async def profile(
+        self,
+        seconds: float,
+        interval_ms: float = 5.0,
+        block_threshold_ms: float = 50.0,
+        include_idle: bool = False
+    ) -> ProfileSession:
+        if self.active:
+            raise ProfilerBusy("A profile is already running on this worker")
+        self.active = True
+        try:
+            session = ProfileSession(max(0.001, interval_ms / 1000.0), max(0.001, block_threshold_ms / 1000.0), include_idle)
+            stop = threading.Event()
+            sampler = threading.Thread(target=self._sample, args=(session, stop), name="profiler-sampler", daemon=True)
+            heartbeat = asyncio.create_task(self._heartbeat(session))
+            sampler.start()
+            try:
+                await asyncio.sleep(min(max(seconds, 0.0), MAX_PROFILE_SECONDS))
+            finally:
+                stop.set()
+                heartbeat.cancel()
+                await asyncio.gather(heartbeat, return_exceptions=True)
+                # The sampler only ever waits on `stop`, so this returns within one interval
+                await asyncio.to_thread(sampler.join)
+            self.profiles += 1
+            return session
+        finally:
+            self.active = False
+
+    async def _heartbeat(self, session: ProfileSession) -> None:
+        # Ticks faster than the threshold so a block is noticed while it is still happening
+        tick = min(0.01, session.block_threshold / 2)
+        while True:
+            session.last_tick = time.perf_counter()
+            await asyncio.sleep(tick)
+            lag = max(0.0, time.perf_counter() - session.last_tick - tick)
+            session.lags.append(lag)
+            stacks = session.take_block_stacks()
+            if lag >= session.block_threshold:
+                session.blocking.append({
+                    "lag_ms": round(lag * 1000, 3),
+                    "at": time.time() - lag,
+                    "stacks": [{"stack": stack, "samples": count} for stack, count in stacks.most_common(5)]
+                })
+
+    def _sample(self, session: ProfileSession, stop: threading.Event) -> None:
+        own_id = threading.get_ident()
+        names: Dict[int, str] = {}
+        while not stop.wait(session.interval):
+            frames = sys._current_frames()
+            if frames.keys() - names.keys():
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            loop_overdue = time.perf_counter() - session.last_tick > session.block_threshold
+            session.samples += 1
+            for thread_id, frame in frames.items():
+                if thread_id == own_id:
+                    continue
+                # An event loop parked in select() is waiting for I/O, not running code
+                if not session.include_idle and _is_idle(frame):
+                    continue
+                is_loop = thread_id == session.loop_thread_id
+                stack = _collapse(frame)
+                thread_name = "event-loop" if is_loop else names.get(thread_id, str(thread_id))
+                session.stacks[f"{thread_name};{stack}"] += 1
+                if is_loop and loop_overdue:
+                    with session._lock:
+                        session._block_stacks[stack] += 1
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,258 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+# Close code sent to clients that cannot keep up with their events
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class Connection:
+    """
+    One authenticated WebSocket. Outgoing events wait in a bounded queue
+    drained by a sender task that only exists while the queue is non-empty,
+    so idle connections hold no task and no buffer.
+    """
+    __slots__ = ('websocket', 'user_id', 'hub', 'closed', 'sent', '_queue', '_sender')
+
+    def __init__(self, websocket, user_id: str, hub: "ConnectionHub"):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.hub = hub
+        self.closed = False
+        self.sent = 0
+        self._queue: Optional[deque] = None
+        self._sender: Optional[asyncio.Task] = None
+
+    def send(self, text: str) -> bool:
+        if self.closed:
+            return False
+        if self._queue is None:
+            self._queue = deque()
+        elif len(self._queue) >= self.hub.max_queue_size:
+            # A slow client is disconnected rather than stalling the publisher
+            self.hub.slow_consumers += 1
+            self.hub.disconnect(self, code=SLOW_CONSUMER_CLOSE_CODE)
+            return False
+        self._queue.append(text)
+        if self._sender is None:
+            self._sender = asyncio.ensure_future(self._drain())
+        return True
+
+    async def _drain(self) -> None:
+        try:
+            while self._queue and not self.closed:
+                text = self._queue.popleft()
+                await asyncio.wait_for(self.websocket.send_text(text), self.hub.send_timeout)
+                self.sent += 1
+        except Exception:
+            self.hub.disconnect(self, code=SLOW_CONSUMER_CLOSE_CODE)
+        finally:
+            self._sender = None
+            if not self._queue:
+                self._queue = None
+
+    async def close(self, code: int) -> None:
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+
+class LocalPubSub:
+    """
+    In-process pub/sub: every publish is delivered straight to the subscribed
+    hubs. Used for single-worker deployments, and as a stand-in for Redis in
+    tests by sharing one instance between several hubs.
+    """
+
+    def __init__(self):
+        self._subscribers: List[Callable[[str, str], int]] = []
+
+    async def start(self, deliver: Callable[[str, str], int]) -> None:
+        self._subscribers.append(deliver)
+
+    async def publish(self, user_id: str, message: str) -> None:
+        for deliver in self._subscribers:
+            deliver(user_id, message)
+
+    async def stop(self) -> None:
+        self._subscribers.clear()
+
+
+class RedisPubSub:
+    """
+    Cross-worker fan-out over one Redis channel. Every worker subscribes and
+    delivers the messages addressed to users connected to it.
+    """
+
+    def __init__(self, url: str, channel: str = "digitrust:realtime"):
+        import redis.asyncio as redis
+        self._client = redis.from_url(url, decode_responses=True)
+        self.channel = channel
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: Callable[[str, str], int]) -> None:
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self.channel)
+        self._listener = asyncio.create_task(self._listen(deliver))
+
+    async def _listen(self, deliver: Callable[[str, str], int]) -> None:
+        while True:
+            try:
+                async for item in self._pubsub.listen():
+                    # "<user_id>\n<json>"; the JSON itself never contains a raw newline
+                    user_id, _, message = item["data"].partition("\n")
+                    deliver(user_id, message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Realtime subscriber error: {e}")
+                await asyncio.sleep(1.0)
+
+    async def publish(self, user_id: str, message: str) -> None:
+        await self._client.publish(self.channel, f"{user_id}\n{message}")
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(self.channel)
+            await self._pubsub.close()
+        await self._client.close()
+
+
+class ConnectionHub:
+    """
+    Maps user ids to their open WebSockets and pushes events to them.
+
+    publish() goes through the pub/sub backend so events reach users
+    connected to any worker; deliver() fans a message out to this worker's
+    connections. Each event is serialized once, however many sockets get it.
+    """
+
+    def __init__(
+        self,
+        pubsub=None,
+        max_queue_size: int = 100,
+        send_timeout: float = 10.0,
+        max_connections_per_user: int = 20
+    ):
+        self.pubsub = pubsub or LocalPubSub()
+        self.max_queue_size = max(1, max_queue_size)
+        self.send_timeout = send_timeout
+        self.max_connections_per_user = max_connections_per_user
+        self._connections: Dict[str, Set[Connection]] = {}
+        self._closing: Set[asyncio.Task] = set()
+        self.connection_count = 0
+        self.published = 0
+        self.delivered = 0
+        self.slow_consumers = 0
+        self.publish_errors = 0
+
+    async def start(self) -> None:
+        await self.pubsub.start(self.deliver)
+
+    async def stop(self) -> None:
+        await self.pubsub.stop()
+        for connections in list(self._connections.values()):
+            for connection in list(connections):
+                self.disconnect(connection, code=1001)
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def connect(self, websocket, user_id: Any) -> Optional[Connection]:
+        user_id = str(user_id)
+        connections = self._connections.setdefault(user_id, set())
+        if len(connections) >= self.max_connections_per_user:
+            return None
+        connection = Connection(websocket, user_id, self)
+        connections.add(connection)
+        self.connection_count += 1
+        return connection
+
+    def disconnect(self, connection: Connection, code: Optional[int] = None) -> None:
+        if connection.closed:
+            return
+        connection.closed = True
+        if connection._sender is not None:
+            connection._sender.cancel()
+        connections = self._connections.get(connection.user_id)
+        if connections is not None:
+            connections.discard(connection)
+            if not connections:
+                del self._connections[connection.user_id]
+        self.connection_count -= 1
+        if code is not None:
+            task = asyncio.ensure_future(connection.close(code))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    def deliver(self, user_id: str, message: str) -> int:
+        connections = self._connections.get(user_id)
+        if not connections:
+            return 0
+        delivered = 0
+        for connection in list(connections):
+            if connection.send(message):
+                delivered += 1
+        self.delivered += delivered
+        return delivered
+
+    async def publish(self, user_id: Any, event_type: str, data: Any) -> None:
+        """
+        Push an event to every connection of a user on any worker. Failures
+        are logged, never raised, so publishing cannot break the write path.
+        """
+        message = json.dumps({"type": event_type, "data": data, "ts": time.time()}, default=str)
+        try:
+            await self.pubsub.publish(str(user_id), message)
+            self.published += 1
+        except Exception as e:
+            self.publish_errors += 1
+            print(f"Realtime publish error for user {user_id}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.pubsub).__name__,
+            "users": len(self._connections),
+            "connections": self.connection_count,
+            "published": self.published,
+            "delivered": self.delivered,
+            "slow_consumers": self.slow_consumers,
+            "publish_errors": self.publish_errors
+        }
+
+
+async def publish_fraud_alerts(user_id: Any, transactions: Iterable[Dict[str, Any]], results: Iterable[Dict[str, Any]]) -> None:
+    """
+    Alert one user about the flagged transactions. user_id must come from
+    the server (a JWT subject or a stored row), never from the scored
+    payload, or any caller could push alerts to any user's sockets.
+    """
+    for transaction, result in zip(transactions, results):
+        if result.get("is_fraudulent"):
+            await hub.publish(user_id, "fraud_alert", {"transaction": transaction, "result": result})
+
+
+def create_pubsub():
+    # Fan out through Redis when configured, otherwise stay in-process
+    redis_url = os.getenv("REALTIME_REDIS_URL") or os.getenv("REDIS_URL")
+    if redis_url:
+        return RedisPubSub(redis_url)
+    return LocalPubSub()
+
+
+hub = ConnectionHub(
+    create_pubsub(),
+    max_queue_size=int(os.getenv("WS_MAX_QUEUE_SIZE", "100")),
+    send_timeout=float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10")),
+    max_connections_per_user=int(os.getenv("WS_MAX_CONNECTIONS_PER_USER", "20"))
+)
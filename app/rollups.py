@@ -0,0 +1,60 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List
+from sqlalchemy.dialects import postgresql, sqlite
+from models.database_models import DailyCategoryRollup
+
+DEFAULT_CATEGORY = "Other"
+
+
+def rollup_deltas(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Collapse transaction rows into one (user_id, day, category) delta each.
+    """
+    deltas = defaultdict(lambda: [0.0, 0])
+    for row in rows:
+        timestamp = row.get("timestamp") or datetime.utcnow()
+        key = (row["user_id"], timestamp.date(), row.get("category") or DEFAULT_CATEGORY)
+        delta = deltas[key]
+        delta[0] += row.get("amount") or 0.0
+        delta[1] += 1
+    return [
+        {
+            "user_id": user_id,
+            "day": day,
+            "category": category,
+            "total_amount": total_amount,
+            "transaction_count": transaction_count
+        }
+        for (user_id, day, category), (total_amount, transaction_count) in deltas.items()
+    ]
+
+
+def rollup_upsert(dialect_name: str):
+    """
+    INSERT ... ON CONFLICT statement that adds deltas onto existing rollup rows.
+    """
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = dialect_insert(DailyCategoryRollup)
+    return statement.on_conflict_do_update(
+        index_elements=["user_id", "day", "category"],
+        set_={
+            "total_amount": DailyCategoryRollup.total_amount + statement.excluded.total_amount,
+            "transaction_count": DailyCategoryRollup.transaction_count + statement.excluded.transaction_count
+        }
+    )
+
+
+def insights_from_rows(rows) -> Dict[str, Any]:
+    # Shape matches SpendingCategorizationModel.get_spending_insights
+    category_totals = {}
+    category_counts = {}
+    for category, total_amount, transaction_count in rows:
+        category_totals[category] = float(total_amount or 0.0)
+        category_counts[category] = int(transaction_count or 0)
+    return {
+        "category_totals": category_totals,
+        "category_counts": category_counts,
+        "total_spending": sum(category_totals.values()),
+        "transaction_count": sum(category_counts.values())
+    }
@@ -1,8 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any, List
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, List, Optional
+from datetime import date, datetime, timedelta
+import os
+import uuid
+from app import crud_async
+from app.batching import MicroBatcher
+from app.inference import InferenceQueueFull, executor_stats, get_executor
+from app.profiling import MAX_PROFILE_SECONDS, ProfilerBusy, profiler
+from app.cache import cache
+from app.realtime import hub, publish_fraud_alerts
+from app.security import get_current_user_id, require_admin
+from app.serializers import serialize_transaction, serialize_chat_message
+from app.write_behind import WriteBehindQueue
+from config.database import AsyncSessionLocal, all_pool_stats, get_async_db, get_async_replica_db
 from models.fraud_detection import FraudDetectionModel
 from models.spending_categorization import SpendingCategorizationModel
 from models.chatbot import BankingChatbot
+from models.conversation_memory import conversation_memory
 
 # Initialize router
 router = APIRouter()
@@ -12,6 +28,36 @@ fraud_model = FraudDetectionModel()
 spending_model = SpendingCategorizationModel()
 chatbot = BankingChatbot()
 
+# Model calls block, so each model gets its own bounded inference pool
+fraud_executor = get_executor("fraud_detection")
+spending_executor = get_executor("spending_categorization")
+chatbot_executor = get_executor("chatbot")
+
+# Concurrent /fraud/detect calls are coalesced into one forward pass
+fraud_batcher = MicroBatcher(
+    fraud_model.predict_batch,
+    max_batch_size=int(os.getenv("FRAUD_BATCH_MAX_SIZE", "64")),
+    max_wait_ms=float(os.getenv("FRAUD_BATCH_MAX_WAIT_MS", "2")),
+    executor=fraud_executor
+)
+
+async def _write_chat_messages(rows: List[Dict[str, Any]]) -> None:
+    async with AsyncSessionLocal() as db:
+        await crud_async.create_chat_messages_bulk(db, rows)
+
+# Chat turns are persisted in batches off the request path
+chat_message_writer = WriteBehindQueue(
+    _write_chat_messages,
+    name="chat_messages",
+    max_batch_size=int(os.getenv("CHAT_WRITE_BATCH_SIZE", "500")),
+    flush_interval_ms=float(os.getenv("CHAT_WRITE_FLUSH_MS", "50")),
+    max_queue_size=int(os.getenv("CHAT_WRITE_MAX_QUEUE", "100000")),
+    durable=os.getenv("CHAT_WRITE_DURABLE", "false").lower() == "true"
+)
+
+MAX_FRAUD_BATCH_TRANSACTIONS = int(os.getenv("FRAUD_BATCH_MAX_TRANSACTIONS", "10000"))
+MAX_BULK_TRANSACTIONS = int(os.getenv("BULK_MAX_TRANSACTIONS", "50000"))
+
 # Fraud Detection Routes
 @router.post("/fraud/detect", tags=["Fraud Detection"])
 async def detect_fraud(transaction: Dict[str, Any]):
@@ -19,10 +65,133 @@ async def detect_fraud(transaction: Dict[str, Any]):
     Detect potential fraud in a transaction using the AI model.
     """
     try:
-        result = fraud_model.predict(transaction)
-        return result
+        return await fraud_batcher.submit(transaction)
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/fraud/detect/batch", tags=["Fraud Detection"])
+async def detect_fraud_batch(transactions: List[Dict[str, Any]]):
+    """
+    Detect potential fraud in many transactions with a single model call.
+    """
+    if len(transactions) > MAX_FRAUD_BATCH_TRANSACTIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_FRAUD_BATCH_TRANSACTIONS} transactions per batch"
+        )
+    try:
+        results = await fraud_executor.run(fraud_model.predict_batch, transactions)
+        return {"results": results, "count": len(results)}
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Transaction Routes
+@router.post("/transactions/bulk", tags=["Transactions"])
+async def create_transactions_bulk(
+    transactions: List[Dict[str, Any]],
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Score, categorize and insert many transactions in one database transaction.
+    Every row must belong to the bearer token's user.
+    """
+    if len(transactions) > MAX_BULK_TRANSACTIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_BULK_TRANSACTIONS} transactions per request"
+        )
+    if any("user_id" not in t or "account_id" not in t for t in transactions):
+        raise HTTPException(status_code=422, detail="Every transaction needs user_id and account_id")
+    if any(str(t["user_id"]) != user_id for t in transactions):
+        raise HTTPException(status_code=403, detail="Transactions can only be created for the authenticated user")
+
+    try:
+        fraud_results = await fraud_executor.run(fraud_model.predict_batch, transactions)
+        uncategorized = [t for t in transactions if not t.get("category")]
+        categories = await spending_executor.run(spending_model.predict_categories, uncategorized)
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    for transaction, fraud_result in zip(transactions, fraud_results):
+        if "error" in fraud_result:
+            # Unscored rows are stored with NULL fraud fields instead of a fallback score
+            transaction["fraud_score"] = None
+            transaction["is_fraudulent"] = None
+        else:
+            transaction["fraud_score"] = fraud_result["risk_score"]
+            transaction["is_fraudulent"] = fraud_result["is_fraudulent"]
+    for transaction, category in zip(uncategorized, categories):
+        transaction["category"] = category["category"]
+
+    try:
+        inserted = await crud_async.create_transactions_bulk(db, transactions)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    # Alerts go to the token's user, like /ws/fraud, never to an id taken from the payload
+    await publish_fraud_alerts(user_id, transactions, fraud_results)
+
+    return {
+        "inserted": inserted,
+        "flagged_fraudulent": sum(1 for t in transactions if t["is_fraudulent"]),
+        "unscored": sum(1 for t in transactions if t["is_fraudulent"] is None)
+    }
+
+@router.get("/users/{user_id}/transactions", tags=["Transactions"])
+async def list_user_transactions(
+    user_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_replica_db)
+):
+    """
+    Page through a user's transactions, newest first, using an opaque cursor.
+    """
+    try:
+        transactions, next_page = await crud_async.get_user_transactions_page(db, user_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": [serialize_transaction(t) for t in transactions], "next_cursor": next_page}
+
+@router.get("/users/{user_id}/transactions/recent", tags=["Transactions"])
+async def list_recent_transactions(
+    user_id: int,
+    limit: int = Query(20, ge=1, le=crud_async.RECENT_TRANSACTIONS_LIMIT),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Return a user's most recent transactions from the read-through cache.
+    """
+    return {"items": await crud_async.get_user_recent_transactions_cached(db, user_id, limit=limit)}
+
+@router.get("/users/{user_id}/accounts", tags=["Accounts"])
+async def list_user_accounts(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Return a user's accounts and balances from the read-through cache.
+    """
+    return {"items": await crud_async.get_user_accounts_cached(db, user_id)}
+
+@router.get("/accounts/{account_id}/transactions", tags=["Transactions"])
+async def list_account_transactions(
+    account_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_replica_db)
+):
+    """
+    Page through an account's transactions, newest first, using an opaque cursor.
+    """
+    try:
+        transactions, next_page = await crud_async.get_account_transactions_page(db, account_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": [serialize_transaction(t) for t in transactions], "next_cursor": next_page}
 
 # Spending Categorization Routes
 @router.post("/spending/categorize", tags=["Spending Categorization"])
@@ -31,8 +200,23 @@ async def categorize_transaction(transaction: Dict[str, Any]):
     Categorize a single transaction using the AI model.
     """
     try:
-        result = spending_model.predict_category(transaction)
+        result = await spending_executor.run(spending_model.predict_category, transaction)
         return result
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/spending/keywords/reload", tags=["Spending Categorization"])
+async def reload_spending_keywords():
+    """
+    Recompile the merchant keyword file; requests keep using the old set until it is ready.
+    """
+    try:
+        keyword_count = await spending_executor.run(spending_model.reload_keywords)
+        return {"message": "Keywords reloaded", "keyword_count": keyword_count}
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -42,16 +226,57 @@ async def get_spending_insights(transactions: List[Dict[str, Any]]):
     Generate spending insights from a list of transactions.
     """
     try:
-        result = spending_model.get_spending_insights(transactions)
+        result = await spending_executor.run(spending_model.get_spending_insights, transactions)
         return result
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/spending/insights/{user_id}", tags=["Spending Categorization"])
+async def get_stored_spending_insights(
+    user_id: int,
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    source: str = Query("rollup", pattern="^(rollup|transactions)$"),
+    db: AsyncSession = Depends(get_async_replica_db)
+):
+    """
+    Spending insights for stored transactions, aggregated in the database.
+    Defaults to the last 30 days; `source=transactions` bypasses the daily rollup.
+    """
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=30)
+    if start > end:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+
+    if source == "transactions":
+        result = await crud_async.get_spending_insights_from_transactions(db, user_id, start, end)
+    else:
+        result = await crud_async.get_spending_insights_range(db, user_id, start, end)
+    return {**result, "from": start.isoformat(), "to": end.isoformat()}
+
 # Chatbot Routes
+async def _load_conversation(db: AsyncSession, session_id: str, user_id: Optional[int]) -> None:
+    # Sessions evicted from memory resume from their stored messages
+    await crud_async.get_or_create_chat_session(db, session_id, user_id)
+    messages = await crud_async.get_recent_chat_messages(db, session_id, limit=conversation_memory.max_turns)
+    conversation_memory.restore(session_id, [
+        {
+            "role": m.role,
+            "message": m.message,
+            "intent": m.intent,
+            "confidence": m.confidence,
+            "timestamp": m.timestamp
+        }
+        for m in messages
+    ])
+
 @router.post("/chat/message", tags=["Chatbot"])
-async def process_chat_message(request: Dict[str, Any]):
+async def process_chat_message(request: Dict[str, Any], db: AsyncSession = Depends(get_async_db)):
     """
     Process a chat message and generate a response.
+    Messages without a session_id start a new session.
     """
     try:
         message = request.get("message")
@@ -59,12 +284,43 @@ async def process_chat_message(request: Dict[str, Any]):
         
         if not message:
             raise HTTPException(status_code=400, detail="Message is required")
-        
-        result = chatbot.generate_response(message, user_context)
-        return result
+
+        session_id = str(request.get("session_id") or uuid.uuid4().hex)
+        if session_id not in conversation_memory:
+            await _load_conversation(db, session_id, request.get("user_id"))
+
+        history = conversation_memory.history(session_id)
+        result = await chatbot_executor.run(chatbot.generate_response, message, user_context, history)
+        intent, confidence = result.get("intent"), result.get("confidence")
+        turns = [
+            conversation_memory.append(session_id, "user", message, intent, confidence),
+            conversation_memory.append(session_id, "assistant", result["response"], intent, confidence)
+        ]
+        await chat_message_writer.put_many([{"session_id": session_id, **turn} for turn in turns])
+        return {**result, "session_id": session_id}
+    except HTTPException:
+        raise
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/chat/sessions/{session_id}/messages", tags=["Chatbot"])
+async def list_chat_messages(
+    session_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Page through a chat session's messages, oldest first, using an opaque cursor.
+    """
+    try:
+        messages, next_page = await crud_async.get_chat_history_page(db, session_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": [serialize_chat_message(m) for m in messages], "next_cursor": next_page}
+
 # Health Check Route
 @router.get("/health", tags=["Health"])
 async def health_check():
@@ -78,4 +334,71 @@ async def health_check():
             "spending_categorization": spending_model is not None,
             "chatbot": chatbot is not None
         }
-    } 
\ No newline at end of file
+    }
+
+@router.get("/inference/metrics", tags=["Health"])
+async def inference_metrics():
+    """
+    Report queue depth, rejections and latency for each inference pool.
+    """
+    return executor_stats()
+
+@router.get("/write-behind/metrics", tags=["Health"])
+async def write_behind_metrics():
+    """
+    Report queue depth, batch sizes and flush latency for buffered writes.
+    """
+    return {"chat_messages": chat_message_writer.stats()}
+
+@router.get("/realtime/metrics", tags=["Health"])
+async def realtime_metrics():
+    """
+    Report connected users, sockets and event delivery counters for this worker.
+    """
+    return hub.stats()
+
+@router.get("/cache/metrics", tags=["Health"])
+async def cache_metrics():
+    """
+    Report hit and miss counters for the read-through and categorization caches.
+    """
+    return {
+        "read_through": cache.stats(),
+        "categorization": spending_model.cache.stats(),
+        "conversation_memory": conversation_memory.stats()
+    }
+
+@router.get("/db/pool/stats", tags=["Health"])
+async def db_pool_stats():
+    """
+    Report size, in-use and overflow connections, checkout waits and timeouts for each database pool.
+    """
+    return all_pool_stats()
+
+# Admin Routes
+@router.get("/admin/profile", tags=["Admin"], dependencies=[Depends(require_admin)])
+async def profile_worker(
+    seconds: float = Query(10.0, gt=0, le=MAX_PROFILE_SECONDS),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    block_threshold_ms: float = Query(50.0, ge=1),
+    include_idle: bool = False,
+    format: str = Query("collapsed", pattern="^(collapsed|json)$")
+):
+    """
+    Sample this worker's stacks for `seconds` and return collapsed stacks for a flamegraph.
+    Event-loop lag and blocking episodes come back in X-Loop-Lag-* headers, or in full with format=json.
+    """
+    try:
+        session = await profiler.profile(seconds, interval_ms, block_threshold_ms, include_idle)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    summary = session.summary()
+    if format == "json":
+        return {**summary, "collapsed": session.collapsed().splitlines()}
+    return PlainTextResponse(session.collapsed(), headers={
+        "X-Profile-Samples": str(summary["samples"]),
+        "X-Loop-Lag-P99-Ms": f"{summary['loop_lag']['p99_ms']:.3f}",
+        "X-Loop-Lag-Max-Ms": f"{summary['loop_lag']['max_ms']:.3f}",
+        "X-Blocking-Events": str(len(summary["blocking"]))
+    })
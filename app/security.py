@@ -0,0 +1,53 @@
+import hmac
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import Header, HTTPException
+from jose import JWTError, jwt
+
+JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+# Admin endpoints are disabled until this is set
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+def create_access_token(user_id: int, expires_delta: Optional[timedelta] = None) -> str:
+    if not JWT_SECRET_KEY:
+        raise RuntimeError("JWT_SECRET_KEY is not configured")
+    expires = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    return jwt.encode({"sub": str(user_id), "exp": expires}, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+
+
+def decode_access_token(token: Optional[str]) -> Optional[str]:
+    """
+    Return the user id in a valid, unexpired token, or None.
+    """
+    if not token or not JWT_SECRET_KEY:
+        return None
+    try:
+        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    except JWTError:
+        return None
+    subject = payload.get("sub")
+    return str(subject) if subject is not None else None
+
+
+def get_current_user_id(authorization: Optional[str] = Header(None)) -> str:
+    """
+    Dependency for endpoints that act for a user, authenticated by an
+    `Authorization: Bearer <jwt>` header. Returns the token's user id.
+    """
+    scheme, _, credentials = (authorization or "").partition(" ")
+    user_id = decode_access_token(credentials) if scheme.lower() == "bearer" else None
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Valid bearer token required", headers={"WWW-Authenticate": "Bearer"})
+    return user_id
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Dependency for operator-only endpoints, authenticated by the X-Admin-Token header.
+    """
+    if not ADMIN_TOKEN or not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Admin token required")
@@ -0,0 +1,44 @@
+from typing import Any, Dict
+from models.database_models import Account, Transaction, ChatMessage
+
+
+def serialize_account(account: Account) -> Dict[str, Any]:
+    return {
+        "id": account.id,
+        "user_id": account.user_id,
+        "account_type": account.account_type,
+        "account_number": account.account_number,
+        "balance": account.balance,
+        "currency": account.currency,
+        "is_active": account.is_active
+    }
+
+
+def serialize_transaction(transaction: Transaction) -> Dict[str, Any]:
+    return {
+        "id": transaction.id,
+        "user_id": transaction.user_id,
+        "account_id": transaction.account_id,
+        "transaction_type": transaction.transaction_type,
+        "amount": transaction.amount,
+        "currency": transaction.currency,
+        "description": transaction.description,
+        "merchant": transaction.merchant,
+        "category": transaction.category,
+        "timestamp": transaction.timestamp.isoformat() if transaction.timestamp else None,
+        "location": transaction.location,
+        "is_fraudulent": transaction.is_fraudulent,
+        "fraud_score": transaction.fraud_score
+    }
+
+
+def serialize_chat_message(message: ChatMessage) -> Dict[str, Any]:
+    return {
+        "id": message.id,
+        "session_id": message.session_id,
+        "message": message.message,
+        "role": message.role,
+        "timestamp": message.timestamp.isoformat() if message.timestamp else None,
+        "intent": message.intent,
+        "confidence": message.confidence
+    }
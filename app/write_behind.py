@@ -0,0 +1,163 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class WriteBehindQueue:
+    """
+    Buffers rows in memory and writes them in batches off the request path.
+
+    A batch is flushed when it reaches `max_batch_size` rows or when the
+    oldest buffered row has waited `flush_interval_ms`, whichever comes
+    first. Batches are written one at a time, in arrival order, by a single
+    worker task started on first use. Failed batches are retried with
+    backoff up to `max_retries` times before they are dropped.
+
+    put() returns as soon as the row is queued. In durable mode it instead
+    waits until the row's batch has been written, and raises if it could not
+    be. A full queue makes put() wait, which pushes back on callers instead
+    of growing memory without bound.
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[Any]], Awaitable[Any]],
+        name: str = "write_behind",
+        max_batch_size: int = 500,
+        flush_interval_ms: float = 50.0,
+        max_queue_size: int = 100000,
+        max_retries: int = 3,
+        durable: bool = False
+    ):
+        self.write_batch = write_batch
+        self.name = name
+        self.max_batch_size = max(1, max_batch_size)
+        self.flush_interval_ms = max(0.0, flush_interval_ms)
+        self.max_queue_size = max_queue_size
+        self.max_retries = max_retries
+        self.durable = durable
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._closed = False
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.dropped = 0
+        self.total_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._worker = asyncio.create_task(self._run())
+
+    async def put(self, row: Any) -> None:
+        if self._closed:
+            raise RuntimeError(f"Write-behind queue '{self.name}' is shut down")
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future() if self.durable else None
+        await self._queue.put((row, future))
+        self.enqueued += 1
+        if future is not None:
+            await future
+
+    async def put_many(self, rows: List[Any]) -> None:
+        if self.durable:
+            await asyncio.gather(*(self.put(row) for row in rows))
+        else:
+            for row in rows:
+                await self.put(row)
+
+    async def _collect(self) -> List[Tuple[Any, Optional[asyncio.Future]]]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already queued before waiting on the timer
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            remaining = deadline - time.monotonic()
+            if len(batch) >= self.max_batch_size or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[Tuple[Any, Optional[asyncio.Future]]]) -> None:
+        rows = [row for row, _ in batch]
+        error: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                await self.write_batch(rows)
+                error = None
+                break
+            except Exception as e:
+                error = e
+                if attempt < self.max_retries:
+                    self.retries += 1
+                    await asyncio.sleep(0.1 * 2 ** attempt)
+            finally:
+                elapsed = time.perf_counter() - started
+                self.total_flush_seconds += elapsed
+                self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+
+        if error is None:
+            self.written += len(rows)
+            self.batches += 1
+        else:
+            self.dropped += len(rows)
+            print(f"Write-behind '{self.name}' dropped {len(rows)} rows: {error}")
+
+        for _, future in batch:
+            if future is not None and not future.done():
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+
+    async def drain(self) -> None:
+        # Wait until every row queued so far has been written or dropped
+        if self._queue is not None and self._worker is not None and not self._worker.done():
+            await self._queue.join()
+
+    async def shutdown(self) -> None:
+        """
+        Stop accepting rows, flush everything already queued, then stop the worker.
+        """
+        self._closed = True
+        await self.drain()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "durable": self.durable,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "retries": self.retries,
+            "dropped": self.dropped,
+            "avg_batch_size": self.written / self.batches if self.batches else 0.0,
+            "avg_flush_ms": 1000 * self.total_flush_seconds / self.batches if self.batches else 0.0,
+            "max_flush_ms": 1000 * self.max_flush_seconds
+        }
@@ -0,0 +1,178 @@
+import os
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Metric primitives and the process-wide registry. They live outside app/ so
+# the model layer can record its timings without depending on the web app;
+# the HTTP and SQL instrumentation is in app/metrics.py.
+
+# Set METRICS_ENABLED=false to skip the request middleware, SQL hooks and model timings
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+INFERENCE_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# A collector returns (name, type, help, [(labels, value), ...]) families read at scrape time
+Family = Tuple[str, str, str, List[Tuple[Dict[str, Any], float]]]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            lines.append(f"{self.name}{_format_labels(dict(zip(self.labelnames, labels)))} {value}")
+        return lines
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. observe() is one bisect and three additions
+    under a lock; buckets are only made cumulative when scraped.
+    """
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        for labels, counts, total, count in series:
+            label_map = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels({**label_map, 'le': le})} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(label_map)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(label_map)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[Any] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                print(f"Metrics collector error: {e}")
+                continue
+            for name, metric_type, help, samples in families:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {float(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+MODEL_INFERENCE = registry.histogram(
+    "model_inference_seconds", "Model call time by phase", ("model", "phase"), buckets=INFERENCE_BUCKETS
+)
+MODEL_ERRORS = registry.counter("model_errors_total", "Model calls that failed and returned a fallback result", ("model", "operation"))
+
+
+def observe_phases(model: str, start: float, **phase_ends: float) -> None:
+    """
+    Record consecutive phases of one model call. Pass perf_counter()
+    readings taken as each phase finished, in order; each phase runs
+    from the end of the previous one.
+    """
+    if not METRICS_ENABLED:
+        return
+    previous = start
+    for phase, end in phase_ends.items():
+        MODEL_INFERENCE.observe(end - previous, model, phase)
+        previous = end
+
+
+def stats_families(
+    prefix: str,
+    help: str,
+    stats_by_name: Dict[str, Dict[str, Any]],
+    label: str,
+    gauges: Optional[Dict[str, str]] = None,
+    counters: Optional[Dict[str, str]] = None
+) -> List[Family]:
+    """
+    Turn {name: stats()} dicts, as returned by the various stats()
+    methods, into one family per field. `gauges` are point-in-time values;
+    `counters` are running totals and are exported as <prefix>_<field>_total
+    so rate() and counter-reset handling work on them.
+    """
+    families = []
+    for metric_type, fields, suffix in (("gauge", gauges or {}, ""), ("counter", counters or {}, "_total")):
+        for field, field_help in fields.items():
+            samples = [
+                ({label: name}, stats[field])
+                for name, stats in stats_by_name.items()
+                if isinstance(stats.get(field), (int, float))
+            ]
+            if samples:
+                families.append((f"{prefix}_{field}{suffix}", metric_type, f"{help}: {field_help}", samples))
+    return families
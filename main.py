@@ -1,13 +1,28 @@
-from fastapi import FastAPI, HTTPException, Depends, WebSocket
+from fastapi import FastAPI, HTTPException, Depends, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.security import OAuth2PasswordBearer
 import uvicorn
+import asyncio
+import functools
 import os
+from typing import Optional
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+from app.routes import router, chat_message_writer, fraud_executor, fraud_model, spending_executor, spending_model
+from app.cache import cache
+from app.fraud_stream import FraudStreamSession
+from app.inference import executor_stats, shutdown_executors
+from app.metrics import METRICS_ENABLED, MetricsMiddleware, instrument_sqlalchemy, registry, stats_families
+from app.realtime import hub, publish_fraud_alerts
+from app.security import decode_access_token
+from config.database import SessionLocal, all_pool_stats, async_engine, async_replica_engine
+from models.conversation_memory import conversation_memory
+from models.velocity_store import velocity_store
+
 # Initialize FastAPI app
 app = FastAPI(
     title="AI Banking Backend",
@@ -24,23 +39,165 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if METRICS_ENABLED:
+    # Added last so it is outermost and times the whole request
+    app.add_middleware(MetricsMiddleware)
+    instrument_sqlalchemy()
+
+def collect_runtime_metrics():
+    # Read at scrape time from the stats() the components already keep; running totals are counters
+    return (
+        stats_families("cache", "Cache", {
+            "read_through": cache.stats(),
+            "categorization": spending_model.cache.stats()
+        }, "cache",
+            gauges={"hit_rate": "hits / lookups"},
+            counters={"hits": "lookups served from cache", "misses": "lookups that went to the source"})
+        + stats_families("db_pool", "Database pool", all_pool_stats(), "role",
+            gauges={"size": "pooled connections", "in_use": "checked-out connections",
+                    "overflow": "connections beyond the pool size", "max_wait_ms": "longest checkout wait"},
+            counters={"checkouts": "successful checkouts", "timeouts": "checkouts that timed out"})
+        + stats_families("inference", "Inference pool", executor_stats(), "model",
+            gauges={"running": "calls running", "queued": "calls waiting"},
+            counters={"rejected": "calls rejected because the queue was full"})
+        + stats_families("write_behind", "Write-behind queue", {chat_message_writer.name: chat_message_writer.stats()}, "queue",
+            gauges={"queued": "rows waiting"},
+            counters={"written": "rows written", "dropped": "rows dropped after retries"})
+        + stats_families("realtime", "WebSocket hub", {"hub": hub.stats()}, "hub",
+            gauges={"connections": "open connections"},
+            counters={"slow_consumers": "connections closed for falling behind"})
+        + stats_families("conversation_memory", "Chat conversation memory", {"chat": conversation_memory.stats()}, "memory",
+            gauges={"sessions": "sessions held"},
+            counters={"evicted": "sessions evicted"})
+    )
+
+registry.register_collector(collect_runtime_metrics)
+
 # OAuth2 scheme for JWT authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Mount the API routes
+app.include_router(router, prefix="/api/v1")
+
+FRAUD_STREAM_WINDOW = int(os.getenv("FRAUD_STREAM_WINDOW", "4096"))
+FRAUD_STREAM_BATCH_SIZE = int(os.getenv("FRAUD_STREAM_BATCH_SIZE", "512"))
+FRAUD_STREAM_MAX_WAIT_MS = float(os.getenv("FRAUD_STREAM_MAX_WAIT_MS", "2"))
+HOUSEKEEPING_INTERVAL_SECONDS = float(os.getenv("HOUSEKEEPING_INTERVAL_SECONDS", "30"))
+background_tasks = set()
+
+async def housekeeping():
+    # Periodic upkeep that must never run on the request path
+    while True:
+        await asyncio.sleep(HOUSEKEEPING_INTERVAL_SECONDS)
+        try:
+            velocity_store.evict_idle()
+            conversation_memory.evict_idle()
+            await spending_executor.run(spending_model.reload_keywords_if_changed)
+        except Exception as e:
+            print(f"Housekeeping error: {e}")
+
+@app.on_event("startup")
+async def startup_event():
+    background_tasks.add(asyncio.create_task(housekeeping()))
+    await hub.start()
+
+    # Warm the fraud velocity store from recent transactions
+    lookback_hours = float(os.getenv("VELOCITY_WARM_START_HOURS", "24"))
+    if lookback_hours > 0:
+        db = SessionLocal()
+        try:
+            loaded = velocity_store.warm_start(db, lookback_hours=lookback_hours)
+            print(f"Velocity store warmed with {loaded} transactions")
+        except Exception as e:
+            print(f"Error warming velocity store: {e}")
+        finally:
+            db.close()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in background_tasks:
+        task.cancel()
+    # Flush buffered chat messages before the process exits
+    await chat_message_writer.shutdown()
+    await hub.stop()
+    shutdown_executors()
+    await async_engine.dispose()
+    await async_replica_engine.dispose()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to AI Banking Backend"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+def websocket_token(websocket: WebSocket, token: Optional[str]) -> Optional[str]:
+    # Browsers cannot set headers on WebSockets, so the token may come as ?token=
+    if token:
+        return token
+    authorization = websocket.headers.get("authorization", "")
+    scheme, _, credentials = authorization.partition(" ")
+    return credentials if scheme.lower() == "bearer" else None
+
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(websocket: WebSocket, token: Optional[str] = None):
+    """
+    Push channel for the authenticated user's fraud alerts, transactions and balance updates.
+    """
+    user_id = decode_access_token(websocket_token(websocket, token))
+    if user_id is None:
+        await websocket.close(code=1008)
+        return
+
     await websocket.accept()
+    connection = hub.connect(websocket, user_id)
+    if connection is None:
+        await websocket.close(code=1008, reason="Too many connections")
+        return
     try:
         while True:
+            # Clients only send keepalives; events flow server to client
             data = await websocket.receive_text()
-            # Process real-time data here
-            await websocket.send_text(f"Message received: {data}")
+            if data == "ping":
+                connection.send('{"type": "pong"}')
+    except WebSocketDisconnect:
+        pass
     except Exception as e:
         print(f"WebSocket error: {e}")
+    finally:
+        hub.disconnect(connection)
+
+async def score_fraud_batch(transactions):
+    return await fraud_executor.run(fraud_model.predict_batch, transactions)
+
+@app.websocket("/ws/fraud")
+async def fraud_stream_endpoint(websocket: WebSocket, token: Optional[str] = None):
+    """
+    Pipelined fraud scoring: transactions in, scores out, matched by correlation id.
+    """
+    user_id = decode_access_token(websocket_token(websocket, token))
+    if user_id is None:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    session = FraudStreamSession(
+        websocket,
+        score_fraud_batch,
+        # Alerts go to the token's user, whatever user_id the streamed transactions claim
+        on_results=functools.partial(publish_fraud_alerts, user_id),
+        window=FRAUD_STREAM_WINDOW,
+        max_batch_size=FRAUD_STREAM_BATCH_SIZE,
+        max_wait_ms=FRAUD_STREAM_MAX_WAIT_MS
+    )
+    try:
+        await session.run()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"Fraud stream error: {e}")
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    # wsproto keeps idle WebSocket connections far smaller than the websockets backend
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, ws="wsproto") 
\ No newline at end of file
@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class CategoryMemoCache:
+    """
+    Bounded LRU + TTL memo of categorization results keyed by the exact
+    text the categorizer scores. Keys must not be normalized any further
+    than the categorizer itself does, or two inputs it would tell apart
+    share one answer.
+
+    clear() bumps `generation`. Callers read it before computing a result
+    and pass it to put(), so a result computed with the model or keywords
+    from before a reload is dropped instead of cached.
+    """
+
+    def __init__(self, max_entries: int = 50000, ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.generation = 0
+        self.stale_puts = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: Any, generation: Optional[int] = None) -> None:
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                self.stale_puts += 1
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+            self.generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "stale_puts": self.stale_puts,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
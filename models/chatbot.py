@@ -1,18 +1,95 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import json
 import re
+import time
+from config.metrics import MODEL_ERRORS, observe_phases
+
+# Intent patterns, in priority order for ties
+INTENT_PATTERNS = {
+    'balance': r'(balance|how much.*account)',
+    'transfer': r'(transfer|send money)',
+    'transaction_history': r'(transactions|spending|history)',
+    'bill_pay': r'(pay.*bill|bill.*payment)',
+    'account_info': r'(account.*info|details)',
+    'help': r'(help|support|assist)'
+}
+
+RESPONSES = {
+    'balance': "I can help you check your balance. Your current balance is [BALANCE]. Would you like to see a breakdown by account?",
+    'transfer': "I can help you transfer money. Would you like to make a transfer between your accounts or send money to someone else?",
+    'transaction_history': "I can show you your recent transactions. Would you like to see them by category or chronologically?",
+    'bill_pay': "I can help you pay bills. Which bill would you like to pay?",
+    'account_info': "I can provide your account details. What specific information would you like to know?",
+    'help': "I'm here to help! I can assist with checking balances, making transfers, paying bills, and more. What would you like to do?",
+    'general': "I'm here to help with your banking needs. Could you please be more specific about what you'd like to do?"
+}
+
+SUGGESTIONS = {
+    'balance': [
+        {"text": "View all accounts", "action": "VIEW_ACCOUNTS"},
+        {"text": "Download statement", "action": "DOWNLOAD_STATEMENT"}
+    ],
+    'transfer': [
+        {"text": "New transfer", "action": "NEW_TRANSFER"},
+        {"text": "View recent transfers", "action": "VIEW_TRANSFERS"}
+    ],
+    'transaction_history': [
+        {"text": "Filter by date", "action": "FILTER_DATE"},
+        {"text": "Filter by category", "action": "FILTER_CATEGORY"}
+    ],
+    'bill_pay': [
+        {"text": "View upcoming bills", "action": "VIEW_BILLS"},
+        {"text": "Set up autopay", "action": "SETUP_AUTOPAY"}
+    ],
+    'account_info': [
+        {"text": "View account details", "action": "VIEW_DETAILS"},
+        {"text": "Update preferences", "action": "UPDATE_PREFERENCES"}
+    ],
+    'help': [
+        {"text": "Contact support", "action": "CONTACT_SUPPORT"},
+        {"text": "View FAQs", "action": "VIEW_FAQS"}
+    ]
+}
+
+DEFAULT_SUGGESTIONS = [
+    {"text": "View all services", "action": "VIEW_SERVICES"},
+    {"text": "Contact support", "action": "CONTACT_SUPPORT"}
+]
+
+PUNCTUATION = re.compile(r'[^\w\s]')
+
+
+class IntentEngine:
+    """
+    Finds every matching intent in a message. Patterns are compiled once
+    and each is searched in turn; with a handful of short patterns this
+    beats any prefilter pass over the message.
+    """
+
+    def __init__(self, patterns: Dict[str, str]):
+        # Dicts keep insertion order, so this is also the tie-break order
+        self.patterns = [(intent, re.compile(pattern)) for intent, pattern in patterns.items()]
+
+    def match(self, processed_message: str) -> List[Tuple[str, float]]:
+        """
+        All matching intents scored by how much of the message their match
+        covers (0.5-1.0), best first; ties keep pattern order.
+        """
+        length = len(processed_message)
+        scored = []
+        for intent, pattern in self.patterns:
+            match = pattern.search(processed_message)
+            if match:
+                scored.append((intent, round(0.5 + 0.5 * (match.end() - match.start()) / length, 4)))
+        # sort() is stable, so equal scores stay in pattern order
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored
+
 
 class BankingChatbot:
     def __init__(self):
-        self.conversation_history = []
-        self.intents = {
-            'balance': r'(balance|how much.*account)',
-            'transfer': r'(transfer|send money)',
-            'transaction_history': r'(transactions|spending|history)',
-            'bill_pay': r'(pay.*bill|bill.*payment)',
-            'account_info': r'(account.*info|details)',
-            'help': r'(help|support|assist)'
-        }
+        self.intents = INTENT_PATTERNS
+        self.intent_engine = IntentEngine(self.intents)
         self.load_model()
 
     def load_model(self):
@@ -22,61 +99,73 @@ class BankingChatbot:
             pass
         except Exception as e:
             print(f"Error loading chatbot model: {e}")
+            MODEL_ERRORS.inc("chatbot", "load_model")
 
     def preprocess_message(self, message: str) -> str:
         # Clean and normalize the input message
         message = message.lower().strip()
-        message = re.sub(r'[^\w\s]', '', message)
+        message = PUNCTUATION.sub('', message)
         return message
 
+    def detect_intents(self, message: str) -> List[Tuple[str, float]]:
+        return self.intent_engine.match(self.preprocess_message(message))
+
     def detect_intent(self, message: str) -> str:
-        processed_message = self.preprocess_message(message)
-        
-        for intent, pattern in self.intents.items():
-            if re.search(pattern, processed_message):
-                return intent
-        
-        return 'general'
-
-    def generate_response(self, message: str, user_context: Dict[str, Any] = None) -> Dict[str, Any]:
+        intents = self.detect_intents(message)
+        return intents[0][0] if intents else 'general'
+
+    @staticmethod
+    def previous_intent(history: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+        # Intent of the most recent user turn, if it had one
+        for turn in reversed(history or []):
+            if turn.get("role") == "user":
+                intent = turn.get("intent")
+                return intent if intent not in (None, 'general', 'error') else None
+        return None
+
+    def generate_response(
+        self,
+        message: str,
+        user_context: Dict[str, Any] = None,
+        history: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        `history` is the session's earlier turns, oldest first. A message
+        that matches no intent is taken as a follow-up to the previous user
+        turn, e.g. "and last month?" after a spending question.
+        """
         try:
+            start = time.perf_counter()
             # Process the message
-            intent = self.detect_intent(message)
-            
-            # Update conversation history
-            self.conversation_history.append({
-                "role": "user",
-                "message": message
-            })
+            processed_message = self.preprocess_message(message)
+            preprocessed = time.perf_counter()
+            intents = self.intent_engine.match(processed_message)
+            matched = time.perf_counter()
+            follow_up = False
+            if intents:
+                intent, confidence = intents[0]
+            else:
+                previous = self.previous_intent(history)
+                follow_up = previous is not None
+                intent, confidence = (previous or 'general'), 0.5
             
             # Generate response based on intent
-            responses = {
-                'balance': "I can help you check your balance. Your current balance is [BALANCE]. Would you like to see a breakdown by account?",
-                'transfer': "I can help you transfer money. Would you like to make a transfer between your accounts or send money to someone else?",
-                'transaction_history': "I can show you your recent transactions. Would you like to see them by category or chronologically?",
-                'bill_pay': "I can help you pay bills. Which bill would you like to pay?",
-                'account_info': "I can provide your account details. What specific information would you like to know?",
-                'help': "I'm here to help! I can assist with checking balances, making transfers, paying bills, and more. What would you like to do?",
-                'general': "I'm here to help with your banking needs. Could you please be more specific about what you'd like to do?"
-            }
-            
-            response = responses.get(intent, responses['general'])
+            response = RESPONSES.get(intent, RESPONSES['general'])
             
-            # Update conversation history
-            self.conversation_history.append({
-                "role": "assistant",
-                "message": response
-            })
-            
-            return {
+            result = {
                 "response": response,
                 "intent": intent,
-                "confidence": 0.85,
+                "confidence": confidence,
+                "intents": [{"intent": name, "score": score} for name, score in intents],
+                "follow_up": follow_up,
                 "requires_auth": intent not in ['help', 'general'],
                 "suggested_actions": self.get_suggested_actions(intent)
             }
+            observe_phases("chatbot", start, preprocess=preprocessed, forward=matched, postprocess=time.perf_counter())
+            return result
         except Exception as e:
             print(f"Error generating chatbot response: {e}")
+            MODEL_ERRORS.inc("chatbot", "generate_response")
             return {
                 "error": str(e),
                 "response": "I apologize, but I'm having trouble processing your request. Please try again or contact support if the issue persists.",
@@ -88,34 +177,4 @@ class BankingChatbot:
 
     def get_suggested_actions(self, intent: str) -> List[Dict[str, str]]:
         # Return relevant suggested actions based on the detected intent
-        suggestions = {
-            'balance': [
-                {"text": "View all accounts", "action": "VIEW_ACCOUNTS"},
-                {"text": "Download statement", "action": "DOWNLOAD_STATEMENT"}
-            ],
-            'transfer': [
-                {"text": "New transfer", "action": "NEW_TRANSFER"},
-                {"text": "View recent transfers", "action": "VIEW_TRANSFERS"}
-            ],
-            'transaction_history': [
-                {"text": "Filter by date", "action": "FILTER_DATE"},
-                {"text": "Filter by category", "action": "FILTER_CATEGORY"}
-            ],
-            'bill_pay': [
-                {"text": "View upcoming bills", "action": "VIEW_BILLS"},
-                {"text": "Set up autopay", "action": "SETUP_AUTOPAY"}
-            ],
-            'account_info': [
-                {"text": "View account details", "action": "VIEW_DETAILS"},
-                {"text": "Update preferences", "action": "UPDATE_PREFERENCES"}
-            ],
-            'help': [
-                {"text": "Contact support", "action": "CONTACT_SUPPORT"},
-                {"text": "View FAQs", "action": "VIEW_FAQS"}
-            ]
-        }
-        
-        return suggestions.get(intent, [
-            {"text": "View all services", "action": "VIEW_SERVICES"},
-            {"text": "Contact support", "action": "CONTACT_SUPPORT"}
-        ]) 
\ No newline at end of file
+        return SUGGESTIONS.get(intent, DEFAULT_SUGGESTIONS)
@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+class _Conversation:
+    __slots__ = ('turns', 'last_seen')
+
+    def __init__(self, max_turns: int):
+        self.turns = deque(maxlen=max_turns)
+        self.last_seen = 0.0
+
+
+class ConversationMemory:
+    """
+    Bounded per-session chatbot conversation state keyed by ChatSession.session_id.
+
+    Each session keeps its last `max_turns` turns. At most `max_sessions`
+    sessions are held; the least recently used is evicted first, and
+    evict_idle() drops sessions not seen for `max_idle_seconds`. This is
+    only the chatbot's working context: every turn is also written to
+    chat_messages, and evicted sessions are restored from there.
+    """
+
+    def __init__(
+        self,
+        max_turns: int = 20,
+        max_sessions: int = 10000,
+        max_idle_seconds: float = 1800.0,
+        clock: Callable[[], float] = time.time
+    ):
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self.max_idle_seconds = max_idle_seconds
+        self.clock = clock
+        self._sessions: "OrderedDict[str, _Conversation]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def _conversation(self, session_id: str) -> _Conversation:
+        conversation = self._sessions.get(session_id)
+        if conversation is None:
+            conversation = _Conversation(self.max_turns)
+            self._sessions[session_id] = conversation
+            if len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._sessions.move_to_end(session_id)
+        conversation.last_seen = self.clock()
+        return conversation
+
+    def restore(self, session_id: str, turns: List[Dict[str, Any]]) -> None:
+        """
+        Seed a session with turns already stored in chat_messages, oldest first.
+        """
+        with self._lock:
+            conversation = self._conversation(session_id)
+            conversation.turns.extend(turns)
+
+    def append(
+        self,
+        session_id: str,
+        role: str,
+        message: str,
+        intent: Optional[str] = None,
+        confidence: Optional[float] = None
+    ) -> Dict[str, Any]:
+        turn = {
+            "role": role,
+            "message": message,
+            "intent": intent,
+            "confidence": confidence,
+            "timestamp": datetime.utcnow()
+        }
+        with self._lock:
+            conversation = self._conversation(session_id)
+            conversation.turns.append(turn)
+        return turn
+
+    def history(self, session_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            conversation = self._sessions.get(session_id)
+            return list(conversation.turns) if conversation is not None else []
+
+    def evict_idle(self, max_idle_seconds: Optional[float] = None) -> int:
+        cutoff = self.clock() - (max_idle_seconds if max_idle_seconds is not None else self.max_idle_seconds)
+        evicted = 0
+        with self._lock:
+            # Sessions are kept in LRU order, so idle ones sit at the front
+            while self._sessions:
+                session_id, conversation = next(iter(self._sessions.items()))
+                if conversation.last_seen > cutoff:
+                    break
+                del self._sessions[session_id]
+                evicted += 1
+        self.evicted += evicted
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "evicted": self.evicted
+        }
+
+
+# Shared by the chat routes
+conversation_memory = ConversationMemory(
+    max_turns=int(os.getenv("CHAT_MEMORY_MAX_TURNS", "20")),
+    max_sessions=int(os.getenv("CHAT_MEMORY_MAX_SESSIONS", "10000")),
+    max_idle_seconds=float(os.getenv("CHAT_MEMORY_MAX_IDLE_SECONDS", "1800"))
+)
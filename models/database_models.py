@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from config.database import Base
 from datetime import datetime
@@ -55,6 +55,22 @@ class Transaction(Base):
     user = relationship("User", back_populates="transactions")
     account = relationship("Account", back_populates="transactions")
 
+    # Composite indexes backing keyset pagination of transaction history
+    __table_args__ = (
+        Index("ix_transactions_user_timestamp_id", "user_id", timestamp.desc(), id.desc()),
+        Index("ix_transactions_account_timestamp_id", "account_id", timestamp.desc(), id.desc()),
+    )
+
+class DailyCategoryRollup(Base):
+    __tablename__ = "daily_category_rollup"
+
+    # Per-user, per-day, per-category totals maintained on every transaction insert
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    category = Column(String(50), primary_key=True)
+    total_amount = Column(Float, default=0.0)
+    transaction_count = Column(Integer, default=0)
+
 class ChatSession(Base):
     __tablename__ = "chat_sessions"
 
@@ -75,4 +91,8 @@ class ChatMessage(Base):
     timestamp = Column(DateTime, default=datetime.utcnow)
     intent = Column(String(50), nullable=True)
     confidence = Column(Float, nullable=True)
-    message_data = Column(JSON, nullable=True) 
\ No newline at end of file
+    message_data = Column(JSON, nullable=True)
+
+    __table_args__ = (
+        Index("ix_chat_messages_session_timestamp", "session_id", "timestamp"),
+    ) 
\ No newline at end of file
@@ -1,12 +1,29 @@
 import tensorflow as tf
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 import json
+import os
+import time
+from config.metrics import MODEL_ERRORS, observe_phases
+from models.fraud_features import FraudFeaturePipeline, NUM_FEATURES
+from models.velocity_store import VelocityFeatureStore, velocity_store
+
+# Supported ways of running the forward pass:
+#   keras - tf.keras predict_on_batch
+#   graph - traced tf.function with a fixed input signature
+#   numpy - exported Dense weights evaluated with NumPy matmuls
+INFERENCE_MODES = ('keras', 'graph', 'numpy')
 
 class FraudDetectionModel:
-    def __init__(self):
+    def __init__(self, inference_mode: Optional[str] = None, feature_store: Optional[VelocityFeatureStore] = None):
         # Initialize model parameters
         self.model = None
+        self.feature_pipeline = FraudFeaturePipeline(feature_store or velocity_store)
+        self.inference_mode = inference_mode or os.getenv("FRAUD_INFERENCE_MODE", "graph")
+        if self.inference_mode not in INFERENCE_MODES:
+            raise ValueError(f"Unknown inference mode '{self.inference_mode}', expected one of {INFERENCE_MODES}")
+        self._graph_forward = None
+        self._numpy_layers = None
         self.load_model()
 
     def load_model(self):
@@ -14,43 +31,172 @@ class FraudDetectionModel:
             # Load the model architecture from the JS file and convert it to a TF model
             # This is a placeholder - you'll need to properly convert your JS model
             self.model = tf.keras.Sequential([
-                tf.keras.layers.Dense(64, activation='relu', input_shape=(30,)),
+                tf.keras.layers.Dense(64, activation='relu', input_shape=(NUM_FEATURES,)),
                 tf.keras.layers.Dense(32, activation='relu'),
                 tf.keras.layers.Dense(1, activation='sigmoid')
             ])
             self.model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
+            self.build_fast_paths()
         except Exception as e:
             print(f"Error loading fraud detection model: {e}")
+            MODEL_ERRORS.inc("fraud_detection", "load_model")
+
+    def build_fast_paths(self):
+        """
+        Trace the graph-mode forward pass and export NumPy weights.
+        Call again whenever the model weights change.
+        """
+        n_features = self.model.input_shape[-1]
+        model = self.model
+
+        @tf.function(input_signature=[tf.TensorSpec(shape=[None, n_features], dtype=tf.float32)])
+        def graph_forward(features):
+            return model(features, training=False)
+
+        # Trace once up front so the first request does not pay for it
+        graph_forward(tf.zeros((1, n_features), dtype=tf.float32))
+        self._graph_forward = graph_forward
+
+        self.export_numpy_weights()
+        if self.inference_mode == 'numpy':
+            max_error = self.verify_numpy_forward()
+            if max_error is None or max_error > 1e-4:
+                print(f"NumPy forward pass disagrees with Keras (max error {max_error}), using graph mode")
+                self.inference_mode = 'graph'
+
+    def export_numpy_weights(self):
+        # Only plain Dense stacks with relu/sigmoid/linear activations can be exported
+        layers = []
+        for layer in self.model.layers:
+            if not isinstance(layer, tf.keras.layers.Dense):
+                self._numpy_layers = None
+                return
+            activation = layer.activation.__name__
+            if activation not in ('relu', 'sigmoid', 'linear'):
+                self._numpy_layers = None
+                return
+            weights, bias = layer.get_weights()
+            layers.append((weights.astype(np.float32), bias.astype(np.float32), activation))
+        self._numpy_layers = layers
+
+    def _numpy_forward(self, features: np.ndarray) -> np.ndarray:
+        outputs = np.asarray(features, dtype=np.float32)
+        for weights, bias, activation in self._numpy_layers:
+            outputs = outputs @ weights
+            outputs += bias
+            if activation == 'relu':
+                np.maximum(outputs, 0, out=outputs)
+            elif activation == 'sigmoid':
+                outputs = 1.0 / (1.0 + np.exp(-outputs))
+        return outputs
+
+    def verify_numpy_forward(self, n_samples: int = 256, atol: float = 1e-4) -> Optional[float]:
+        """
+        Compare the NumPy forward pass with Keras on random inputs.
+        Returns the largest absolute difference, or None if no NumPy export exists.
+        """
+        if self._numpy_layers is None:
+            return None
+        features = np.random.default_rng(0).normal(size=(n_samples, self.model.input_shape[-1])).astype(np.float32)
+        expected = np.asarray(self.model(features, training=False))
+        max_error = float(np.max(np.abs(self._numpy_forward(features) - expected)))
+        if max_error > atol:
+            print(f"NumPy forward pass exceeds tolerance: {max_error:.2e} > {atol:.2e}")
+        return max_error
 
     def preprocess_transaction(self, transaction_data: Dict[str, Any]) -> np.ndarray:
-        # Convert transaction data into the format expected by the model
-        # This should match your original JS preprocessing
-        features = []
-        for key in ['amount', 'time', 'location', 'merchant']:  # Add all relevant features
-            features.append(float(transaction_data.get(key, 0)))
-        return np.array(features).reshape(1, -1)
+        # Convert transaction data into the (1, NUM_FEATURES) row expected by the model
+        return self.feature_pipeline.transform_one(transaction_data)
+
+    def preprocess_batch(self, transactions: List[Dict[str, Any]]) -> np.ndarray:
+        # Build the whole feature matrix in one pass so the model runs a single forward pass
+        return self.feature_pipeline.transform(transactions)
+
+    def _preprocess_rows(self, transactions: List[Dict[str, Any]]) -> Tuple[np.ndarray, Dict[int, Exception]]:
+        """
+        Row-by-row fallback for when the batched transform raises, so one
+        malformed transaction fails alone instead of failing its whole batch.
+        Returns the features of the good rows and the errors by row index.
+        """
+        rows, errors = [], {}
+        for i, transaction in enumerate(transactions):
+            try:
+                rows.append(self.preprocess_transaction(transaction))
+            except Exception as e:
+                print(f"Error preprocessing transaction {i} of batch: {e}")
+                MODEL_ERRORS.inc("fraud_detection", "preprocess")
+                errors[i] = e
+        features = np.concatenate(rows) if rows else np.zeros((0, NUM_FEATURES), dtype=np.float32)
+        return features, errors
+
+    def _format_result(self, risk_score: float) -> Dict[str, Any]:
+        return {
+            "is_fraudulent": risk_score > 0.5,
+            "risk_score": risk_score,
+            "confidence": abs(risk_score - 0.5) * 2  # Scale confidence between 0 and 1
+        }
+
+    def _error_result(self, error: Exception) -> Dict[str, Any]:
+        return {
+            "error": str(error),
+            "is_fraudulent": False,
+            "risk_score": 0.0,
+            "confidence": 0.0
+        }
+
+    def score_features(self, features: np.ndarray, mode: Optional[str] = None) -> np.ndarray:
+        mode = mode or self.inference_mode
+        if mode == 'numpy' and self._numpy_layers is not None:
+            return self._numpy_forward(features).reshape(-1)
+        if mode in ('graph', 'numpy') and self._graph_forward is not None:
+            features = tf.convert_to_tensor(features, dtype=tf.float32)
+            return self._graph_forward(features).numpy().reshape(-1)
+        # predict_on_batch skips the per-call data-adapter setup of predict()
+        return np.asarray(self.model.predict_on_batch(features)).reshape(-1)
 
     def predict(self, transaction_data: Dict[str, Any]) -> Dict[str, Any]:
         try:
+            start = time.perf_counter()
             # Preprocess the transaction data
             processed_data = self.preprocess_transaction(transaction_data)
+            preprocessed = time.perf_counter()
             
-            # Make prediction
-            prediction = self.model.predict(processed_data)
-            
-            # Convert prediction to risk score
-            risk_score = float(prediction[0][0])
+            # Make prediction and convert it to a risk score
+            risk_score = float(self.score_features(processed_data)[0])
+            scored = time.perf_counter()
             
-            return {
-                "is_fraudulent": risk_score > 0.5,
-                "risk_score": risk_score,
-                "confidence": abs(risk_score - 0.5) * 2  # Scale confidence between 0 and 1
-            }
+            result = self._format_result(risk_score)
+            observe_phases("fraud_detection", start, preprocess=preprocessed, forward=scored, postprocess=time.perf_counter())
+            return result
         except Exception as e:
             print(f"Error in fraud prediction: {e}")
-            return {
-                "error": str(e),
-                "is_fraudulent": False,
-                "risk_score": 0.0,
-                "confidence": 0.0
-            } 
\ No newline at end of file
+            MODEL_ERRORS.inc("fraud_detection", "predict")
+            return self._error_result(e)
+
+    def predict_batch(self, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Score many transactions with one vectorized forward pass.
+        """
+        if not transactions:
+            return []
+        try:
+            start = time.perf_counter()
+            row_errors: Dict[int, Exception] = {}
+            try:
+                processed_data = self.preprocess_batch(transactions)
+            except Exception:
+                processed_data, row_errors = self._preprocess_rows(transactions)
+            preprocessed = time.perf_counter()
+            predictions = iter(self.score_features(processed_data) if len(processed_data) else [])
+            scored = time.perf_counter()
+
+            results = [
+                self._error_result(row_errors[i]) if i in row_errors else self._format_result(float(next(predictions)))
+                for i in range(len(transactions))
+            ]
+            observe_phases("fraud_detection", start, preprocess=preprocessed, forward=scored, postprocess=time.perf_counter())
+            return results
+        except Exception as e:
+            print(f"Error in batch fraud prediction: {e}")
+            MODEL_ERRORS.inc("fraud_detection", "predict_batch")
+            return [self._error_result(e) for _ in transactions]
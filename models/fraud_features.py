@@ -0,0 +1,163 @@
+import math
+import numpy as np
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+from models.velocity_store import VelocityFeatureStore, VELOCITY_FEATURES
+
+# Feature layout expected by FraudDetectionModel (input_shape=(30,))
+NUM_FEATURES = 30
+AMOUNT = 0
+LOG_AMOUNT = 1
+IS_DEBIT = 2
+HOUR_SIN = 3
+HOUR_COS = 4
+DOW_SIN = 5
+DOW_COS = 6
+IS_WEEKEND = 7
+IS_NIGHT = 8
+MERCHANT_OFFSET = 9
+MERCHANT_BUCKETS = 8
+LOCATION_OFFSET = MERCHANT_OFFSET + MERCHANT_BUCKETS
+LOCATION_BUCKETS = 8
+# Columns 25-29 hold per-user velocity features (see models.velocity_store)
+BEHAVIOUR_OFFSET = LOCATION_OFFSET + LOCATION_BUCKETS
+BEHAVIOUR_END = BEHAVIOUR_OFFSET + len(VELOCITY_FEATURES)
+
+
+class CachedEncoder:
+    """
+    Maps categorical strings (merchant, location) to a stable bucket id.
+    Bucket ids come from a CRC32 hash and are memoized in a bounded lookup table.
+    """
+
+    def __init__(self, n_buckets: int, max_size: int = 100000):
+        self.n_buckets = n_buckets
+        self.max_size = max_size
+        self._table: Dict[Any, int] = {}
+
+    def encode(self, value: Any) -> int:
+        try:
+            bucket = self._table.get(value)
+        except TypeError:
+            # Unhashable values (lists, dicts) are bucketed by their string form
+            value = str(value)
+            bucket = self._table.get(value)
+        if bucket is None:
+            normalized = str(value or '').strip().lower()
+            bucket = zlib.crc32(normalized.encode('utf-8')) % self.n_buckets
+            if len(self._table) >= self.max_size:
+                self._table.clear()
+            self._table[value] = bucket
+        return bucket
+
+
+def _to_epoch_seconds(value: Any, default: float) -> float:
+    """
+    Seconds since the epoch for a number, numeric string, ISO string or
+    datetime. Anything malformed or out of range falls back to `default`.
+    """
+    if value is None or value == '':
+        return default
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            try:
+                value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            except ValueError:
+                return default
+    if isinstance(value, (int, float)):
+        try:
+            value = float(value)
+        except OverflowError:
+            return default
+        if not math.isfinite(value):
+            return default
+        # Accept both seconds and milliseconds since the epoch
+        return value / 1000.0 if value > 1e11 else value
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return default
+
+
+def _to_float(value: Any) -> float:
+    try:
+        if isinstance(value, (int, float)):
+            number = float(value)
+        else:
+            number = float(str(value).replace('$', '').replace(',', ''))
+    except (ValueError, OverflowError):
+        return 0.0
+    # NaN and infinity would poison the whole feature vector
+    return number if math.isfinite(number) else 0.0
+
+
+class FraudFeaturePipeline:
+    """
+    Turns transaction dicts into the float32 feature matrix used by the fraud model.
+    Transactions carrying a `user_id` get velocity features from the feature store.
+    """
+
+    def __init__(self, feature_store: Optional[VelocityFeatureStore] = None):
+        self.merchant_encoder = CachedEncoder(MERCHANT_BUCKETS)
+        self.location_encoder = CachedEncoder(LOCATION_BUCKETS)
+        self.feature_store = feature_store
+
+    def transform(self, transactions: List[Dict[str, Any]]) -> np.ndarray:
+        n = len(transactions)
+        features = np.zeros((n, NUM_FEATURES), dtype=np.float32)
+        if n == 0:
+            return features
+
+        now = datetime.now(timezone.utc).timestamp()
+        amounts = np.empty(n, dtype=np.float64)
+        timestamps = np.empty(n, dtype=np.float64)
+        is_debit = np.empty(n, dtype=np.float32)
+        merchant_buckets = np.empty(n, dtype=np.intp)
+        location_buckets = np.empty(n, dtype=np.intp)
+
+        # Single pass over the dicts; everything after this is vectorized
+        encode_merchant = self.merchant_encoder.encode
+        encode_location = self.location_encoder.encode
+        store = self.feature_store
+        for i, transaction in enumerate(transactions):
+            get = transaction.get
+            amounts[i] = _to_float(get('amount', 0))
+            timestamps[i] = _to_epoch_seconds(get('time', get('timestamp')), now)
+            is_debit[i] = get('transaction_type') == 'debit'
+            merchant_buckets[i] = encode_merchant(get('merchant'))
+            location_buckets[i] = encode_location(get('location'))
+            if store is not None:
+                user_id = get('user_id')
+                if user_id is not None:
+                    features[i, BEHAVIOUR_OFFSET:BEHAVIOUR_END] = store.features(
+                        user_id, timestamps[i], amounts[i], get('merchant')
+                    )
+
+        hours = (timestamps % 86400.0) / 3600.0
+        # 1970-01-01 was a Thursday; shift so Monday is day 0
+        days = np.floor_divide(timestamps, 86400.0)
+        day_of_week = (days + 3) % 7
+        hour_angle = hours * (2 * np.pi / 24)
+        dow_angle = day_of_week * (2 * np.pi / 7)
+
+        features[:, AMOUNT] = amounts
+        features[:, LOG_AMOUNT] = np.log1p(np.abs(amounts))
+        features[:, IS_DEBIT] = is_debit
+        features[:, HOUR_SIN] = np.sin(hour_angle)
+        features[:, HOUR_COS] = np.cos(hour_angle)
+        features[:, DOW_SIN] = np.sin(dow_angle)
+        features[:, DOW_COS] = np.cos(dow_angle)
+        features[:, IS_WEEKEND] = day_of_week >= 5
+        features[:, IS_NIGHT] = (hours < 6) | (hours >= 22)
+
+        rows = np.arange(n)
+        features[rows, MERCHANT_OFFSET + merchant_buckets] = 1.0
+        features[rows, LOCATION_OFFSET + location_buckets] = 1.0
+        return features
+
+    def transform_one(self, transaction: Dict[str, Any]) -> np.ndarray:
+        return self.transform([transaction])
@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+
+class AhoCorasickAutomaton:
+    """
+    Multi-pattern substring matcher: finds every keyword occurrence in a
+    text in one left-to-right pass, independent of the number of keywords.
+    """
+
+    def __init__(self, keywords: List[str]):
+        self.keywords = keywords
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[Tuple[int, ...]] = [()]
+
+        for index, keyword in enumerate(keywords):
+            node = 0
+            for char in keyword:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append(())
+                    self._goto[node][char] = next_node
+                node = next_node
+            self._outputs[node] += (index,)
+
+        # Breadth-first pass to wire failure links and merge suffix outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._outputs[child] += self._outputs[self._fail[child]]
+
+    def find_all(self, text: str) -> List[int]:
+        """
+        Indices of every keyword occurrence in `text` (repeats included).
+        """
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        node = 0
+        found = []
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if outputs[node]:
+                found.extend(outputs[node])
+        return found
+
+
+class _CompiledKeywords:
+    __slots__ = ('automaton', 'keyword_categories', 'category_order')
+
+    def __init__(self, category_keywords: Dict[str, List[str]]):
+        keyword_categories: Dict[str, List[str]] = {}
+        for category, words in category_keywords.items():
+            for word in words:
+                word = word.strip().lower()
+                if word:
+                    keyword_categories.setdefault(word, []).append(category)
+
+        keywords = list(keyword_categories)
+        self.automaton = AhoCorasickAutomaton(keywords)
+        self.keyword_categories = [keyword_categories[keyword] for keyword in keywords]
+        self.category_order = {category: rank for rank, category in enumerate(category_keywords)}
+
+
+class KeywordMatcher:
+    """
+    Category keyword engine compiled once from a JSON file of
+    {category: [keywords]}. reload() compiles the new keyword set off to
+    the side and swaps it in with a single reference assignment, so
+    requests keep matching against the old set until the new one is ready.
+    """
+
+    def __init__(self, path: Optional[str] = None, category_keywords: Optional[Dict[str, List[str]]] = None):
+        self.path = path
+        self._mtime = None
+        self._reload_lock = threading.Lock()
+        if category_keywords is not None:
+            self._compiled = _CompiledKeywords(category_keywords)
+        else:
+            self._compiled = _CompiledKeywords(self._read_file())
+
+    def _read_file(self) -> Dict[str, List[str]]:
+        self._mtime = os.path.getmtime(self.path)
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def reload(self) -> int:
+        with self._reload_lock:
+            compiled = _CompiledKeywords(self._read_file())
+            self._compiled = compiled
+            return len(compiled.automaton.keywords)
+
+    def reload_if_changed(self) -> bool:
+        if self.path is None or os.path.getmtime(self.path) == self._mtime:
+            return False
+        self.reload()
+        return True
+
+    @property
+    def keyword_count(self) -> int:
+        return len(self._compiled.automaton.keywords)
+
+    def score(self, text: str) -> List[Tuple[str, float]]:
+        """
+        Candidate categories for `text`, best first. Each distinct matched
+        keyword adds its length to its categories, so specific phrases
+        outweigh short generic words.
+        """
+        compiled = self._compiled
+        keywords = compiled.automaton.keywords
+        scores: Dict[str, float] = {}
+        for index in set(compiled.automaton.find_all(text)):
+            for category in compiled.keyword_categories[index]:
+                scores[category] = scores.get(category, 0.0) + len(keywords[index])
+        order = compiled.category_order
+        return sorted(scores.items(), key=lambda item: (-item[1], order.get(item[0], 0)))
@@ -2,6 +2,13 @@ import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from typing import Dict, Any, List
+import os
+import time
+from config.metrics import MODEL_ERRORS, observe_phases
+from models.keyword_matcher import KeywordMatcher
+from models.category_cache import CategoryMemoCache
+
+DEFAULT_KEYWORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "merchant_keywords.json")
 
 class SpendingCategorizationModel:
     def __init__(self):
@@ -11,6 +18,12 @@ class SpendingCategorizationModel:
             'Shopping', 'Groceries', 'Transportation', 'Entertainment',
             'Utilities', 'Healthcare', 'Dining', 'Travel', 'Other'
         ]
+        self.keyword_matcher = None
+        # Most traffic comes from a few merchants, so memoize results per categorized text
+        self.cache = CategoryMemoCache(
+            max_entries=int(os.getenv("CATEGORY_CACHE_MAX_ENTRIES", "50000")),
+            ttl_seconds=float(os.getenv("CATEGORY_CACHE_TTL_SECONDS", "3600"))
+        )
         self.load_model()
 
     def load_model(self):
@@ -18,9 +31,23 @@ class SpendingCategorizationModel:
             # Load the model from your existing spending categorization backend
             # This is a placeholder - you'll need to properly load your model
             # self.model = joblib.load('path_to_your_model')
-            pass
+            self.keyword_matcher = KeywordMatcher(os.getenv("MERCHANT_KEYWORDS_PATH", DEFAULT_KEYWORDS_PATH))
+            self.cache.clear()
         except Exception as e:
             print(f"Error loading spending categorization model: {e}")
+            MODEL_ERRORS.inc("spending_categorization", "load_model")
+
+    def reload_keywords(self) -> int:
+        # Cached results were computed with the old keyword set
+        keyword_count = self.keyword_matcher.reload()
+        self.cache.clear()
+        return keyword_count
+
+    def reload_keywords_if_changed(self) -> bool:
+        if not self.keyword_matcher.reload_if_changed():
+            return False
+        self.cache.clear()
+        return True
 
     def preprocess_transaction(self, transaction_data: Dict[str, Any]) -> str:
         # Combine relevant transaction information for categorization
@@ -29,39 +56,47 @@ class SpendingCategorizationModel:
         return f"{description} {merchant}".lower()
 
     def predict_category(self, transaction_data: Dict[str, Any]) -> Dict[str, Any]:
+        key = self.preprocess_transaction(transaction_data)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return dict(cached)
+
+        generation = self.cache.generation
+        result = self._predict_category(transaction_data)
+        if "error" not in result:
+            self.cache.put(key, result, generation)
+        return dict(result)
+
+    def _predict_category(self, transaction_data: Dict[str, Any]) -> Dict[str, Any]:
         try:
+            start = time.perf_counter()
             # Preprocess the transaction
             text = self.preprocess_transaction(transaction_data)
+            preprocessed = time.perf_counter()
             
-            # For demonstration, using a simple rule-based approach
-            # Replace this with your actual model prediction
-            keywords = {
-                'Shopping': ['amazon', 'walmart', 'target', 'store'],
-                'Groceries': ['grocery', 'food', 'market'],
-                'Transportation': ['uber', 'lyft', 'taxi', 'gas'],
-                'Entertainment': ['netflix', 'spotify', 'movie'],
-                'Utilities': ['electric', 'water', 'internet'],
-                'Healthcare': ['hospital', 'doctor', 'pharmacy'],
-                'Dining': ['restaurant', 'cafe', 'coffee'],
-                'Travel': ['hotel', 'flight', 'airbnb']
-            }
-            
-            # Simple keyword matching (replace with actual model prediction)
-            for category, words in keywords.items():
-                if any(word in text for word in words):
-                    return {
-                        "category": category,
-                        "confidence": 0.85,
-                        "alternative_categories": ["Other"]
-                    }
-            
-            return {
-                "category": "Other",
-                "confidence": 0.6,
-                "alternative_categories": []
-            }
+            # Rule-based keyword matching until a trained model is wired in.
+            # All keyword hits are found in one pass and scored per category.
+            candidates = self.keyword_matcher.score(text)
+            scored = time.perf_counter()
+            if candidates:
+                category, top_score = candidates[0]
+                total_score = sum(score for _, score in candidates)
+                result = {
+                    "category": category,
+                    "confidence": round(0.85 * top_score / total_score, 4),
+                    "alternative_categories": [c for c, _ in candidates[1:]] or ["Other"]
+                }
+            else:
+                result = {
+                    "category": "Other",
+                    "confidence": 0.6,
+                    "alternative_categories": []
+                }
+            observe_phases("spending_categorization", start, preprocess=preprocessed, forward=scored, postprocess=time.perf_counter())
+            return result
         except Exception as e:
             print(f"Error in category prediction: {e}")
+            MODEL_ERRORS.inc("spending_categorization", "predict_category")
             return {
                 "error": str(e),
                 "category": "Other",
@@ -69,6 +104,9 @@ class SpendingCategorizationModel:
                 "alternative_categories": []
             }
 
+    def predict_categories(self, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [self.predict_category(transaction) for transaction in transactions]
+
     def get_spending_insights(self, transactions: List[Dict[str, Any]]) -> Dict[str, Any]:
         try:
             # Categorize all transactions
@@ -95,6 +133,7 @@ class SpendingCategorizationModel:
             }
         except Exception as e:
             print(f"Error generating spending insights: {e}")
+            MODEL_ERRORS.inc("spending_categorization", "get_spending_insights")
             return {
                 "error": str(e),
                 "category_totals": {},
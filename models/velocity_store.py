@@ -0,0 +1,205 @@
+import math
+import os
+import threading
+import time
+import zlib
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+HOUR = 3600.0
+DAY = 86400.0
+
+# Order of the values returned by VelocityFeatureStore.features()
+VELOCITY_FEATURES = (
+    'tx_count_1h',
+    'tx_count_24h',
+    'amount_zscore',
+    'is_new_merchant',
+    'log_seconds_since_last'
+)
+
+
+def merchant_hash(merchant: Any) -> int:
+    return zlib.crc32(str(merchant or '').strip().lower().encode('utf-8'))
+
+
+def to_epoch(timestamp: Any) -> float:
+    if timestamp is None:
+        return time.time()
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return timestamp.timestamp()
+    return float(timestamp)
+
+
+class _UserHistory:
+    """
+    Fixed-capacity ring buffers of one user's recent transactions plus the
+    running aggregates needed to answer feature reads without rescanning.
+    """
+    __slots__ = (
+        'timestamps', 'amounts', 'merchants', 'merchant_counts',
+        'hour_window', 'day_window', 'amount_sum', 'amount_sq_sum', 'last_seen'
+    )
+
+    def __init__(self, capacity: int):
+        self.timestamps = deque(maxlen=capacity)
+        self.amounts = deque(maxlen=capacity)
+        self.merchants = deque(maxlen=capacity)
+        self.merchant_counts: Dict[int, int] = {}
+        self.hour_window = deque(maxlen=capacity)
+        self.day_window = deque(maxlen=capacity)
+        self.amount_sum = 0.0
+        self.amount_sq_sum = 0.0
+        self.last_seen = 0.0
+
+    def append(self, timestamp: float, amount: float, merchant: int) -> None:
+        if len(self.amounts) == self.amounts.maxlen:
+            # The oldest entry is about to fall out of the ring buffer
+            oldest_amount = self.amounts[0]
+            self.amount_sum -= oldest_amount
+            self.amount_sq_sum -= oldest_amount * oldest_amount
+            oldest_merchant = self.merchants[0]
+            remaining = self.merchant_counts[oldest_merchant] - 1
+            if remaining:
+                self.merchant_counts[oldest_merchant] = remaining
+            else:
+                del self.merchant_counts[oldest_merchant]
+
+        self.timestamps.append(timestamp)
+        self.amounts.append(amount)
+        self.merchants.append(merchant)
+        self.merchant_counts[merchant] = self.merchant_counts.get(merchant, 0) + 1
+        self.amount_sum += amount
+        self.amount_sq_sum += amount * amount
+        for window in (self.hour_window, self.day_window):
+            if not window or timestamp >= window[-1]:
+                window.append(timestamp)
+            elif len(window) < window.maxlen or timestamp > window[0]:
+                # Out-of-order rows (bulk loads, replays) are inserted in place to keep the window sorted
+                if len(window) == window.maxlen:
+                    window.popleft()
+                window.insert(bisect_right(window, timestamp), timestamp)
+
+    def expire(self, now: float) -> None:
+        # Each timestamp is popped at most once, so expiry is amortized O(1)
+        while self.hour_window and self.hour_window[0] <= now - HOUR:
+            self.hour_window.popleft()
+        while self.day_window and self.day_window[0] <= now - DAY:
+            self.day_window.popleft()
+
+
+class VelocityFeatureStore:
+    """
+    In-memory per-user sliding-window store for fraud velocity features.
+
+    Each user keeps at most `capacity` recent transactions. At most
+    `max_users` users are held; the least recently used is evicted first,
+    and evict_idle() drops users not seen for `max_idle_seconds`.
+    """
+
+    def __init__(self, capacity: int = 256, max_users: int = 100000, max_idle_seconds: float = 2 * DAY):
+        self.capacity = capacity
+        self.max_users = max_users
+        self.max_idle_seconds = max_idle_seconds
+        self._users: "OrderedDict[Any, _UserHistory]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def record(self, user_id: Any, timestamp: Any, amount: float, merchant: Any) -> None:
+        if user_id is None:
+            return
+        ts = to_epoch(timestamp)
+        with self._lock:
+            history = self._users.get(user_id)
+            if history is None:
+                history = _UserHistory(self.capacity)
+                self._users[user_id] = history
+                if len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+            else:
+                self._users.move_to_end(user_id)
+            history.append(ts, float(amount or 0.0), merchant_hash(merchant))
+            history.last_seen = time.time()
+            # Expire against the store's clock, so a future-dated row cannot empty the windows
+            history.expire(min(ts, history.last_seen))
+
+    def features(self, user_id: Any, timestamp: Any, amount: float, merchant: Any) -> Tuple[float, ...]:
+        """
+        Velocity features for a transaction about to be scored, in VELOCITY_FEATURES order.
+        """
+        ts = to_epoch(timestamp)
+        with self._lock:
+            history = self._users.get(user_id)
+            if history is None or not history.amounts:
+                return (0.0, 0.0, 0.0, 1.0, 0.0)
+            self._users.move_to_end(user_id)
+
+            count = len(history.amounts)
+            mean = history.amount_sum / count
+            variance = max(history.amount_sq_sum / count - mean * mean, 0.0)
+            std = math.sqrt(variance)
+            zscore = (float(amount or 0.0) - mean) / std if std > 1e-9 else 0.0
+            is_new_merchant = 0.0 if merchant_hash(merchant) in history.merchant_counts else 1.0
+            since_last = max(ts - history.timestamps[-1], 0.0)
+
+            # Scoring only reads: the timestamp comes from the request, so count the
+            # windows by bisection instead of expiring entries against it
+            hour_count = len(history.hour_window) - bisect_right(history.hour_window, ts - HOUR)
+            day_count = len(history.day_window) - bisect_right(history.day_window, ts - DAY)
+
+            return (
+                float(hour_count),
+                float(day_count),
+                zscore,
+                is_new_merchant,
+                math.log1p(since_last)
+            )
+
+    def evict_idle(self, max_idle_seconds: Optional[float] = None) -> int:
+        cutoff = time.time() - (max_idle_seconds if max_idle_seconds is not None else self.max_idle_seconds)
+        evicted = 0
+        with self._lock:
+            # Users are kept in LRU order, so idle ones sit at the front
+            while self._users:
+                user_id, history = next(iter(self._users.items()))
+                if history.last_seen > cutoff:
+                    break
+                del self._users[user_id]
+                evicted += 1
+        return evicted
+
+    def warm_start(self, db, lookback_hours: float = 24.0, batch_size: int = 10000) -> int:
+        """
+        Replay recent rows from the transactions table into the store.
+        """
+        from models.database_models import Transaction
+
+        since = datetime.utcnow() - timedelta(hours=lookback_hours)
+        rows = db.query(
+            Transaction.user_id,
+            Transaction.timestamp,
+            Transaction.amount,
+            Transaction.merchant
+        ).filter(Transaction.timestamp >= since)\
+            .order_by(Transaction.timestamp.asc())\
+            .yield_per(batch_size)
+
+        loaded = 0
+        for user_id, timestamp, amount, merchant in rows:
+            self.record(user_id, timestamp, amount, merchant)
+            loaded += 1
+        return loaded
+
+
+# Shared store used by crud (writes) and the fraud model (reads)
+velocity_store = VelocityFeatureStore(
+    capacity=int(os.getenv("VELOCITY_HISTORY_SIZE", "256")),
+    max_users=int(os.getenv("VELOCITY_MAX_USERS", "100000")),
+    max_idle_seconds=float(os.getenv("VELOCITY_MAX_IDLE_SECONDS", str(2 * DAY)))
+)
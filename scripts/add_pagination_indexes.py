@@ -0,0 +1,21 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database import engine
+from models.database_models import Transaction, ChatMessage
+
+def add_pagination_indexes():
+    # create_all() only builds indexes for new tables, so add them to existing ones here
+    print("Creating pagination indexes...")
+    try:
+        for table in (Transaction.__table__, ChatMessage.__table__):
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+                print(f"Index ready: {index.name}")
+    except Exception as e:
+        print(f"Error creating indexes: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    add_pagination_indexes()
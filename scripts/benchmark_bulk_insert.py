@@ -0,0 +1,101 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import time
+import uuid
+from config.database import SessionLocal, engine, Base
+from models.database_models import User, Account, Transaction
+from app import crud
+
+MERCHANTS = ["Amazon", "Walmart", "Target", "Starbucks"]
+CATEGORIES = ["Shopping", "Groceries", "Entertainment"]
+# The per-row path is far too slow for 1M rows; time a sample and extrapolate
+SINGLE_ROW_SAMPLE = 5000
+CHUNK_SIZE = 50000
+
+
+def generate_transactions(user_id, account_id, n):
+    return [
+        {
+            "user_id": user_id,
+            "account_id": account_id,
+            "transaction_type": random.choice(["debit", "credit"]),
+            "amount": round(random.uniform(10, 1000), 2),
+            "description": "Benchmark transaction",
+            "merchant": random.choice(MERCHANTS),
+            "category": random.choice(CATEGORIES),
+            "location": "New York, USA",
+            "fraud_score": random.random()
+        }
+        for _ in range(n)
+    ]
+
+
+def benchmark_single_row(db, transactions):
+    start = time.perf_counter()
+    for t in transactions:
+        crud.create_transaction(
+            db,
+            user_id=t["user_id"],
+            account_id=t["account_id"],
+            amount=t["amount"],
+            transaction_type=t["transaction_type"],
+            description=t["description"],
+            merchant=t["merchant"],
+            category=t["category"],
+            location=t["location"],
+            fraud_score=t["fraud_score"]
+        )
+    return time.perf_counter() - start
+
+
+def benchmark_bulk(db, transactions, use_copy):
+    start = time.perf_counter()
+    for offset in range(0, len(transactions), CHUNK_SIZE):
+        crud.create_transactions_bulk(db, transactions[offset:offset + CHUNK_SIZE], use_copy=use_copy)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-row and bulk transaction inserts")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 1000000])
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(email=f"bench-{uuid.uuid4().hex[:8]}@example.com", hashed_password="x", full_name="Bench User")
+    db.add(user)
+    db.flush()
+    account = Account(user_id=user.id, account_type="checking", account_number=f"bench-{uuid.uuid4().hex[:8]}")
+    db.add(account)
+    db.commit()
+
+    try:
+        print(f"Bulk insert benchmark on {engine.dialect.name}\n")
+        for rows in args.rows:
+            transactions = generate_transactions(user.id, account.id, rows)
+            sample = transactions[:min(rows, SINGLE_ROW_SAMPLE)]
+
+            single = benchmark_single_row(db, sample) * rows / len(sample)
+            executemany = benchmark_bulk(db, transactions, use_copy=False)
+            print(f"{rows} rows:")
+            print(f"  create_transaction (per row) {single:9.2f} s  {rows / single:10.0f} rows/s"
+                  + ("  (extrapolated)" if len(sample) < rows else ""))
+            print(f"  bulk executemany             {executemany:9.2f} s  {rows / executemany:10.0f} rows/s")
+            if engine.dialect.name == "postgresql":
+                copy = benchmark_bulk(db, transactions, use_copy=True)
+                print(f"  bulk COPY FROM STDIN         {copy:9.2f} s  {rows / copy:10.0f} rows/s")
+            print()
+    finally:
+        db.query(Transaction).filter(Transaction.user_id == user.id).delete()
+        db.query(Account).filter(Account.id == account.id).delete()
+        db.query(User).filter(User.id == user.id).delete()
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+import uuid
+
+MESSAGES = 2000
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def main(database_url):
+    from sqlalchemy import func, select
+    from app import crud_async
+    from app.write_behind import WriteBehindQueue
+    from config.database import Base, async_engine, AsyncSessionLocal
+    from models.database_models import ChatMessage
+
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_id = uuid.uuid4().hex
+    async with AsyncSessionLocal() as db:
+        await crud_async.create_chat_session(db, None, session_id)
+
+    async def write_batch(rows):
+        async with AsyncSessionLocal() as db:
+            await crud_async.create_chat_messages_bulk(db, rows)
+
+    print(f"Chat persistence benchmark ({MESSAGES} exchanges, 2 rows each, {async_engine.dialect.name})\n")
+    print(f"{'mode':<28} {'p50 ms':>8} {'p99 ms':>8} {'exchanges/s':>12}")
+
+    # Before: two committed inserts on the request path
+    latencies = []
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        for i in range(MESSAGES):
+            t0 = time.perf_counter()
+            await crud_async.create_chat_message(db, session_id, f"user {i}", "user", "help", 0.9)
+            await crud_async.create_chat_message(db, session_id, f"assistant {i}", "assistant", "help", 0.9)
+            latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    print(f"{'commit per message':<28} {1000 * statistics.median(latencies):>8.3f} "
+          f"{1000 * percentile(latencies, 0.99):>8.3f} {MESSAGES / elapsed:>12,.0f}")
+
+    for durable in (False, True):
+        writer = WriteBehindQueue(write_batch, name="benchmark", durable=durable)
+        latencies = []
+        start = time.perf_counter()
+
+        async def exchange(i):
+            t0 = time.perf_counter()
+            await writer.put_many([
+                {"session_id": session_id, "role": "user", "message": f"user {i}", "intent": "help", "confidence": 0.9},
+                {"session_id": session_id, "role": "assistant", "message": f"assistant {i}", "intent": "help", "confidence": 0.9}
+            ])
+            latencies.append(time.perf_counter() - t0)
+
+        # Durable callers wait for their flush, so run them concurrently like real requests
+        await asyncio.gather(*(exchange(i) for i in range(MESSAGES)))
+        await writer.shutdown()
+        elapsed = time.perf_counter() - start
+        label = "write-behind, durable" if durable else "write-behind"
+        print(f"{label:<28} {1000 * statistics.median(latencies):>8.3f} "
+              f"{1000 * percentile(latencies, 0.99):>8.3f} {MESSAGES / elapsed:>12,.0f}"
+              f"   (avg batch {writer.stats()['avg_batch_size']:.0f} rows)")
+
+    async with AsyncSessionLocal() as db:
+        stored = await db.scalar(select(func.count(ChatMessage.id)).where(ChatMessage.session_id == session_id))
+    print(f"\nRows stored: {stored} (expected {MESSAGES * 2 * 3})")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-message commits with write-behind chat persistence")
+    parser.add_argument("--database-url", help="Defaults to a temporary SQLite database")
+    args = parser.parse_args()
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'chat_benchmark.db')}"
+    os.environ["DATABASE_URL"] = url
+    asyncio.run(main(url))
@@ -0,0 +1,87 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import subprocess
+import time
+import types
+from models.chatbot import BankingChatbot
+from config.metrics import METRICS_ENABLED
+
+N_MESSAGES = 100000
+MESSAGES = [
+    "What's my balance?",
+    "How much money is in my checking account right now?",
+    "I want to transfer $200 to savings",
+    "Can you send money to my landlord?",
+    "Show me my spending history for last month",
+    "I need to pay my electricity bill",
+    "What are the details of my account?",
+    "Help! I can't log in",
+    "Good morning, nice weather today",
+    "Please show transactions and then help me pay the water bill",
+]
+
+
+def load_baseline_chatbot(ref):
+    """
+    BankingChatbot class as it was at `ref`, read with git show, so the
+    comparison runs the real code from before the compiled intent engine.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    source = subprocess.run(
+        ["git", "show", f"{ref}:models/chatbot.py"], cwd=root, capture_output=True, text=True, check=True
+    ).stdout
+    module = types.ModuleType("baseline_chatbot")
+    exec(compile(source, f"{ref}:models/chatbot.py", "exec"), module.__dict__)
+    return module.BankingChatbot
+
+
+def throughput(chatbot, messages):
+    start = time.perf_counter()
+    for message in messages:
+        chatbot.generate_response(message)
+    elapsed = time.perf_counter() - start
+    # The baseline keeps every turn in an unbounded list
+    if hasattr(chatbot, "conversation_history"):
+        chatbot.conversation_history.clear()
+    return len(messages) / elapsed
+
+
+def detection_throughput(detect, messages):
+    start = time.perf_counter()
+    for message in messages:
+        detect(message)
+    return len(messages) / (time.perf_counter() - start)
+
+
+def main(args):
+    random.seed(42)
+    messages = [random.choice(MESSAGES) for _ in range(N_MESSAGES)]
+    BaselineChatbot = load_baseline_chatbot(args.baseline_ref)
+    print(f"Chatbot intent detection benchmark ({N_MESSAGES} messages, one core, baseline {args.baseline_ref})")
+    # The baseline has no instrumentation; run with METRICS_ENABLED=false to compare the engines alone
+    print(f"Metrics {'on' if METRICS_ENABLED else 'off'} for the current chatbot\n")
+
+    results = {}
+    for label, chatbot in [("before (baseline)", BaselineChatbot()), ("after (compiled)", BankingChatbot())]:
+        throughput(chatbot, messages[:1000])
+        results[label] = throughput(chatbot, messages)
+        print(f"{label:<20} {results[label]:>10,.0f} messages/s")
+
+    print(f"\nSpeedup: {results['after (compiled)'] / results['before (baseline)']:.2f}x")
+
+    print("\nIntent detection only")
+    for label, detect in [
+        ("before (first hit)", BaselineChatbot().detect_intent),
+        ("after (all, scored)", BankingChatbot().detect_intents),
+    ]:
+        print(f"{label:<20} {detection_throughput(detect, messages):>10,.0f} messages/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chatbot throughput against the pre-optimization code")
+    parser.add_argument("--baseline-ref", required=True, help="Git revision holding the baseline models/chatbot.py")
+    main(parser.parse_args())
@@ -0,0 +1,101 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import time
+import numpy as np
+from app.batching import MicroBatcher
+from models.fraud_detection import FraudDetectionModel
+
+BATCH_SIZES = [1, 32, 256, 4096]
+TARGET_ROWS = 20000
+
+
+def percentile(values, q):
+    return float(np.percentile(np.asarray(values) * 1000, q))
+
+
+def benchmark_batch_size(model, batch_size, n_features):
+    iterations = max(20, TARGET_ROWS // batch_size)
+    features = np.random.rand(batch_size, n_features).astype(np.float32)
+
+    # Warm up the model before timing
+    model.score_features(features)
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call_start = time.perf_counter()
+        model.score_features(features)
+        latencies.append(time.perf_counter() - call_start)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "throughput": batch_size * iterations / elapsed
+    }
+
+
+def benchmark_per_row_predict(model, n_features, iterations=200):
+    features = np.random.rand(1, n_features).astype(np.float32)
+    model.model.predict(features, verbose=0)
+
+    latencies = []
+    for _ in range(iterations):
+        call_start = time.perf_counter()
+        model.model.predict(features, verbose=0)
+        latencies.append(time.perf_counter() - call_start)
+
+    return {
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "throughput": iterations / sum(latencies)
+    }
+
+
+async def benchmark_micro_batcher(model, n_features, concurrency=512, max_batch_size=64, max_wait_ms=2.0):
+    batcher = MicroBatcher(
+        lambda rows: model.score_features(np.vstack(rows)).tolist(),
+        max_batch_size=max_batch_size,
+        max_wait_ms=max_wait_ms
+    )
+    rows = [np.random.rand(1, n_features).astype(np.float32) for _ in range(concurrency)]
+
+    async def timed_submit(row):
+        call_start = time.perf_counter()
+        await batcher.submit(row)
+        return time.perf_counter() - call_start
+
+    await asyncio.gather(*(timed_submit(row) for row in rows[:max_batch_size]))
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(timed_submit(row) for row in rows))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "throughput": concurrency / elapsed
+    }
+
+
+def print_row(label, stats):
+    print(f"{label:<28} p50={stats['p50_ms']:9.3f} ms  p99={stats['p99_ms']:9.3f} ms  "
+          f"throughput={stats['throughput']:12.0f} tx/s")
+
+
+def main():
+    model = FraudDetectionModel()
+    n_features = model.model.input_shape[-1]
+
+    print("Fraud scoring benchmark\n")
+    print_row("model.predict (1 row)", benchmark_per_row_predict(model, n_features))
+    for batch_size in BATCH_SIZES:
+        print_row(f"batched (size={batch_size})", benchmark_batch_size(model, batch_size, n_features))
+    print_row("micro-batcher (512 conc.)", asyncio.run(benchmark_micro_batcher(model, n_features)))
+
+
+if __name__ == "__main__":
+    main()
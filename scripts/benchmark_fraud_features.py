@@ -0,0 +1,53 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import time
+from datetime import datetime, timedelta
+from models.fraud_features import FraudFeaturePipeline
+
+N_TRANSACTIONS = 100000
+MERCHANTS = ["Amazon", "Walmart", "Target", "Starbucks", "Uber", "Shell", "Netflix", "Costco"]
+LOCATIONS = ["New York, USA", "London, UK", "Paris, France", "Austin, USA", "Toronto, Canada"]
+
+
+def generate_transactions(n, iso_timestamps):
+    start = datetime(2024, 1, 1)
+    transactions = []
+    for _ in range(n):
+        timestamp = start + timedelta(seconds=random.randint(0, 365 * 86400))
+        transactions.append({
+            "amount": round(random.uniform(1, 2000), 2),
+            "time": timestamp.isoformat() if iso_timestamps else timestamp.timestamp(),
+            "merchant": random.choice(MERCHANTS),
+            "location": random.choice(LOCATIONS),
+            "transaction_type": random.choice(["debit", "credit"])
+        })
+    return transactions
+
+
+def main():
+    pipeline = FraudFeaturePipeline()
+    print(f"Fraud feature pipeline benchmark ({N_TRANSACTIONS} transactions, one core)\n")
+
+    for label, iso in [("epoch timestamps", False), ("ISO-8601 timestamps", True)]:
+        transactions = generate_transactions(N_TRANSACTIONS, iso)
+        pipeline.transform(transactions[:1000])
+
+        start = time.perf_counter()
+        features = pipeline.transform(transactions)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<22} {elapsed * 1000:8.1f} ms  {N_TRANSACTIONS / elapsed:12.0f} tx/s  shape={features.shape}")
+
+    single = generate_transactions(1, False)[0]
+    iterations = 20000
+    start = time.perf_counter()
+    for _ in range(iterations):
+        pipeline.transform_one(single)
+    elapsed = time.perf_counter() - start
+    print(f"{'single-row path':<22} {elapsed / iterations * 1e6:8.1f} us/row")
+
+
+if __name__ == "__main__":
+    main()
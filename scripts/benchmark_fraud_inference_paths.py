@@ -0,0 +1,50 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import numpy as np
+from models.fraud_detection import FraudDetectionModel
+
+ITERATIONS = 2000
+BATCH_SIZES = [1, 256]
+
+
+def time_path(score, features, iterations):
+    score(features)
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        score(features)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.asarray(latencies) * 1e6
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    model = FraudDetectionModel(inference_mode='keras')
+    n_features = model.model.input_shape[-1]
+
+    max_error = model.verify_numpy_forward()
+    print(f"NumPy vs Keras max abs error: {max_error:.2e}\n")
+
+    paths = {
+        "keras model.predict": lambda x: model.model.predict(x, verbose=0),
+        "keras predict_on_batch": lambda x: model.score_features(x, mode='keras'),
+        "graph tf.function": lambda x: model.score_features(x, mode='graph'),
+        "numpy forward": lambda x: model.score_features(x, mode='numpy')
+    }
+
+    for batch_size in BATCH_SIZES:
+        features = np.random.rand(batch_size, n_features).astype(np.float32)
+        print(f"Batch size {batch_size}:")
+        for name, score in paths.items():
+            # model.predict is orders of magnitude slower, keep its run short
+            iterations = ITERATIONS // 20 if name == "keras model.predict" else ITERATIONS
+            p50, p99 = time_path(score, features, iterations)
+            print(f"  {name:<24} p50={p50:10.1f} us  p99={p99:10.1f} us")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+import urllib.request
+
+# Scores a transaction stream against a real uvicorn worker, once as
+# sequential POST /fraud/detect calls and once pipelined over /ws/fraud.
+PORT = 8766
+SECRET = "benchmark-secret"
+MERCHANTS = ["Amazon", "Walmart", "Target", "Starbucks", "Uber", "Shell", "Netflix", "Costco"]
+LOCATIONS = ["New York, USA", "London, UK", "Paris, France", "Austin, USA", "Toronto, Canada"]
+
+
+def generate_transactions(n):
+    now = time.time()
+    return [{
+        "amount": round(random.uniform(1, 2000), 2),
+        "time": now - random.randint(0, 30 * 86400),
+        "merchant": random.choice(MERCHANTS),
+        "location": random.choice(LOCATIONS),
+        "transaction_type": random.choice(["debit", "credit"])
+    } for _ in range(n)]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def wait_until_ready(timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{PORT}/", timeout=1)
+            return
+        except Exception:
+            time.sleep(0.5)
+    raise RuntimeError("Server did not start")
+
+
+def report(label, count, elapsed, latencies):
+    print(f"{label:<24} {count / elapsed:>10,.0f} {1000 * statistics.median(latencies):>9.2f} "
+          f"{1000 * percentile(latencies, 0.99):>9.2f}")
+
+
+def run_http(transactions):
+    import http.client
+
+    # One keep-alive connection, one request in flight at a time
+    connection = http.client.HTTPConnection("127.0.0.1", PORT)
+    latencies = []
+    start = time.perf_counter()
+    for transaction in transactions:
+        t0 = time.perf_counter()
+        connection.request("POST", "/api/v1/fraud/detect", json.dumps(transaction),
+                           {"Content-Type": "application/json"})
+        connection.getresponse().read()
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    connection.close()
+    return elapsed, latencies
+
+
+async def run_stream(transactions, frame_size):
+    import websockets
+    from app.security import create_access_token
+
+    sent_at = {}
+    latencies = []
+    async with websockets.connect(
+        f"ws://127.0.0.1:{PORT}/ws/fraud?token={create_access_token(1)}",
+        max_size=None,
+        ping_interval=None
+    ) as ws:
+        ready = json.loads(await ws.recv())
+        credit = asyncio.Semaphore(ready["window"])
+        errors = 0
+
+        async def receive():
+            nonlocal errors
+            remaining = len(transactions)
+            while remaining:
+                frame = json.loads(await ws.recv())
+                now = time.perf_counter()
+                items = frame.get("results") or frame.get("errors") or []
+                if frame["type"] == "error":
+                    errors += len(items)
+                for item in items:
+                    latencies.append(now - sent_at.pop(item["id"]))
+                remaining -= len(items)
+                for _ in range(frame["credit"]):
+                    credit.release()
+
+        receiver = asyncio.create_task(receive())
+        start = time.perf_counter()
+        for offset in range(0, len(transactions), frame_size):
+            items = []
+            for i in range(offset, min(offset + frame_size, len(transactions))):
+                # Only send what the server has credit for
+                await credit.acquire()
+                items.append({"id": i, "transaction": transactions[i]})
+            now = time.perf_counter()
+            for item in items:
+                sent_at[item["id"]] = now
+            await ws.send(json.dumps({"items": items}))
+        await receiver
+        elapsed = time.perf_counter() - start
+    return elapsed, latencies, errors
+
+
+async def main(args):
+    env = dict(
+        os.environ,
+        JWT_SECRET_KEY=SECRET,
+        DATABASE_URL=os.environ.get("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'stream.db')}"),
+        VELOCITY_WARM_START_HOURS="0",
+        FRAUD_STREAM_WINDOW=str(args.window),
+        FRAUD_STREAM_BATCH_SIZE=str(args.batch_size)
+    )
+    os.environ["JWT_SECRET_KEY"] = SECRET
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--log-level", "warning", "--ws", "wsproto"],
+        cwd=root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_ready()
+        print(f"Fraud scoring throughput, one connection (window {args.window}, "
+              f"server batch {args.batch_size}, {args.frame_size} transactions per frame)\n")
+        print(f"{'mode':<24} {'tx/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+
+        elapsed, latencies = run_http(generate_transactions(args.http_transactions))
+        report("HTTP /fraud/detect", args.http_transactions, elapsed, latencies)
+
+        # Warm up the traced forward pass for the larger batch shapes
+        await run_stream(generate_transactions(args.window), args.frame_size)
+        elapsed, latencies, errors = await run_stream(generate_transactions(args.transactions), args.frame_size)
+        report("WebSocket /ws/fraud", args.transactions, elapsed, latencies)
+        if errors:
+            print(f"\n{errors} transactions came back as errors")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sequential HTTP fraud scoring vs the pipelined /ws/fraud stream")
+    parser.add_argument("--transactions", type=int, default=200000)
+    parser.add_argument("--http-transactions", type=int, default=2000)
+    parser.add_argument("--window", type=int, default=4096)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--frame-size", type=int, default=256, help="Transactions per client frame")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,179 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import tempfile
+import time
+import urllib.request
+
+# Measures what the /metrics instrumentation costs. First the pieces in
+# isolation (middleware, SQL hooks, model phase timings), then whole
+# requests against two uvicorn workers, one with METRICS_ENABLED=false.
+PORTS = {"on": 8767, "off": 8768}
+# (method, path, route template, body, model calls per request)
+REQUESTS = [
+    ("POST", "/api/v1/fraud/detect", "/api/v1/fraud/detect",
+     {"amount": 125.5, "merchant": "Amazon", "location": "Austin, USA", "transaction_type": "debit"}, 1),
+    ("POST", "/api/v1/spending/categorize", "/api/v1/spending/categorize", {"merchant": "Starbucks", "description": "coffee"}, 1),
+    ("POST", "/api/v1/chat/message", "/api/v1/chat/message", {"message": "what is my balance", "session_id": "benchmark"}, 1),
+    ("GET", "/api/v1/users/1/transactions?limit=20", "/api/v1/users/{user_id}/transactions", None, 0),
+    ("GET", "/api/v1/users/1/accounts", "/api/v1/users/{user_id}/accounts", None, 0),
+]
+
+
+def per_call_us(fn, n):
+    fn()
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def component_costs(n):
+    from sqlalchemy import create_engine, event, text
+    from sqlalchemy.engine import Engine
+    from app import metrics
+
+    costs = {}
+
+    async def bare_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def noop_send(message):
+        pass
+
+    async def drive(app):
+        scope = {"type": "http", "method": "GET", "path": "/", "app": None, "endpoint": bare_app}
+        start = time.perf_counter()
+        for _ in range(n):
+            await app(scope, None, noop_send)
+        return (time.perf_counter() - start) / n * 1e6
+
+    bare = asyncio.run(drive(bare_app))
+    wrapped = asyncio.run(drive(metrics.MetricsMiddleware(bare_app)))
+    costs["middleware, per request"] = wrapped - bare
+
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        query = text("SELECT 1")
+        plain = per_call_us(lambda: connection.execute(query), n)
+        metrics.instrument_sqlalchemy()
+        hooked = per_call_us(lambda: connection.execute(query), n)
+        event.remove(Engine, "before_cursor_execute", metrics._before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", metrics._after_cursor_execute)
+        event.remove(Engine, "handle_error", metrics._handle_error)
+    costs["SQL hooks, per statement"] = hooked - plain
+
+    start = time.perf_counter()
+    costs["model phases, per call"] = per_call_us(
+        lambda: metrics.observe_phases("benchmark", start, preprocess=start, forward=start, postprocess=start), n
+    )
+    return costs
+
+
+def wait_until_ready(port, timeout=180):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1)
+            return
+        except Exception:
+            time.sleep(0.5)
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+def time_requests(port, method, path, body, n):
+    import http.client
+
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    payload = json.dumps(body) if body is not None else None
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        connection.request(method, path, payload, headers)
+        connection.getresponse().read()
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+    return latencies
+
+
+def statements_per_request(port):
+    # Average SQL statements per route, from the instrumented worker's own histogram
+    totals = {}
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+        for line in response.read().decode().splitlines():
+            for suffix in ("_sum", "_count"):
+                prefix = f"db_queries_per_request{suffix}{{route=\""
+                if line.startswith(prefix):
+                    route = line[len(prefix):line.index('"', len(prefix))]
+                    totals.setdefault(route, {})[suffix] = float(line.rsplit(" ", 1)[1])
+    return {route: t["_sum"] / t["_count"] for route, t in totals.items() if t.get("_count")}
+
+
+def end_to_end(args):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    database_url = os.environ.get("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'metrics.db')}")
+    subprocess.run([sys.executable, "scripts/init_db.py"], cwd=root, env=dict(os.environ, DATABASE_URL=database_url),
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    servers = {}
+    for mode, port in PORTS.items():
+        env = dict(os.environ, DATABASE_URL=database_url, VELOCITY_WARM_START_HOURS="0",
+                   METRICS_ENABLED="true" if mode == "on" else "false")
+        servers[mode] = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+    try:
+        for port in PORTS.values():
+            wait_until_ready(port)
+        latencies = {(mode, path): [] for mode in PORTS for _, path, _, _, _ in REQUESTS}
+        # Alternate short rounds, swapping which worker goes first, so drift hits both equally
+        for round_number in range(args.rounds):
+            modes = list(PORTS) if round_number % 2 == 0 else list(reversed(PORTS))
+            for method, path, _, body, _ in REQUESTS:
+                for mode in modes:
+                    latencies[(mode, path)].extend(time_requests(PORTS[mode], method, path, body, args.requests))
+        return latencies, statements_per_request(PORTS["on"])
+    finally:
+        for server in servers.values():
+            server.terminate()
+            server.wait()
+
+
+def main(args):
+    print("Instrumentation cost in isolation\n")
+    costs = component_costs(args.iterations)
+    for label, microseconds in costs.items():
+        print(f"  {label:<28} {microseconds:>7.2f} us")
+
+    print(f"\nWhole requests, metrics on vs off ({args.rounds} x {args.requests} per endpoint)\n")
+    print(f"{'endpoint':<42} {'off ms':>8} {'on ms':>8} {'diff':>8} {'SQL':>5} {'budget':>8}")
+    latencies, statements = end_to_end(args)
+    for method, path, route, _, model_calls in REQUESTS:
+        off = statistics.median(latencies[("off", path)]) * 1000
+        on = statistics.median(latencies[("on", path)]) * 1000
+        # What the instrumentation adds to this request, from the isolated costs
+        budget_us = (costs["middleware, per request"]
+                     + statements.get(route, 0.0) * costs["SQL hooks, per statement"]
+                     + model_calls * costs["model phases, per call"])
+        print(f"{method + ' ' + route:<42} {off:>8.3f} {on:>8.3f} {100 * (on - off) / off:>7.1f}% "
+              f"{statements.get(route, 0.0):>5.1f} {100 * budget_us / 1000 / off:>7.2f}%")
+    print("\n'diff' is the difference in median latency and includes run-to-run noise. 'budget' is the")
+    print("isolated cost of the middleware, the SQL hooks for the route's statements and its model")
+    print("timings, as a share of the uninstrumented request.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Overhead of request, SQL and model metrics")
+    parser.add_argument("--iterations", type=int, default=100000, help="Calls per isolated measurement")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=100, help="Requests per endpoint per round")
+    main(parser.parse_args())
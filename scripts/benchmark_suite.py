@@ -0,0 +1,473 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+# End-to-end benchmark suite. Seeds a database (Postgres, or a SQLite
+# stand-in by default), starts a real uvicorn worker, drives the API and
+# the /ws echo, times the CRUD functions directly against the seeded data
+# and writes every result to JSON. Given --baseline it flags regressions
+# and exits non-zero, so CI can compare runs automatically.
+#
+#   python scripts/benchmark_suite.py --scale small --output run.json
+#   python scripts/benchmark_suite.py --database-url postgresql+psycopg2://... --scale full \
+#       --baseline baseline.json
+PORT = 8769
+SECRET = "benchmark-secret"
+SEED = 42
+SCALES = {
+    "tiny": (100, 10000),
+    "small": (1000, 100000),
+    "full": (10000, 10000000),
+}
+SEED_CHUNK_SIZE = 50000
+MERCHANTS = ["Amazon", "Walmart", "Target", "Starbucks", "Uber", "Shell", "Netflix", "Costco", "Whole Foods", "Delta"]
+CATEGORIES = ["Shopping", "Groceries", "Transportation", "Entertainment", "Utilities", "Dining", "Travel"]
+LOCATIONS = ["New York, USA", "London, UK", "Paris, France", "Austin, USA", "Toronto, Canada"]
+# Owner of the rows the bulk-insert case writes, removed again after the run
+SCRATCH_EMAIL = "bulk-insert@benchmark.local"
+CHAT_MESSAGES = ["what is my balance", "show my recent transactions", "I want to pay a bill", "help", "transfer money"]
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def summarize(latencies, elapsed, errors, unit="req/s", items_per_op=1):
+    ordered = sorted(latencies)
+    return {
+        "unit": unit,
+        "throughput": round(len(ordered) * items_per_op / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(1000 * percentile(ordered, 0.50), 3),
+        "p95_ms": round(1000 * percentile(ordered, 0.95), 3),
+        "p99_ms": round(1000 * percentile(ordered, 0.99), 3),
+        "count": len(ordered),
+        "errors": errors
+    }
+
+
+def random_transaction(rng, users):
+    user_id = rng.randint(1, users)
+    return {
+        "user_id": user_id,
+        "account_id": user_id,
+        "transaction_type": rng.choice(["debit", "credit"]),
+        "amount": round(rng.uniform(1, 2000), 2),
+        "description": "Benchmark transaction",
+        "merchant": rng.choice(MERCHANTS),
+        "category": rng.choice(CATEGORIES),
+        "location": rng.choice(LOCATIONS),
+        "fraud_score": rng.random()
+    }
+
+
+# Seeding
+
+def reset_scratch_data():
+    """
+    Remove what the write cases add: the bulk-insert owner with its
+    transactions and rollup rows, and the benchmark chat sessions. Runs
+    before seeding and after the cases, so every run, even one after an
+    interrupted run, measures against exactly the seeded data.
+    """
+    from sqlalchemy import delete, select
+    from config.database import SessionLocal
+    from models.database_models import Account, ChatMessage, ChatSession, DailyCategoryRollup, Transaction, User
+
+    db = SessionLocal()
+    try:
+        user_id = db.scalar(select(User.id).where(User.email == SCRATCH_EMAIL))
+        if user_id is not None:
+            db.execute(delete(Transaction).where(Transaction.user_id == user_id))
+            db.execute(delete(DailyCategoryRollup).where(DailyCategoryRollup.user_id == user_id))
+            db.execute(delete(Account).where(Account.user_id == user_id))
+            db.execute(delete(User).where(User.id == user_id))
+        db.execute(delete(ChatMessage).where(ChatMessage.session_id.like("benchmark-%")))
+        db.execute(delete(ChatSession).where(ChatSession.session_id.like("benchmark-%")))
+        db.commit()
+    finally:
+        db.close()
+
+
+def create_scratch_owner():
+    from config.database import SessionLocal
+    from models.database_models import Account, User
+
+    db = SessionLocal()
+    try:
+        user = User(email=SCRATCH_EMAIL, hashed_password="x", full_name="Bulk insert benchmark")
+        db.add(user)
+        db.flush()
+        account = Account(user_id=user.id, account_type="checking", account_number="BENCHSCRATCH", balance=0.0)
+        db.add(account)
+        db.commit()
+        return user.id, account.id
+    finally:
+        db.close()
+
+
+def seed_database(users, transactions):
+    from sqlalchemy import func, insert, select
+    from app import crud
+    from config.database import Base, SessionLocal, engine
+    from models.database_models import Account, Transaction, User
+
+    Base.metadata.create_all(bind=engine)
+    reset_scratch_data()
+    db = SessionLocal()
+    try:
+        existing_users = db.scalar(select(func.count(User.id)))
+        existing_transactions = db.scalar(select(func.count(Transaction.id)))
+        # Only an exact match is reused, so results stay comparable with a baseline on the same data
+        if existing_users == users and existing_transactions == transactions:
+            print(f"Reusing seeded data: {existing_users:,} users, {existing_transactions:,} transactions")
+            return {"reused": True}
+        if existing_users or existing_transactions:
+            raise SystemExit(
+                f"Database holds {existing_users:,} users and {existing_transactions:,} transactions, not "
+                f"{users:,} and {transactions:,}; point --database-url at an empty database"
+            )
+
+        print(f"Seeding {users:,} users and {transactions:,} transactions...")
+        start = time.perf_counter()
+        db.execute(insert(User), [
+            {"email": f"user{i}@benchmark.local", "hashed_password": "x", "full_name": f"User {i}"}
+            for i in range(1, users + 1)
+        ])
+        db.execute(insert(Account), [
+            {"user_id": i, "account_type": "checking", "account_number": f"BENCH{i:09d}", "balance": 1000.0}
+            for i in range(1, users + 1)
+        ])
+        db.commit()
+
+        rng = random.Random(SEED)
+        now = datetime.utcnow()
+        inserted = 0
+        while inserted < transactions:
+            chunk = []
+            for _ in range(min(SEED_CHUNK_SIZE, transactions - inserted)):
+                transaction = random_transaction(rng, users)
+                transaction["timestamp"] = now - timedelta(seconds=rng.randint(0, 365 * 86400))
+                chunk.append(transaction)
+            inserted += crud.create_transactions_bulk(db, chunk, use_copy=True)
+            print(f"  {inserted:,} / {transactions:,}", end="\r")
+        elapsed = time.perf_counter() - start
+        print(f"\nSeeded in {elapsed:.0f}s ({transactions / elapsed:,.0f} transactions/s)")
+        return {"reused": False, "seconds": round(elapsed, 1), "transactions_per_second": round(transactions / elapsed)}
+    finally:
+        db.close()
+
+
+# HTTP and WebSocket cases, against a real worker
+
+def http_cases(users):
+    return {
+        "http_fraud_detect": lambda rng, worker: ("POST", "/api/v1/fraud/detect", random_transaction(rng, users)),
+        "http_spending_categorize": lambda rng, worker: (
+            "POST", "/api/v1/spending/categorize", {"merchant": rng.choice(MERCHANTS), "description": "card payment"}
+        ),
+        "http_spending_insights": lambda rng, worker: (
+            "POST", "/api/v1/spending/insights", [random_transaction(rng, users) for _ in range(50)]
+        ),
+        "http_spending_insights_stored": lambda rng, worker: (
+            "GET", f"/api/v1/spending/insights/{rng.randint(1, users)}?from={date.today() - timedelta(days=90)}", None
+        ),
+        "http_chat_message": lambda rng, worker: (
+            "POST", "/api/v1/chat/message", {"message": rng.choice(CHAT_MESSAGES), "session_id": f"benchmark-{worker}"}
+        ),
+        "http_transactions_page": lambda rng, worker: (
+            "GET", f"/api/v1/users/{rng.randint(1, users)}/transactions?limit=50", None
+        ),
+    }
+
+
+def run_http_case(make_request, concurrency, duration, warmup):
+    import http.client
+
+    def worker(worker_id, seconds, record):
+        rng = random.Random(SEED + worker_id)
+        connection = http.client.HTTPConnection("127.0.0.1", PORT, timeout=30)
+        latencies, errors = [], 0
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            method, path, body = make_request(rng, worker_id)
+            payload = json.dumps(body) if body is not None else None
+            headers = {"Content-Type": "application/json"} if body is not None else {}
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, payload, headers)
+                response = connection.getresponse()
+                response.read()
+                ok = 200 <= response.status < 300
+            except Exception:
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", PORT, timeout=30)
+                ok = False
+            if record:
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+        connection.close()
+        return latencies, errors
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda i: worker(i, warmup, False), range(concurrency)))
+        start = time.perf_counter()
+        results = list(pool.map(lambda i: worker(i, duration, True), range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return summarize([l for latencies, _ in results for l in latencies], elapsed, sum(e for _, e in results))
+
+
+async def run_ws_echo(duration, window):
+    import websockets
+    from app.security import create_access_token
+
+    latencies = []
+    async with websockets.connect(f"ws://127.0.0.1:{PORT}/ws?token={create_access_token(1)}", ping_interval=None) as ws:
+        sent = deque()
+        # Pongs come back in order, so each one answers the oldest outstanding ping
+        for _ in range(window):
+            sent.append(time.perf_counter())
+            await ws.send("ping")
+        start = time.perf_counter()
+        deadline = start + duration
+        while time.perf_counter() < deadline:
+            await ws.recv()
+            latencies.append(time.perf_counter() - sent.popleft())
+            sent.append(time.perf_counter())
+            await ws.send("ping")
+        elapsed = time.perf_counter() - start
+        while sent:
+            await ws.recv()
+            sent.popleft()
+    return summarize(latencies, elapsed, 0, unit="msg/s")
+
+
+def start_server(database_url):
+    env = dict(os.environ, DATABASE_URL=database_url, JWT_SECRET_KEY=SECRET, VELOCITY_WARM_START_HOURS="0")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--log-level", "warning", "--ws", "wsproto"],
+        cwd=root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 180
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("Server exited during startup")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{PORT}/", timeout=1)
+            return server
+        except Exception:
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError("Server did not start")
+
+
+# CRUD functions, called directly against the seeded data
+
+async def run_crud_cases(users, concurrency, duration, selected):
+    from app import crud_async
+    from config.database import AsyncSessionLocal, async_engine
+
+    today = date.today()
+
+    async def transactions_page(rng):
+        # First page plus four more through the cursor
+        async with AsyncSessionLocal() as db:
+            cursor = None
+            for _ in range(5):
+                _, cursor = await crud_async.get_user_transactions_page(db, rng.randint(1, users), limit=50, cursor=cursor)
+                if cursor is None:
+                    break
+
+    async def insights_rollup(rng):
+        async with AsyncSessionLocal() as db:
+            await crud_async.get_spending_insights_range(db, rng.randint(1, users), today - timedelta(days=365), today)
+
+    async def insights_scan(rng):
+        async with AsyncSessionLocal() as db:
+            await crud_async.get_spending_insights_from_transactions(db, rng.randint(1, users), today - timedelta(days=365), today)
+
+    async def bulk_insert(rng):
+        # Every row goes to the scratch owner, so reset_scratch_data() can take them out again
+        user_id, account_id = scratch_owner
+        rows = [dict(random_transaction(rng, users), user_id=user_id, account_id=account_id) for _ in range(1000)]
+        async with AsyncSessionLocal() as db:
+            await crud_async.create_transactions_bulk(db, rows)
+
+    cases = {
+        "crud_transactions_page": (transactions_page, concurrency, "req/s", 1),
+        "crud_insights_rollup": (insights_rollup, concurrency, "req/s", 1),
+        "crud_insights_scan": (insights_scan, concurrency, "req/s", 1),
+        # Writers run one at a time; SQLite has a single writer anyway
+        "crud_bulk_insert": (bulk_insert, 1, "rows/s", 1000),
+    }
+    scratch_owner = create_scratch_owner() if not selected or "crud_bulk_insert" in selected else None
+    results = {}
+    for name, (operation, workers, unit, items) in cases.items():
+        if selected and name not in selected:
+            continue
+        latencies, errors = [], 0
+
+        async def worker(worker_id, deadline):
+            nonlocal errors
+            rng = random.Random(SEED + worker_id)
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    await operation(rng)
+                    latencies.append(time.perf_counter() - start)
+                except Exception as e:
+                    errors += 1
+                    print(f"  {name} error: {e}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(i, start + duration) for i in range(workers)))
+        results[name] = summarize(latencies, time.perf_counter() - start, errors, unit=unit, items_per_op=items)
+        print_result(name, results[name])
+    await async_engine.dispose()
+    return results
+
+
+# Reporting and baseline comparison
+
+def print_result(name, result):
+    print(f"  {name:<32} {result['throughput']:>11,.1f} {result['unit']:<7} p50 {result['p50_ms']:>8.2f}  "
+          f"p95 {result['p95_ms']:>8.2f}  p99 {result['p99_ms']:>8.2f} ms  errors {result['errors']}")
+
+
+def compare(results, baseline, tolerance, min_latency_delta_ms):
+    """
+    Return a regression message for every case slower than the baseline
+    beyond the tolerance: lower throughput, or a higher p95 that is also
+    at least min_latency_delta_ms worse in absolute terms.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {result['throughput']:,.1f} vs baseline {base['throughput']:,.1f} {result['unit']}")
+        latency_delta = result["p95_ms"] - base["p95_ms"]
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance) and latency_delta >= min_latency_delta_ms:
+            regressions.append(f"{name}: p95 {result['p95_ms']:.2f} ms vs baseline {base['p95_ms']:.2f} ms")
+        if result["errors"] > base.get("errors", 0):
+            regressions.append(f"{name}: {result['errors']} errors vs baseline {base.get('errors', 0)}")
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(args):
+    users, transactions = SCALES[args.scale]
+    users = args.users or users
+    transactions = args.transactions or transactions
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark_suite.db')}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["JWT_SECRET_KEY"] = SECRET
+    os.environ.setdefault("DB_ECHO", "false")
+    selected = set(args.only or [])
+
+    from sqlalchemy.engine import make_url
+    dialect = make_url(database_url).get_backend_name()
+
+    meta = {
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "dialect": dialect,
+        "users": users,
+        "transactions": transactions,
+        "concurrency": args.concurrency,
+        "duration_seconds": args.duration
+    }
+    meta["seed"] = seed_database(users, transactions)
+    results = {}
+
+    server = start_server(database_url)
+    try:
+        print(f"\nAPI cases ({args.concurrency} clients, {args.duration:.0f}s each)")
+        for name, make_request in http_cases(users).items():
+            if selected and name not in selected:
+                continue
+            results[name] = run_http_case(make_request, args.concurrency, args.duration, args.warmup)
+            print_result(name, results[name])
+        if not selected or "ws_echo" in selected:
+            results["ws_echo"] = asyncio.run(run_ws_echo(args.duration, args.ws_window))
+            print_result("ws_echo", results["ws_echo"])
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"\nCRUD cases ({dialect}, {args.concurrency} tasks, {args.duration:.0f}s each)")
+    try:
+        results.update(asyncio.run(run_crud_cases(users, args.concurrency, args.duration, selected)))
+    finally:
+        reset_scratch_data()
+
+    report = {"meta": meta, "results": results}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for key in ("dialect", "users", "transactions", "concurrency", "cpus"):
+            if baseline["meta"].get(key) != meta[key]:
+                print(f"Warning: baseline {key} is {baseline['meta'].get(key)!r}, this run used {meta[key]!r}")
+        regressions = compare(results, baseline["results"], args.tolerance, args.min_latency_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline} (commit {baseline['meta'].get('git_commit')}):")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end API, WebSocket and CRUD benchmark suite")
+    parser.add_argument("--database-url", help="Sync SQLAlchemy URL; defaults to a temporary SQLite database")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small",
+                        help="small: 1k users / 100k transactions, full: 10k users / 10M transactions")
+    parser.add_argument("--users", type=int, help="Override the scale's user count")
+    parser.add_argument("--transactions", type=int, help="Override the scale's transaction count")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds measured per case")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of unmeasured load before each API case")
+    parser.add_argument("--ws-window", type=int, default=64, help="Pings in flight for the WebSocket echo case")
+    parser.add_argument("--only", nargs="+", help="Run only these cases")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="Compare against this results file and exit 1 on regressions")
+    parser.add_argument("--save-baseline", help="Also write this run to a baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative slowdown before flagging")
+    parser.add_argument("--min-latency-delta-ms", type=float, default=1.0,
+                        help="Ignore p95 increases smaller than this, however large in relative terms")
+    main(parser.parse_args())
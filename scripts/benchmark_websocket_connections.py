@@ -0,0 +1,106 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import subprocess
+import tempfile
+import time
+import urllib.request
+
+# Holds N idle authenticated /ws connections against a real uvicorn worker
+# and reports the server's resident memory per connection.
+PORT = 8765
+SECRET = "benchmark-secret"
+
+
+def rss_kb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def wait_until_ready(timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{PORT}/", timeout=1)
+            return
+        except Exception:
+            time.sleep(0.5)
+    raise RuntimeError("Server did not start")
+
+
+def realtime_stats():
+    with urllib.request.urlopen(f"http://127.0.0.1:{PORT}/api/v1/realtime/metrics") as response:
+        return response.read().decode()
+
+
+async def open_connections(n, users):
+    import websockets
+    from app.security import create_access_token
+
+    tokens = [create_access_token(user_id) for user_id in range(users)]
+    connections = []
+    semaphore = asyncio.Semaphore(200)
+
+    async def connect(i):
+        async with semaphore:
+            ws = await websockets.connect(
+                f"ws://127.0.0.1:{PORT}/ws?token={tokens[i % users]}",
+                ping_interval=None,
+                max_queue=1
+            )
+            connections.append(ws)
+
+    await asyncio.gather(*(connect(i) for i in range(n)))
+    return connections
+
+
+async def main(args):
+    env = dict(
+        os.environ,
+        JWT_SECRET_KEY=SECRET,
+        DATABASE_URL=os.environ.get("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'ws.db')}"),
+        VELOCITY_WARM_START_HOURS="0",
+        WS_MAX_CONNECTIONS_PER_USER=str(args.connections)
+    )
+    os.environ["JWT_SECRET_KEY"] = SECRET
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--log-level", "warning",
+         "--ws", args.ws, "--backlog", "4096"],
+        cwd=root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_ready()
+        baseline = rss_kb(server.pid)
+        print(f"WebSocket idle connection benchmark ({args.connections} connections, {args.users} users, {args.ws})\n")
+        print(f"Server RSS before: {baseline / 1024:.1f} MB")
+
+        start = time.perf_counter()
+        connections = await open_connections(args.connections, args.users)
+        elapsed = time.perf_counter() - start
+        await asyncio.sleep(2)
+        loaded = rss_kb(server.pid)
+
+        print(f"Opened {len(connections)} connections in {elapsed:.1f}s")
+        print(f"Server RSS with connections: {loaded / 1024:.1f} MB")
+        print(f"Per idle connection: {(loaded - baseline) / len(connections):.1f} KB")
+        print(f"Hub: {realtime_stats()}")
+
+        await asyncio.gather(*(ws.close() for ws in connections), return_exceptions=True)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Server memory for many idle /ws connections")
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--ws", default="wsproto", choices=["websockets", "wsproto"], help="uvicorn WebSocket implementation")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,112 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Drives a connection pool at rising concurrency. Every worker checks out a
+# connection, runs a query and holds it for --hold-ms, then does --think-ms
+# of other work, like a request handler. Once every pooled and overflow
+# connection is busy, throughput stops growing, checkout waits climb and
+# finally turn into pool timeouts.
+
+
+def run_level(engine, concurrency, duration, hold_seconds, think_seconds):
+    from sqlalchemy import exc, text
+    from config.database import PoolMetrics, pool_stats
+
+    engine.pool.metrics = PoolMetrics(recent_size=100000)
+    deadline = time.perf_counter() + duration
+    peak = {"in_use": 0, "overflow": 0}
+    stop = threading.Event()
+
+    def sample():
+        while not stop.is_set():
+            stats = pool_stats(engine)
+            peak["in_use"] = max(peak["in_use"], stats["in_use"])
+            peak["overflow"] = max(peak["overflow"], stats["overflow"])
+            time.sleep(0.005)
+
+    def worker():
+        completed = 0
+        while time.perf_counter() < deadline:
+            try:
+                with engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+                    time.sleep(hold_seconds)
+                completed += 1
+            except exc.TimeoutError:
+                pass
+            # The rest of the request, done without a connection
+            time.sleep(think_seconds)
+        return completed
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        completed = sum(pool.map(lambda _: worker(), range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    sampler.join()
+
+    metrics = engine.pool.metrics
+    waits = sorted(metrics._recent_waits)
+    p50 = waits[len(waits) // 2] * 1000 if waits else 0.0
+    return {
+        "throughput": completed / elapsed,
+        "p50_wait_ms": p50,
+        "p99_wait_ms": metrics.stats()["p99_wait_ms"],
+        "timeouts": metrics.timeouts,
+        **peak
+    }
+
+
+def main(args):
+    from sqlalchemy import create_engine
+    from config.database import engine_options
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'pool.db')}"
+    engine = create_engine(url, **engine_options(
+        "load_test", url,
+        pool_size=args.pool_size,
+        max_overflow=args.max_overflow,
+        pool_timeout=args.pool_timeout
+    ))
+    size = engine.pool.size()
+    capacity = size + engine.pool._max_overflow
+    hold_seconds = args.hold_ms / 1000.0
+
+    print(f"Connection pool load test on {engine.dialect.name}: pool_size {size}, "
+          f"max_overflow {engine.pool._max_overflow}, timeout {engine.pool.timeout():.1f}s, "
+          f"{args.hold_ms:.0f} ms per checkout\n")
+    print(f"Ceiling: {capacity} connections -> {capacity / hold_seconds:,.0f} checkouts/s\n")
+    print(f"{'workers':>8} {'checkouts/s':>12} {'p50 wait ms':>12} {'p99 wait ms':>12} "
+          f"{'timeouts':>9} {'in use':>7} {'overflow':>9}")
+
+    for concurrency in args.concurrency:
+        result = run_level(engine, concurrency, args.duration, hold_seconds, args.think_ms / 1000.0)
+        exhausted = result["in_use"] >= capacity and result["p99_wait_ms"] > args.hold_ms
+        marker = "  <- exhausted" if exhausted else ""
+        print(f"{concurrency:>8} {result['throughput']:>12,.0f} {result['p50_wait_ms']:>12.2f} "
+              f"{result['p99_wait_ms']:>12.2f} {result['timeouts']:>9} {result['in_use']:>7} "
+              f"{result['overflow']:>9}{marker}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find where a database connection pool saturates")
+    parser.add_argument("--database-url", help="Defaults to a temporary SQLite database")
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--max-overflow", type=int, default=5)
+    parser.add_argument("--pool-timeout", type=float, default=1.0)
+    parser.add_argument("--hold-ms", type=float, default=20.0, help="How long each worker keeps its connection")
+    parser.add_argument("--think-ms", type=float, default=10.0, help="Work each worker does between checkouts")
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds per concurrency level")
+    parser.add_argument("--concurrency", type=lambda value: [int(v) for v in value.split(",")],
+                        default=[1, 5, 10, 15, 20, 40, 80, 160, 320])
+    main(parser.parse_args())
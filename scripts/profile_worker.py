@@ -0,0 +1,53 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import urllib.parse
+import urllib.request
+
+# Captures a profile from a running worker through /api/v1/admin/profile and
+# writes the collapsed stacks for flamegraph.pl or speedscope. With several
+# uvicorn workers, each call profiles whichever worker accepts the request.
+
+
+def main(args):
+    query = urllib.parse.urlencode({
+        "seconds": args.seconds,
+        "interval_ms": args.interval_ms,
+        "block_threshold_ms": args.block_threshold_ms,
+        "include_idle": str(args.include_idle).lower(),
+        "format": "json"
+    })
+    request = urllib.request.Request(
+        f"{args.url.rstrip('/')}/api/v1/admin/profile?{query}",
+        headers={"X-Admin-Token": args.token}
+    )
+    print(f"Profiling {args.url} for {args.seconds:.0f}s...")
+    with urllib.request.urlopen(request, timeout=args.seconds + 30) as response:
+        profile = json.loads(response.read())
+
+    with open(args.output, "w") as f:
+        f.write("\n".join(profile["collapsed"]) + "\n")
+
+    lag = profile["loop_lag"]
+    print(f"{profile['samples']} samples written to {args.output}")
+    print(f"Event-loop lag: p50 {lag['p50_ms']:.2f} ms, p99 {lag['p99_ms']:.2f} ms, max {lag['max_ms']:.2f} ms")
+    print(f"Loop blocked >= {profile['blocking_threshold_ms']:.0f} ms: {len(profile['blocking'])} times")
+    for event in sorted(profile["blocking"], key=lambda e: e["lag_ms"], reverse=True)[:args.top]:
+        stack = event["stacks"][0]["stack"].split(";") if event["stacks"] else ["(no sample landed in the block)"]
+        print(f"  {event['lag_ms']:8.1f} ms  {' <- '.join(reversed(stack[-4:]))}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Capture a sampling profile from a running worker")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--token", default=os.getenv("ADMIN_TOKEN"), help="Defaults to $ADMIN_TOKEN")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--interval-ms", type=float, default=5.0)
+    parser.add_argument("--block-threshold-ms", type=float, default=50.0)
+    parser.add_argument("--include-idle", action="store_true", help="Keep threads parked waiting for work")
+    parser.add_argument("--top", type=int, default=5, help="Blocking events to print")
+    parser.add_argument("--output", default="profile.collapsed")
+    main(parser.parse_args())
@@ -0,0 +1,41 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select
+from config.database import ReportingSessionLocal, reporting_engine, Base
+from models.database_models import Transaction, DailyCategoryRollup
+from app.rollups import DEFAULT_CATEGORY
+
+def rebuild_daily_rollup():
+    # Recompute the rollup from scratch, e.g. after a backfill or for existing data
+    print("Rebuilding daily_category_rollup...")
+    Base.metadata.create_all(bind=reporting_engine, tables=[DailyCategoryRollup.__table__])
+    db = ReportingSessionLocal()
+    try:
+        day = func.date(Transaction.timestamp)
+        category = func.coalesce(Transaction.category, DEFAULT_CATEGORY)
+        aggregate = select(
+            Transaction.user_id,
+            day,
+            category,
+            func.sum(Transaction.amount),
+            func.count(Transaction.id)
+        ).group_by(Transaction.user_id, day, category)
+
+        db.query(DailyCategoryRollup).delete()
+        db.execute(insert(DailyCategoryRollup).from_select(
+            ["user_id", "day", "category", "total_amount", "transaction_count"],
+            aggregate
+        ))
+        db.commit()
+        print(f"Rollup rows: {db.query(DailyCategoryRollup).count()}")
+    except Exception as e:
+        print(f"Error rebuilding rollup: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    rebuild_daily_rollup()
@@ -0,0 +1,87 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import heapq
+import random
+import tracemalloc
+from models.chatbot import BankingChatbot
+from models.conversation_memory import ConversationMemory
+
+MESSAGES = [
+    "What's my balance?",
+    "I want to transfer $200 to savings",
+    "Show me my spending history",
+    "I need to pay my electricity bill",
+    "Help me with my account details",
+    "Thanks!",
+]
+
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak conversation memory with synthetic chat sessions on a simulated clock")
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--hours", type=float, default=24.0)
+    parser.add_argument("--housekeeping-seconds", type=float, default=30.0)
+    args = parser.parse_args()
+
+    random.seed(42)
+    clock = SimulatedClock()
+    memory = ConversationMemory(
+        max_turns=int(os.getenv("CHAT_MEMORY_MAX_TURNS", "20")),
+        max_sessions=int(os.getenv("CHAT_MEMORY_MAX_SESSIONS", "10000")),
+        max_idle_seconds=float(os.getenv("CHAT_MEMORY_MAX_IDLE_SECONDS", "1800")),
+        clock=clock
+    )
+    chatbot = BankingChatbot()
+    duration = args.hours * 3600
+
+    # (time, session id, messages left); sessions start uniformly over the run
+    # and send 2-30 messages, 5-300 seconds apart
+    events = [(random.uniform(0, duration), f"session-{i}", random.randint(2, 30)) for i in range(args.sessions)]
+    heapq.heapify(events)
+
+    tracemalloc.start()
+    next_housekeeping = args.housekeeping_seconds
+    next_report = 0.0
+    handled = 0
+    print(f"Conversation memory soak: {args.sessions} sessions over {args.hours:g} simulated hours\n")
+    print(f"{'hour':>5} {'messages':>10} {'sessions':>9} {'evicted':>9} {'traced MB':>10} {'peak MB':>8}")
+
+    while events:
+        at, session_id, remaining = heapq.heappop(events)
+        while next_housekeeping <= at:
+            clock.now = next_housekeeping
+            memory.evict_idle()
+            next_housekeeping += args.housekeeping_seconds
+        while next_report <= at:
+            current, peak = tracemalloc.get_traced_memory()
+            print(f"{next_report / 3600:>5.0f} {handled:>10} {len(memory):>9} {memory.evicted:>9} "
+                  f"{current / 1e6:>10.1f} {peak / 1e6:>8.1f}")
+            next_report += 3600
+
+        clock.now = at
+        message = random.choice(MESSAGES)
+        result = chatbot.generate_response(message, history=memory.history(session_id))
+        memory.append(session_id, "user", message, result["intent"], result["confidence"])
+        memory.append(session_id, "assistant", result["response"], result["intent"], result["confidence"])
+        handled += 1
+        if remaining > 1:
+            heapq.heappush(events, (at + random.uniform(5, 300), session_id, remaining - 1))
+
+    current, peak = tracemalloc.get_traced_memory()
+    print(f"\nHandled {handled} messages; {memory.evicted} sessions evicted")
+    print(f"Final traced memory {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from typing import Optional, List, Dict
-from ml.model import TransactionCategorizer
+from ml.model import ONLINE_SAVE_INTERVAL_SECONDS, TransactionCategorizer
+from ml.jobs import TrainingJobManager
+import asyncio
 import os
 
 app = FastAPI(title="Spending Categorization API")
@@ -26,6 +29,9 @@ except FileNotFoundError:
     # Model will be trained when first training data is received
     pass
 
+# Training runs in a separate process so it never blocks predictions
+training_jobs = TrainingJobManager(categorizer)
+
 class Transaction(BaseModel):
     description: str
     amount: Optional[float] = None
@@ -34,6 +40,21 @@ class Transaction(BaseModel):
 class TrainingData(BaseModel):
     transactions: List[Dict]
 
+class LabelledTransaction(BaseModel):
+    description: str
+    category: str
+    merchant_name: Optional[str] = None
+
+class LearnRequest(BaseModel):
+    transactions: List[LabelledTransaction]
+    flush: bool = False
+
+class BatchPredictionRequest(BaseModel):
+    transactions: List[Transaction]
+    top_k: int = 3
+
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "10000"))
+
 @app.post("/predict/")
 async def predict_category(transaction: Transaction):
     """
@@ -42,23 +63,109 @@ async def predict_category(transaction: Transaction):
     try:
         category = categorizer.predict(
             description=transaction.description,
-            amount=transaction.amount
+            amount=transaction.amount,
+            merchant_name=transaction.merchant_name
         )
         return {"category": category}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/train/")
-async def train_model(data: TrainingData):
+@app.post("/predict/batch/")
+async def predict_categories_batch(request: BatchPredictionRequest):
     """
-    Train the model with new data
+    Predict the top-k categories with probabilities for many transactions
     """
+    if len(request.transactions) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_SIZE} transactions per batch")
     try:
-        categorizer.train(data.transactions)
-        return {"message": "Model trained successfully"}
+        # A full batch is CPU-bound for a while, so keep it off the event loop
+        predictions = await run_in_threadpool(
+            categorizer.predict_batch,
+            [t.dict() for t in request.transactions],
+            top_k=request.top_k
+        )
+        return {"predictions": predictions}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/train/", status_code=202)
+async def train_model(data: TrainingData):
+    """
+    Start a background training job with new data
+    """
+    if categorizer.serving_model == "online":
+        # The online model is updated in place instead of retrained from scratch.
+        # Training rows are free-form, so check them against the learn schema here
+        try:
+            request = LearnRequest(transactions=data.transactions, flush=True)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        return await learn_transactions(request)
+    job = training_jobs.submit(data.transactions)
+    return {"message": "Training started", "job_id": job["id"], "status": job["status"]}
+
+@app.post("/learn/")
+async def learn_transactions(request: LearnRequest):
+    """
+    Stream labelled transactions, e.g. user recategorizations, into the online model
+    """
+    if len(request.transactions) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_SIZE} transactions per request")
+    try:
+        return await run_in_threadpool(
+            categorizer.learn,
+            [t.dict() for t in request.transactions],
+            request.flush
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/train/jobs/")
+async def list_training_jobs():
+    """
+    List recent training jobs, newest first
+    """
+    return {"jobs": training_jobs.list()}
+
+@app.get("/train/jobs/{job_id}")
+async def get_training_job(job_id: str):
+    """
+    Get the status and metrics of a training job
+    """
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return job
+
+async def persist_online_model():
+    # Learned updates reach disk every interval, not only on a clean shutdown
+    while True:
+        await asyncio.sleep(ONLINE_SAVE_INTERVAL_SECONDS)
+        try:
+            await run_in_threadpool(categorizer.save_online_model_if_dirty)
+        except Exception as e:
+            print(f"Error saving online model: {e}")
+
+@app.on_event("startup")
+async def startup_event():
+    if categorizer.serving_model == "online":
+        app.state.online_saver = asyncio.create_task(persist_online_model())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    training_jobs.shutdown()
+    if getattr(app.state, "online_saver", None) is not None:
+        app.state.online_saver.cancel()
+    if categorizer.serving_model == "online":
+        categorizer.save_online_model()
+
+@app.get("/cache/stats/")
+async def cache_stats():
+    """
+    Report hit rate of the categorization result cache
+    """
+    return categorizer.cache.stats()
+
 @app.get("/health/")
 async def health_check():
     """
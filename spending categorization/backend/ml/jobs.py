@@ -0,0 +1,88 @@
+import asyncio
+import multiprocessing
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+from ml.model import TransactionCategorizer
+
+
+def run_training_job(training_data: Any, model_path: str, n_jobs: int) -> Dict[str, Any]:
+    """
+    Entry point executed in the training worker process
+    """
+    categorizer = TransactionCategorizer()
+    categorizer.model_path = model_path
+    return categorizer.train(training_data, n_jobs=n_jobs)
+
+
+class TrainingJobManager:
+    """
+    Runs model training in a separate process and hot-swaps the result
+    into the serving categorizer once the new model is on disk
+    """
+
+    def __init__(self, categorizer: TransactionCategorizer, max_jobs: int = 100):
+        self.categorizer = categorizer
+        self.max_jobs = max_jobs
+        # Leave one core for serving by default
+        self.n_jobs = int(os.getenv("TRAINING_N_JOBS", "-2"))
+        # spawn avoids forking a process that already runs threads
+        self._pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._tasks = set()
+        # Jobs take turns on the single pool worker; created on first use inside the event loop
+        self._worker_lock: Optional[asyncio.Lock] = None
+
+    def submit(self, training_data: Any) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "metrics": None,
+            "error": None
+        }
+        self.jobs[job_id] = job
+        while len(self.jobs) > self.max_jobs:
+            self.jobs.popitem(last=False)
+
+        task = asyncio.create_task(self._run(job, training_data))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: Dict[str, Any], training_data: Any) -> None:
+        loop = asyncio.get_running_loop()
+        if self._worker_lock is None:
+            self._worker_lock = asyncio.Lock()
+        try:
+            # Stay "queued" until the worker is free, so "running" means training has started
+            async with self._worker_lock:
+                job["status"] = "running"
+                job["started_at"] = time.time()
+                metrics = await loop.run_in_executor(
+                    self._pool, run_training_job, training_data, self.categorizer.model_path, self.n_jobs
+                )
+                # Unpickling is blocking too, so load the new model off the event loop
+                await loop.run_in_executor(None, self.categorizer.load_model)
+            job["metrics"] = metrics
+            job["status"] = "succeeded"
+        except Exception as e:
+            job["error"] = str(e)
+            job["status"] = "failed"
+        finally:
+            job["finished_at"] = time.time()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.jobs.get(job_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return list(reversed(self.jobs.values()))
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from typing import Any, Dict
+
+# Coefficients smaller than this are dropped from the exported model
+COEF_PRUNE_THRESHOLD = float(os.getenv("LINEAR_COEF_PRUNE_THRESHOLD", "1e-4"))
+
+
+def export_linear_model(vectorizer: TfidfVectorizer, X_text, y, path: str) -> Dict[str, Any]:
+    """
+    Fit a logistic regression on the fitted TF-IDF features and write it,
+    together with the vocabulary and idf weights, to a single .npz file.
+    """
+    features = vectorizer.transform(X_text)
+    classifier = LogisticRegression(max_iter=1000)
+    classifier.fit(features, y)
+
+    coef = classifier.coef_
+    intercept = classifier.intercept_
+    if coef.shape[0] == 1:
+        # Binary problems store one row; expand so scoring is always a softmax
+        coef = np.vstack([-coef, coef]) / 2
+        intercept = np.array([-intercept[0], intercept[0]]) / 2
+    coef = np.where(np.abs(coef) < COEF_PRUNE_THRESHOLD, 0.0, coef)
+    # Stored as (n_features, n_classes) so scoring is one sparse @ sparse product
+    weights = sparse.csc_matrix(coef.T.astype(np.float32))
+
+    terms = np.empty(len(vectorizer.vocabulary_), dtype=object)
+    for term, index in vectorizer.vocabulary_.items():
+        terms[index] = term
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz")
+    os.close(fd)
+    try:
+        np.savez(
+            tmp_path,
+            terms=terms.astype(str),
+            idf=vectorizer.idf_.astype(np.float32),
+            ngram_range=np.array(vectorizer.ngram_range),
+            stop_words=np.array(vectorizer.stop_words or ""),
+            weights_data=weights.data,
+            weights_indices=weights.indices,
+            weights_indptr=weights.indptr,
+            weights_shape=np.array(weights.shape),
+            intercept=intercept.astype(np.float32),
+            classes=np.asarray(classifier.classes_).astype(str)
+        )
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return {
+        "features": weights.shape[0],
+        "classes": weights.shape[1],
+        "nonzero_weights": int(weights.nnz)
+    }
+
+
+class LinearCategorizer:
+    """
+    Serving-only TF-IDF + logistic regression loaded from an exported .npz.
+    Exposes the `classes_` / `predict_proba(texts)` surface used by
+    TransactionCategorizer._score.
+    """
+
+    def __init__(self, path: str):
+        with np.load(path, allow_pickle=False) as artifact:
+            terms = artifact["terms"]
+            stop_words = str(artifact["stop_words"]) or None
+            self.vectorizer = TfidfVectorizer(
+                vocabulary={term: index for index, term in enumerate(terms)},
+                ngram_range=tuple(int(n) for n in artifact["ngram_range"]),
+                stop_words=stop_words,
+                dtype=np.float32
+            )
+            self.vectorizer.idf_ = artifact["idf"]
+            self.weights = sparse.csc_matrix(
+                (artifact["weights_data"], artifact["weights_indices"], artifact["weights_indptr"]),
+                shape=tuple(artifact["weights_shape"])
+            ).tocsr()
+            self.intercept = artifact["intercept"]
+            self.classes_ = artifact["classes"]
+
+    def predict_proba(self, texts) -> np.ndarray:
+        features = self.vectorizer.transform(texts)
+        logits = (features @ self.weights).toarray() + self.intercept
+        logits -= logits.max(axis=1, keepdims=True)
+        np.exp(logits, out=logits)
+        logits /= logits.sum(axis=1, keepdims=True)
+        return logits
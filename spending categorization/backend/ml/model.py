@@ -5,14 +5,49 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.pipeline import Pipeline
 import joblib
-from typing import Tuple, Dict, List
+from typing import Any, Tuple, Dict, List, Optional
 import os
+import sys
+import tempfile
+import threading
+import time
+# The memo cache is shared with the banking API's categorizer at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from models.category_cache import CategoryMemoCache
+from ml.linear import LinearCategorizer, export_linear_model
+from ml.online import OnlineTransactionCategorizer
+
+# Batches at least this large fan out across cores; smaller ones stay
+# single-threaded so they do not pay thread start-up costs
+PARALLEL_BATCH_THRESHOLD = int(os.getenv("PARALLEL_BATCH_THRESHOLD", "1000"))
+# Number of ranked categories kept per cached prediction
+MAX_TOP_K = 5
+# Memory-map the forest's arrays so every worker shares one page-cached copy
+# of the artifact; set to an empty string to load it fully into each process
+MODEL_MMAP_MODE = os.getenv("MODEL_MMAP_MODE", "r") or None
+# "forest" serves the pickled pipeline, "linear" the exported .npz model and
+# "online" the incrementally trained model fed through learn()
+SERVING_MODEL = os.getenv("CATEGORIZER_SERVING_MODEL", "forest")
+EXPORT_LINEAR_MODEL = os.getenv("EXPORT_LINEAR_MODEL", "true").lower() == "true"
+# How often learned online updates are written to disk; a crash loses at most this much
+ONLINE_SAVE_INTERVAL_SECONDS = float(os.getenv("ONLINE_SAVE_INTERVAL_SECONDS", "30"))
 
 class TransactionCategorizer:
     def __init__(self):
         self.model_pipeline = None
         self.categories = None
         self.model_path = "models/spending_categorizer.pkl"
+        self.linear_model_path = "models/spending_categorizer_linear.npz"
+        self.online_model_path = "models/spending_categorizer_online.pkl"
+        self.serving_model = SERVING_MODEL
+        # Set when the online model has updates that are not on disk yet
+        self._online_dirty = False
+        self._online_save_lock = threading.Lock()
+        # Most traffic comes from a few merchants, so memoize results per scored text
+        self.cache = CategoryMemoCache(
+            max_entries=int(os.getenv("CATEGORY_CACHE_MAX_ENTRIES", "50000")),
+            ttl_seconds=float(os.getenv("CATEGORY_CACHE_TTL_SECONDS", "3600"))
+        )
 
     def preprocess_data(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
         """
@@ -31,10 +66,12 @@ class TransactionCategorizer:
         
         return df[['description', 'amount']], df['category']
 
-    def train(self, training_data: Dict[str, List]) -> None:
+    def train(self, training_data: Dict[str, List], n_jobs: int = -1) -> Dict[str, Any]:
         """
         Train the model on the provided data
         """
+        started_at = time.perf_counter()
+
         # Convert training data to DataFrame
         df = pd.DataFrame(training_data)
         
@@ -44,8 +81,9 @@ class TransactionCategorizer:
             X, y, test_size=0.2, random_state=42
         )
 
-        # Create pipeline with TF-IDF and Random Forest
-        self.model_pipeline = Pipeline([
+        # Create pipeline with TF-IDF and Random Forest. It stays local until
+        # fitted so concurrent predictions keep using the previous model.
+        pipeline = Pipeline([
             ('tfidf', TfidfVectorizer(
                 max_features=5000,
                 ngram_range=(1, 2),
@@ -54,40 +92,221 @@ class TransactionCategorizer:
             ('classifier', RandomForestClassifier(
                 n_estimators=100,
                 random_state=42,
-                n_jobs=-1
+                n_jobs=n_jobs
             ))
         ])
 
         # Train the model
-        self.model_pipeline.fit(X_train['description'], y_train)
-        
+        pipeline.fit(X_train['description'], y_train)
+        self._prepare_for_serving(pipeline)
+
         # Save the model
-        os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
-        joblib.dump(self.model_pipeline, self.model_path)
+        self.save_model(pipeline)
+        linear_metrics = None
+        if EXPORT_LINEAR_MODEL or self.serving_model == "linear":
+            linear_metrics = export_linear_model(
+                pipeline.named_steps['tfidf'], X_train['description'], y_train, self.linear_model_path
+            )
+
+        # Swap the new model in with a single reference assignment
+        if self.serving_model == "linear":
+            self.model_pipeline = LinearCategorizer(self.linear_model_path)
+        else:
+            self.model_pipeline = pipeline
+        self.cache.clear()
 
         # Calculate and print accuracy
-        accuracy = self.model_pipeline.score(X_test['description'], y_test)
+        accuracy = pipeline.score(X_test['description'], y_test)
         print(f"Model accuracy: {accuracy:.2f}")
 
-    def predict(self, description: str, amount: float = None) -> str:
+        return {
+            "accuracy": float(accuracy),
+            "train_samples": len(X_train),
+            "test_samples": len(X_test),
+            "categories": len(self.categories),
+            "training_seconds": time.perf_counter() - started_at,
+            "linear_export": linear_metrics
+        }
+
+    def save_model(self, pipeline: Pipeline) -> None:
         """
-        Predict category for a new transaction
+        Write the model to a temp file and rename it into place, so readers
+        never load a partially written pickle. The dump is left uncompressed
+        so it can be memory-mapped; workers still mapping the old file keep
+        reading its unlinked inode until they reload.
         """
-        if self.model_pipeline is None:
-            if os.path.exists(self.model_path):
-                self.model_pipeline = joblib.load(self.model_path)
+        directory = os.path.dirname(self.model_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                joblib.dump(pipeline, f)
+            # mkstemp creates the file 0600; other worker users need to read it
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.model_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _prepare_for_serving(self, pipeline: Pipeline) -> Pipeline:
+        # With n_jobs unset, each predict call picks its own parallelism
+        # from the joblib backend context (see _score)
+        pipeline.named_steps['classifier'].set_params(n_jobs=None)
+        return pipeline
+
+    def _artifact_path(self) -> str:
+        if self.serving_model == "online":
+            return self.online_model_path
+        return self.linear_model_path if self.serving_model == "linear" else self.model_path
+
+    def _load_artifact(self):
+        if self.serving_model == "online":
+            return joblib.load(self.online_model_path)
+        if self.serving_model == "linear":
+            return LinearCategorizer(self.linear_model_path)
+        return self._prepare_for_serving(joblib.load(self.model_path, mmap_mode=MODEL_MMAP_MODE))
+
+    def _get_pipeline(self):
+        pipeline = self.model_pipeline
+        if pipeline is None:
+            if os.path.exists(self._artifact_path()):
+                pipeline = self._load_artifact()
+                self.model_pipeline = pipeline
             else:
                 raise ValueError("Model not trained yet!")
+        return pipeline
+
+    @staticmethod
+    def _text(description: str, merchant_name: Optional[str]) -> str:
+        # Match the merchant + description text the model was trained on
+        return f"{merchant_name} {description}" if merchant_name else description
+
+    def _score(self, pipeline, texts: List[str]) -> List[List[Tuple[str, float]]]:
+        """
+        One TF-IDF transform and one predict_proba call for all texts,
+        returning the MAX_TOP_K most likely categories for each.
+        """
+        if isinstance(pipeline, Pipeline):
+            features = pipeline.named_steps['tfidf'].transform(texts)
+            classifier = pipeline.named_steps['classifier']
+            n_jobs = -1 if len(texts) >= PARALLEL_BATCH_THRESHOLD else 1
+            with joblib.parallel_backend('threading', n_jobs=n_jobs):
+                probabilities = classifier.predict_proba(features)
+        else:
+            # Linear and online models vectorize the raw texts themselves
+            classifier = pipeline
+            probabilities = pipeline.predict_proba(texts)
+
+        top_indices = np.argsort(-probabilities, axis=1)[:, :MAX_TOP_K]
+        classes = classifier.classes_
+        return [
+            [(str(classes[j]), float(row[j])) for j in indices]
+            for row, indices in zip(probabilities, top_indices)
+        ]
+
+    def predict(self, description: str, amount: float = None, merchant_name: str = None) -> str:
+        """
+        Predict category for a new transaction
+        """
+        key = self._text(description, merchant_name)
+        ranked = self.cache.get(key)
+        if ranked is None:
+            generation = self.cache.generation
+            pipeline = self._get_pipeline()
+            ranked = self._score(pipeline, [key])[0]
+            self.cache.put(key, ranked, generation)
+        return ranked[0][0]
 
-        prediction = self.model_pipeline.predict([description])[0]
-        return prediction
+    def predict_batch(self, transactions: List[Dict[str, Any]], top_k: int = 3) -> List[Dict[str, Any]]:
+        """
+        Predict top-k categories with probabilities for many transactions.
+        Cache hits are answered directly; the misses are scored together.
+        """
+        top_k = max(1, min(top_k, MAX_TOP_K))
+        keys = [self._text(t.get('description', ''), t.get('merchant_name')) for t in transactions]
+        ranked: List[Optional[List[Tuple[str, float]]]] = [self.cache.get(key) for key in keys]
+
+        misses = [i for i, result in enumerate(ranked) if result is None]
+        if misses:
+            generation = self.cache.generation
+            pipeline = self._get_pipeline()
+            for i, result in zip(misses, self._score(pipeline, [keys[i] for i in misses])):
+                ranked[i] = result
+                self.cache.put(keys[i], result, generation)
+
+        return [
+            {
+                "category": result[0][0],
+                "top_categories": [
+                    {"category": category, "probability": probability}
+                    for category, probability in result[:top_k]
+                ]
+            }
+            for result in ranked
+        ]
+
+    def _get_online_model(self) -> OnlineTransactionCategorizer:
+        if self.serving_model != "online":
+            raise ValueError("Incremental learning requires CATEGORIZER_SERVING_MODEL=online")
+        model = self.model_pipeline
+        if model is None:
+            model = OnlineTransactionCategorizer.from_env()
+            self.model_pipeline = model
+        return model
+
+    def learn(self, transactions: List[Dict[str, Any]], flush: bool = False) -> Dict[str, Any]:
+        """
+        Stream labelled transactions into the online model in mini-batches
+        """
+        model = self._get_online_model()
+        examples = [
+            (self._text(t.get('description', ''), t.get('merchant_name')), t.get('category'))
+            for t in transactions
+        ]
+        applied = model.add(examples)
+        if flush:
+            applied += model.flush()
+        if applied:
+            # Cached rankings came from the model before this update
+            self.cache.clear()
+            self._online_dirty = True
+        return {"received": len(examples), "applied": applied, **model.stats()}
+
+    def save_online_model(self) -> None:
+        model = self._get_online_model()
+        if model.flush():
+            self.cache.clear()
+            self._online_dirty = True
+        self.save_online_model_if_dirty()
+
+    def save_online_model_if_dirty(self) -> bool:
+        """
+        Write the online model atomically if updates were applied since the
+        last save. Buffered rows that have not been applied are not saved.
+        """
+        with self._online_save_lock:
+            model = self.model_pipeline
+            if not self._online_dirty or not isinstance(model, OnlineTransactionCategorizer):
+                return False
+            # Cleared first, so updates applied while saving mark it dirty again
+            self._online_dirty = False
+            try:
+                model.save(self.online_model_path)
+            except Exception:
+                self._online_dirty = True
+                raise
+            return True
 
     def load_model(self) -> None:
         """
         Load a previously saved model
         """
-        if os.path.exists(self.model_path):
-            self.model_pipeline = joblib.load(self.model_path)
+        if os.path.exists(self._artifact_path()):
+            # Build the replacement fully before swapping it in
+            pipeline = self._load_artifact()
+            self.model_pipeline = pipeline
+            self.cache.clear()
         else:
             raise FileNotFoundError("No saved model found!")
 
@@ -0,0 +1,133 @@
+import os
+import tempfile
+import threading
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.naive_bayes import MultinomialNB
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_CATEGORIES = [
+    "Groceries", "Transport", "Entertainment", "Food & Drink", "Shopping",
+    "Housing", "Health & Fitness", "Bills & Utilities", "Travel", "Education"
+]
+
+
+class OnlineTransactionCategorizer:
+    """
+    Incrementally trained TF + MultinomialNB categorizer.
+
+    Features are hashed into a fixed number of columns, so there is no
+    vocabulary to refit and memory does not grow with the corpus. Labelled
+    rows are buffered and applied with partial_fit in mini-batches.
+    Exposes the `classes_` / `predict_proba(texts)` surface used by
+    TransactionCategorizer._score.
+    """
+
+    def __init__(self, categories: Optional[List[str]] = None, n_features: int = 2 ** 18, batch_size: int = 256):
+        self.categories = list(categories or DEFAULT_CATEGORIES)
+        self.batch_size = batch_size
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=(1, 2),
+            stop_words='english',
+            alternate_sign=False,
+            dtype=np.float32
+        )
+        self.classifier = MultinomialNB(alpha=0.01)
+        self.samples_seen = 0
+        self.rejected = 0
+        self._buffer: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_buffer'] = []
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def classes_(self) -> np.ndarray:
+        return self.classifier.classes_
+
+    @property
+    def is_trained(self) -> bool:
+        return self.samples_seen > 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def add(self, examples: List[Tuple[str, str]]) -> int:
+        """
+        Buffer (text, category) pairs, applying full mini-batches as they fill.
+        Returns the number of rows applied to the model.
+        """
+        applied = 0
+        with self._lock:
+            for text, category in examples:
+                if category not in self.categories:
+                    self.rejected += 1
+                    continue
+                self._buffer.append((text, category))
+                if len(self._buffer) >= self.batch_size:
+                    applied += self._apply_buffer()
+        return applied
+
+    def flush(self) -> int:
+        with self._lock:
+            return self._apply_buffer()
+
+    def _apply_buffer(self) -> int:
+        if not self._buffer:
+            return 0
+        texts, labels = zip(*self._buffer)
+        self._buffer = []
+        self.classifier.partial_fit(self.vectorizer.transform(texts), labels, classes=self.categories)
+        self.samples_seen += len(labels)
+        return len(labels)
+
+    def predict_proba(self, texts) -> np.ndarray:
+        if not self.is_trained:
+            raise ValueError("Model not trained yet!")
+        features = self.vectorizer.transform(texts)
+        with self._lock:
+            return self.classifier.predict_proba(features)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "samples_seen": self.samples_seen,
+            "pending": self.pending,
+            "rejected": self.rejected,
+            "batch_size": self.batch_size,
+            "n_features": self.vectorizer.n_features,
+            "categories": self.categories
+        }
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with self._lock:
+                with os.fdopen(fd, "wb") as f:
+                    joblib.dump(self, f)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def from_env(cls) -> "OnlineTransactionCategorizer":
+        categories = os.getenv("ONLINE_CATEGORIES")
+        return cls(
+            categories=[c.strip() for c in categories.split(",") if c.strip()] if categories else None,
+            n_features=int(os.getenv("ONLINE_N_FEATURES", str(2 ** 18))),
+            batch_size=int(os.getenv("ONLINE_BATCH_SIZE", "256"))
+        )
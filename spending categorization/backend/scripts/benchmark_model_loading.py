@@ -0,0 +1,135 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import multiprocessing
+import random
+import tempfile
+import time
+
+WORKER_COUNTS = [1, 4, 8]
+# (label, CATEGORIZER_SERVING_MODEL, MODEL_MMAP_MODE)
+CONFIGURATIONS = [
+    ("forest, full load", "forest", ""),
+    ("forest, mmap_mode='r'", "forest", "r"),
+    ("linear .npz", "linear", ""),
+]
+CATEGORIES = [
+    "Groceries", "Transport", "Entertainment", "Food & Drink", "Shopping",
+    "Housing", "Health & Fitness", "Bills & Utilities", "Travel", "Education"
+]
+
+
+def memory_kb():
+    # Pss splits shared pages between the processes mapping them, so summing
+    # it across workers gives the real memory cost of the pool
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0][:-1]] = int(parts[1])
+    return values
+
+
+def generate_training_data(n_samples, vocabulary_size):
+    rng = random.Random(42)
+    vocabulary = [f"term{i}" for i in range(vocabulary_size)]
+    per_category = vocabulary_size // len(CATEGORIES)
+    descriptions, categories = [], []
+    for _ in range(n_samples):
+        index = rng.randrange(len(CATEGORIES))
+        own_terms = vocabulary[index * per_category:(index + 1) * per_category]
+        words = rng.sample(own_terms, 3) + rng.sample(vocabulary, 3)
+        descriptions.append(" ".join(words))
+        categories.append(CATEGORIES[index])
+    return {"description": descriptions, "amount": [10.0] * n_samples, "category": categories}
+
+
+def worker(model_dir, serving_model, mmap_mode, ready, release, results):
+    os.environ["CATEGORIZER_SERVING_MODEL"] = serving_model
+    os.environ["MODEL_MMAP_MODE"] = mmap_mode
+    start = time.perf_counter()
+    from ml.model import TransactionCategorizer
+    imported = time.perf_counter()
+
+    categorizer = TransactionCategorizer()
+    categorizer.model_path = os.path.join(model_dir, "spending_categorizer.pkl")
+    categorizer.linear_model_path = os.path.join(model_dir, "spending_categorizer_linear.npz")
+    before = memory_kb()
+    categorizer.load_model()
+    categorizer.predict("term1 term2 term3")
+    loaded = time.perf_counter()
+
+    # Measure only once every worker holds its model
+    ready.wait()
+    after = memory_kb()
+    results.put({
+        "import_seconds": imported - start,
+        "load_seconds": loaded - imported,
+        "rss_kb": after["Rss"],
+        "pss_kb": after["Pss"],
+        "model_pss_kb": after["Pss"] - before["Pss"]
+    })
+    release.wait()
+
+
+def run_workers(model_dir, serving_model, mmap_mode, n_workers):
+    context = multiprocessing.get_context("spawn")
+    ready = context.Barrier(n_workers)
+    release = context.Barrier(n_workers + 1)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(model_dir, serving_model, mmap_mode, ready, release, results))
+        for _ in range(n_workers)
+    ]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    stats = [results.get() for _ in processes]
+    all_ready = time.perf_counter() - start
+    release.wait()
+    for process in processes:
+        process.join()
+    return all_ready, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Categorizer startup time and memory across uvicorn-style workers")
+    parser.add_argument("--model-dir", help="Directory holding existing artifacts; a synthetic model is trained when omitted")
+    parser.add_argument("--samples", type=int, default=20000)
+    parser.add_argument("--vocabulary", type=int, default=6000)
+    args = parser.parse_args()
+
+    model_dir = args.model_dir
+    if model_dir is None:
+        from ml.model import TransactionCategorizer
+        model_dir = tempfile.mkdtemp(prefix="categorizer-bench-")
+        categorizer = TransactionCategorizer()
+        categorizer.model_path = os.path.join(model_dir, "spending_categorizer.pkl")
+        categorizer.linear_model_path = os.path.join(model_dir, "spending_categorizer_linear.npz")
+        print(f"Training synthetic model ({args.samples} samples, {args.vocabulary} terms)...")
+        metrics = categorizer.train(generate_training_data(args.samples, args.vocabulary))
+        print(f"Trained in {metrics['training_seconds']:.1f}s\n")
+
+    for name in ("spending_categorizer.pkl", "spending_categorizer_linear.npz"):
+        path = os.path.join(model_dir, name)
+        if os.path.exists(path):
+            print(f"{name}: {os.path.getsize(path) / 1e6:.1f} MB")
+    print(f"\n{'configuration':<24} {'workers':>7} {'all ready s':>11} {'load s':>7} "
+          f"{'RSS/worker MB':>13} {'model PSS/worker MB':>19} {'total PSS MB':>12}")
+
+    for label, serving_model, mmap_mode in CONFIGURATIONS:
+        for n_workers in WORKER_COUNTS:
+            all_ready, stats = run_workers(model_dir, serving_model, mmap_mode, n_workers)
+            load = sum(s["load_seconds"] for s in stats) / n_workers
+            rss = sum(s["rss_kb"] for s in stats) / n_workers / 1024
+            model_pss = sum(s["model_pss_kb"] for s in stats) / n_workers / 1024
+            total_pss = sum(s["pss_kb"] for s in stats) / 1024
+            print(f"{label:<24} {n_workers:>7} {all_ready:>11.2f} {load:>7.3f} "
+                  f"{rss:>13.1f} {model_pss:>19.1f} {total_pss:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import importlib.util
+import pytest
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    """
+    The categorizer service's main module, loaded under its own name so it
+    does not clash with the banking API's main.py. Runs in a scratch
+    directory because model paths are relative to the working directory.
+    """
+    monkeypatch.chdir(tmp_path)
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+    spec = importlib.util.spec_from_file_location("categorizer_service", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    yield module
+    module.training_jobs.shutdown()
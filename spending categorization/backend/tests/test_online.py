@@ -0,0 +1,91 @@
+import joblib
+import pytest
+from fastapi.testclient import TestClient
+from ml.model import TransactionCategorizer
+from ml.online import OnlineTransactionCategorizer
+
+EXAMPLES = [
+    ("uber ride downtown", "Transport"),
+    ("lyft airport", "Transport"),
+    ("whole foods groceries", "Groceries"),
+    ("safeway weekly shop", "Groceries"),
+]
+
+
+def test_rows_apply_in_mini_batches():
+    model = OnlineTransactionCategorizer(batch_size=3)
+    assert model.add(EXAMPLES[:2]) == 0
+    assert model.pending == 2
+    assert model.add(EXAMPLES[2:]) == 3
+    assert model.pending == 1
+    assert model.flush() == 1
+    assert model.samples_seen == 4
+
+
+def test_unknown_categories_are_rejected():
+    model = OnlineTransactionCategorizer()
+    model.add([("mystery", "Not A Category")])
+    assert model.rejected == 1
+    assert model.pending == 0
+
+
+def test_untrained_model_refuses_to_predict():
+    with pytest.raises(ValueError):
+        OnlineTransactionCategorizer().predict_proba(["uber"])
+
+
+def test_learned_examples_drive_predictions():
+    model = OnlineTransactionCategorizer()
+    model.add(EXAMPLES * 5)
+    model.flush()
+    probabilities = model.predict_proba(["uber to work", "groceries at whole foods"])
+    predicted = [model.classes_[row.argmax()] for row in probabilities]
+    assert predicted == ["Transport", "Groceries"]
+
+
+def test_saved_model_round_trips(tmp_path):
+    model = OnlineTransactionCategorizer()
+    model.add(EXAMPLES)
+    model.flush()
+    path = str(tmp_path / "online.pkl")
+    model.save(path)
+    loaded = joblib.load(path)
+    assert loaded.samples_seen == 4
+    assert (loaded.predict_proba(["uber"]) == model.predict_proba(["uber"])).all()
+
+
+def test_learning_clears_the_cache_and_saves_only_when_dirty(tmp_path):
+    categorizer = TransactionCategorizer()
+    categorizer.serving_model = "online"
+    categorizer.online_model_path = str(tmp_path / "online.pkl")
+    rows = [{"description": text, "category": category} for text, category in EXAMPLES]
+
+    result = categorizer.learn(rows, flush=True)
+    assert result["applied"] == 4
+    categorizer.predict("uber ride")
+    generation = categorizer.cache.generation
+
+    categorizer.learn(rows, flush=True)
+    assert categorizer.cache.generation == generation + 1
+    assert categorizer.save_online_model_if_dirty()
+    assert not categorizer.save_online_model_if_dirty()
+
+
+def test_learning_requires_the_online_serving_model():
+    categorizer = TransactionCategorizer()
+    categorizer.serving_model = "forest"
+    with pytest.raises(ValueError):
+        categorizer.learn([{"description": "uber", "category": "Transport"}])
+
+
+def test_online_training_rejects_malformed_rows_with_422(service):
+    service.categorizer.serving_model = "online"
+    client = TestClient(service.app)
+
+    response = client.post("/train/", json={"transactions": [{"description": "uber"}]})
+    assert response.status_code == 422
+
+    rows = [{"description": text, "category": category} for text, category in EXAMPLES]
+    response = client.post("/train/", json={"transactions": rows})
+    assert response.status_code == 202
+    assert response.json()["applied"] == 4
@@ -0,0 +1,33 @@
+import sys
+import os
+import tempfile
+# First on the path, so `import main` is the banking API even when the
+# categorizer service's tests, which have their own main.py, run alongside
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# config.database builds its engines at import, so point them at a scratch
+# SQLite file before anything imports it. A file rather than :memory: because
+# the async engine opens its own connections.
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+os.environ.setdefault("VELOCITY_WARM_START_HOURS", "0")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+# Keep the caches and the realtime hub in-process
+os.environ.pop("REDIS_URL", None)
+os.environ.pop("REALTIME_REDIS_URL", None)
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def api():
+    """
+    TestClient for the banking API, with startup and shutdown run once for the session.
+    """
+    from fastapi.testclient import TestClient
+    from config.database import Base, engine
+    import models.database_models  # noqa: F401  registers the tables on Base
+    import main
+
+    Base.metadata.create_all(engine)
+    with TestClient(main.app) as client:
+        yield client
@@ -0,0 +1,60 @@
+import asyncio
+from app.batching import MicroBatcher
+from app.inference import InferenceExecutor
+
+
+def test_concurrent_submits_share_one_batch():
+    calls = []
+
+    def predict_batch(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(predict_batch, max_batch_size=64, max_wait_ms=5)
+        return await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+
+    assert asyncio.run(scenario()) == [i * 2 for i in range(10)]
+    assert calls == [list(range(10))]
+
+
+def test_full_batch_flushes_without_waiting_for_the_timer():
+    calls = []
+
+    def predict_batch(items):
+        calls.append(list(items))
+        return items
+
+    async def scenario():
+        # A one-minute timer would fail the test if the size limit did not flush
+        batcher = MicroBatcher(predict_batch, max_batch_size=4, max_wait_ms=60000)
+        return await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(8))), 1)
+
+    assert asyncio.run(scenario()) == list(range(8))
+    assert calls == [[0, 1, 2, 3], [4, 5, 6, 7]]
+
+
+def test_batch_error_reaches_every_caller():
+    def predict_batch(items):
+        raise RuntimeError("model down")
+
+    async def scenario():
+        batcher = MicroBatcher(predict_batch, max_wait_ms=1)
+        return await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_batches_run_on_the_executor():
+    executor = InferenceExecutor("test-batching", max_concurrency=1)
+
+    async def scenario():
+        batcher = MicroBatcher(lambda items: [item + 1 for item in items], max_wait_ms=1, executor=executor)
+        return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+    try:
+        assert asyncio.run(scenario()) == [1, 2, 3, 4, 5]
+        assert executor.stats()["completed"] == 1
+    finally:
+        executor.shutdown()
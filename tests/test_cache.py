@@ -0,0 +1,175 @@
+import asyncio
+import pytest
+from app.cache import InMemoryCacheBackend, ReadThroughCache
+
+
+def make_cache():
+    return ReadThroughCache(InMemoryCacheBackend(), prefix="test")
+
+
+def test_miss_loads_once_then_hits():
+    cache = make_cache()
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        return {"value": 1}
+
+    async def scenario():
+        first = await cache.get_or_load("k", loader, ttl=60)
+        second = await cache.get_or_load("k", loader, ttl=60)
+        return first, second
+
+    assert asyncio.run(scenario()) == ({"value": 1}, {"value": 1})
+    assert len(loads) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_concurrent_misses_share_one_load():
+    cache = make_cache()
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return [1, 2, 3]
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_load("k", loader, ttl=60) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == [[1, 2, 3]] * 5
+    assert len(loads) == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_loader_error_reaches_waiters_and_is_not_cached():
+    cache = make_cache()
+
+    async def failing_loader():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database down")
+
+    async def loader():
+        return "fresh"
+
+    async def scenario():
+        results = await asyncio.gather(
+            *(cache.get_or_load("k", failing_loader, ttl=60) for _ in range(3)),
+            return_exceptions=True
+        )
+        return results, await cache.get_or_load("k", loader, ttl=60)
+
+    results, retry = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retry == "fresh"
+
+
+def test_load_racing_an_invalidation_is_not_stored():
+    cache = make_cache()
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return len(loads)
+
+    async def scenario():
+        load = asyncio.ensure_future(cache.get_or_load("k", loader, ttl=60))
+        await asyncio.sleep(0)
+        await cache.invalidate("k")
+        stale = await load
+        return stale, await cache.get_or_load("k", loader, ttl=60)
+
+    stale, reloaded = asyncio.run(scenario())
+    assert stale == 1
+    assert reloaded == 2
+
+
+def test_cancelled_leader_does_not_strand_waiters():
+    cache = make_cache()
+    started = []
+
+    async def loader():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return "value"
+
+    async def scenario():
+        leader = asyncio.ensure_future(cache.get_or_load("k", loader, ttl=60))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(cache.get_or_load("k", loader, ttl=60))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.wait_for(waiter, 1)
+
+    assert asyncio.run(scenario()) == "value"
+    # The waiter took over the load after the leader was cancelled
+    assert len(started) == 2
+    assert cache._inflight == {}
+
+
+def test_cancelled_waiter_does_not_cancel_the_load():
+    cache = make_cache()
+
+    async def loader():
+        await asyncio.sleep(0.02)
+        return "value"
+
+    async def scenario():
+        leader = asyncio.ensure_future(cache.get_or_load("k", loader, ttl=60))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(cache.get_or_load("k", loader, ttl=60))
+        await asyncio.sleep(0.005)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return await leader
+
+    assert asyncio.run(scenario()) == "value"
+
+
+def test_misses_after_an_invalidation_do_not_join_the_older_load():
+    cache = make_cache()
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        version = len(loads)
+        await asyncio.sleep(0.02)
+        return version
+
+    async def scenario():
+        early = asyncio.ensure_future(cache.get_or_load("k", loader, ttl=60))
+        await asyncio.sleep(0)
+        joined = asyncio.ensure_future(cache.get_or_load("k", loader, ttl=60))
+        await asyncio.sleep(0)
+        await cache.invalidate("k")
+        late = asyncio.ensure_future(cache.get_or_load("k", loader, ttl=60))
+        results = await asyncio.gather(early, joined, late)
+        return results, await cache.get_or_load("k", loader, ttl=60)
+
+    (early, joined, late), cached = asyncio.run(scenario())
+    assert (early, joined) == (1, 1)
+    assert late == 2
+    # Only the load started after the invalidation was stored
+    assert cached == 2
+    assert cache._inflight == {}
+
+
+def test_invalidate_sync_drops_the_entry_and_detaches_inflight_loads():
+    cache = make_cache()
+    values = iter(["old", "new"])
+
+    async def loader():
+        await asyncio.sleep(0.01)
+        return next(values)
+
+    async def scenario():
+        await cache.get_or_load("k", loader, ttl=60)
+        cache.invalidate_sync("k")
+        return await cache.get_or_load("k", loader, ttl=60)
+
+    assert asyncio.run(scenario()) == "new"
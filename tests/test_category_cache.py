@@ -0,0 +1,68 @@
+import json
+import os
+import pytest
+from models.category_cache import CategoryMemoCache
+from models.spending_categorization import SpendingCategorizationModel
+
+
+@pytest.fixture
+def write_keywords(tmp_path, monkeypatch):
+    path = tmp_path / "keywords.json"
+    monkeypatch.setenv("MERCHANT_KEYWORDS_PATH", str(path))
+
+    def write(category_keywords):
+        path.write_text(json.dumps(category_keywords))
+        # Make sure reload_if_changed sees a new mtime even on coarse clocks
+        stat = path.stat()
+        os.utime(path, (stat.st_atime, stat.st_mtime + 1))
+    return write
+
+
+def test_lru_evicts_the_least_recently_used_entry():
+    cache = CategoryMemoCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_misses():
+    cache = CategoryMemoCache(ttl_seconds=-1)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+
+
+def test_put_from_before_a_clear_is_dropped():
+    cache = CategoryMemoCache()
+    generation = cache.generation
+    cache.clear()
+    cache.put("a", 1, generation)
+    assert cache.get("a") is None
+    assert cache.stats()["stale_puts"] == 1
+
+
+def test_cache_never_changes_the_answer(write_keywords):
+    write_keywords({"Dining": ["7-eleven"]})
+    model = SpendingCategorizationModel()
+    transactions = [{"merchant": "7-Eleven", "description": ""}, {"merchant": "Eleven", "description": ""}]
+    uncached = [model._predict_category(t)["category"] for t in transactions]
+
+    assert [model.predict_category(t)["category"] for t in transactions] == uncached
+    # Second pass is served from the cache and must agree too
+    assert [model.predict_category(t)["category"] for t in transactions] == uncached
+    assert uncached == ["Dining", "Other"]
+
+
+def test_keyword_reload_invalidates_cached_results(write_keywords):
+    write_keywords({"Dining": ["cafe"]})
+    model = SpendingCategorizationModel()
+    transaction = {"merchant": "Corner Cafe", "description": "latte"}
+    assert model.predict_category(transaction)["category"] == "Dining"
+
+    write_keywords({"Groceries": ["cafe"]})
+    assert model.reload_keywords_if_changed()
+    assert model.predict_category(transaction)["category"] == "Groceries"
+    assert model.cache.stats()["invalidations"] >= 2
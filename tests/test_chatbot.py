@@ -0,0 +1,24 @@
+from models.chatbot import BankingChatbot, IntentEngine
+
+
+def test_every_matching_intent_is_scored_best_first():
+    intents = BankingChatbot().detect_intents("Please show transactions and then help me pay the water bill")
+    assert [intent for intent, _ in intents] == ["bill_pay", "transaction_history", "help"]
+    assert all(0.5 <= score <= 1.0 for _, score in intents)
+
+
+def test_ties_keep_pattern_order():
+    engine = IntentEngine({"first": r"ab", "second": r"ab"})
+    assert engine.match("ab") == [("first", 1.0), ("second", 1.0)]
+
+
+def test_unmatched_message_is_general():
+    chatbot = BankingChatbot()
+    assert chatbot.detect_intents("nice weather today") == []
+    response = chatbot.generate_response("nice weather today")
+    assert response["intent"] == "general"
+    assert response["requires_auth"] is False
+
+
+def test_preprocessing_strips_case_and_punctuation():
+    assert BankingChatbot().detect_intent("What's my BALANCE?!") == "balance"
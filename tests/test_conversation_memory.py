@@ -0,0 +1,72 @@
+import uuid
+from models.chatbot import BankingChatbot
+from models.conversation_memory import ConversationMemory, conversation_memory
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_sessions_keep_only_their_last_turns():
+    memory = ConversationMemory(max_turns=3)
+    for i in range(5):
+        memory.append("s", "user", f"message {i}")
+    assert [turn["message"] for turn in memory.history("s")] == ["message 2", "message 3", "message 4"]
+
+
+def test_least_recently_used_session_is_evicted():
+    memory = ConversationMemory(max_sessions=2)
+    memory.append("a", "user", "hi")
+    memory.append("b", "user", "hi")
+    memory.append("a", "user", "again")
+    memory.append("c", "user", "hi")
+    assert "b" not in memory
+    assert "a" in memory and "c" in memory
+    assert memory.stats()["evicted"] == 1
+
+
+def test_idle_sessions_are_evicted():
+    clock = FakeClock()
+    memory = ConversationMemory(max_idle_seconds=60, clock=clock)
+    memory.append("old", "user", "hi")
+    clock.now = 50
+    memory.append("recent", "user", "hi")
+    clock.now = 100
+    assert memory.evict_idle() == 1
+    assert "old" not in memory and "recent" in memory
+
+
+def test_unmatched_message_follows_up_on_the_previous_question():
+    memory = ConversationMemory()
+    chatbot = BankingChatbot()
+    for message in ["Show my spending history", "and for last month?"]:
+        result = chatbot.generate_response(message, history=memory.history("s"))
+        memory.append("s", "user", message, result["intent"], result["confidence"])
+        memory.append("s", "assistant", result["response"], result["intent"], result["confidence"])
+
+    assert result["intent"] == "transaction_history"
+    assert result["follow_up"] is True
+    assert result["confidence"] == 0.5
+    # Without history the same message is a general question
+    assert chatbot.generate_response("and for last month?")["intent"] == "general"
+
+
+def test_evicted_session_resumes_from_stored_messages(api):
+    from app.routes import chat_message_writer
+
+    session_id = uuid.uuid4().hex
+    first = api.post("/api/v1/chat/message", json={"message": "How do I transfer funds?", "session_id": session_id})
+    assert first.json()["intent"] == "transfer"
+
+    # Drop the session from memory; the next message reloads it from chat_messages
+    api.portal.call(chat_message_writer.drain)
+    conversation_memory.evict_idle(max_idle_seconds=-1)
+    assert session_id not in conversation_memory
+
+    follow_up = api.post("/api/v1/chat/message", json={"message": "to my savings please", "session_id": session_id})
+    assert follow_up.json()["intent"] == "transfer"
+    assert follow_up.json()["follow_up"] is True
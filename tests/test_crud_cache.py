@@ -0,0 +1,51 @@
+import asyncio
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from config.database import Base
+from models.database_models import Account, User
+from app import crud
+from app.cache import cache
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    user = User(email="cache@example.com", hashed_password="x", full_name="Cache Test")
+    session.add(user)
+    session.commit()
+    session.add(Account(user_id=user.id, account_type="checking", account_number="CACHE-1", balance=10.0))
+    session.commit()
+    yield session
+    session.close()
+
+
+def cached(key):
+    return asyncio.run(cache.backend.get(key))
+
+
+def seed(key):
+    asyncio.run(cache.backend.set(key, "[]", 60))
+
+
+def test_sync_balance_update_invalidates_cached_accounts(db):
+    account = db.query(Account).first()
+    key = crud.accounts_cache_key(account.user_id)
+    seed(key)
+    crud.update_account_balance(db, account.id, 25.0)
+    assert cached(key) is None
+
+
+def test_sync_transaction_writes_invalidate_recent_transactions(db):
+    account = db.query(Account).first()
+    key = crud.recent_transactions_cache_key(account.user_id)
+
+    seed(key)
+    crud.create_transaction(db, account.user_id, account.id, 5.0, "debit", "Coffee", "Cafe", "Dining", "NYC")
+    assert cached(key) is None
+
+    seed(key)
+    crud.create_transactions_bulk(db, [{"user_id": account.user_id, "account_id": account.id, "amount": 7.5}])
+    assert cached(key) is None
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from models.fraud_features import AMOUNT, NUM_FEATURES, FraudFeaturePipeline
+
+
+def transaction(**overrides):
+    row = {"amount": 12.5, "timestamp": "2024-03-02T23:15:00", "transaction_type": "debit", "merchant": "Cafe", "location": "NYC"}
+    row.update(overrides)
+    return row
+
+
+def test_transform_shape_and_amount():
+    features = FraudFeaturePipeline().transform([transaction(), transaction(amount="$1,200.50")])
+    assert features.shape == (2, NUM_FEATURES)
+    assert features.dtype == np.float32
+    assert features[:, AMOUNT].tolist() == pytest.approx([12.5, 1200.5])
+
+
+@pytest.mark.parametrize("amount", [float("nan"), float("inf"), float("-inf"), "nan", "inf", "-Infinity", "1e999"])
+def test_non_finite_amounts_become_zero(amount):
+    features = FraudFeaturePipeline().transform([transaction(amount=amount)])
+    assert np.isfinite(features).all()
+    assert features[0, AMOUNT] == 0.0
+
+
+@pytest.mark.parametrize("overrides", [
+    {"amount": "twelve"},
+    {"timestamp": "not a date"},
+    {"timestamp": float("nan")},
+    {"timestamp": 1e300},
+    {"merchant": ["unhashable"]},
+])
+def test_malformed_fields_fall_back_instead_of_raising(overrides):
+    features = FraudFeaturePipeline().transform([transaction(**overrides)])
+    assert np.isfinite(features).all()
@@ -0,0 +1,110 @@
+import asyncio
+import json
+from app.fraud_stream import FraudStreamSession
+from app.inference import InferenceQueueFull
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+def frame(*ids):
+    return json.dumps({"items": [{"id": i, "transaction": {"amount": 1.0}} for i in ids]})
+
+
+async def score(transactions):
+    return [{"risk_score": 0.1} for _ in transactions]
+
+
+def test_results_return_the_credit_they_used():
+    websocket = FakeWebSocket()
+
+    async def scenario():
+        session = FraudStreamSession(websocket, score, window=4, max_batch_size=2, max_wait_ms=1)
+        await session._receive(frame("a", "b", "c"))
+        assert session.outstanding == 3
+        await asyncio.sleep(0.05)
+        return session
+
+    session = asyncio.run(scenario())
+    results = [message for message in websocket.sent if message["type"] == "results"]
+    assert sorted(r["id"] for message in results for r in message["results"]) == ["a", "b", "c"]
+    assert sum(message["credit"] for message in results) == 3
+    assert session.outstanding == 0
+    assert session.scored == 3
+
+
+def test_items_beyond_the_window_are_rejected_without_credit():
+    websocket = FakeWebSocket()
+
+    async def scenario():
+        session = FraudStreamSession(websocket, score, window=2, max_batch_size=10, max_wait_ms=1)
+        await session._receive(frame("a", "b", "c"))
+        rejected = [message for message in websocket.sent if message["type"] == "error"]
+        await asyncio.sleep(0.05)
+        return session, rejected
+
+    session, rejected = asyncio.run(scenario())
+    assert rejected == [{"type": "error", "errors": [{"id": "c", "error": "credit_exceeded"}], "credit": 0}]
+    assert session.outstanding == 0
+
+
+def test_invalid_items_and_frames_hold_no_credit():
+    websocket = FakeWebSocket()
+
+    async def scenario():
+        session = FraudStreamSession(websocket, score, window=2, max_wait_ms=1)
+        await session._receive(json.dumps({"items": [{"id": "a"}, {"transaction": {}}]}))
+        await session._receive("not json")
+        await session._receive(json.dumps({"items": {"id": "a"}}))
+        return session
+
+    session = asyncio.run(scenario())
+    assert session.outstanding == 0
+    assert [message["credit"] for message in websocket.sent] == [0, 0, 0]
+    assert websocket.sent[0]["errors"] == [{"id": "a", "error": "invalid_item"}, {"id": None, "error": "invalid_item"}]
+    assert websocket.sent[1]["errors"] == [{"id": None, "error": "invalid_frame"}]
+    assert websocket.sent[2]["errors"] == [{"id": None, "error": "invalid_frame"}]
+
+
+def test_failed_batches_return_their_credit():
+    websocket = FakeWebSocket()
+
+    async def overloaded(transactions):
+        raise InferenceQueueFull("full")
+
+    async def broken(transactions):
+        raise RuntimeError("internal detail")
+
+    async def scenario():
+        for score_batch in (overloaded, broken):
+            session = FraudStreamSession(websocket, score_batch, window=4, max_wait_ms=1)
+            await session._receive(frame("a", "b"))
+            await asyncio.sleep(0.05)
+            assert session.outstanding == 0
+
+    asyncio.run(scenario())
+    assert websocket.sent == [
+        {"type": "error", "errors": [{"id": "a", "error": "overloaded"}, {"id": "b", "error": "overloaded"}], "credit": 2},
+        {"type": "error", "errors": [{"id": "a", "error": "scoring_failed"}, {"id": "b", "error": "scoring_failed"}], "credit": 2}
+    ]
+
+
+def test_credit_is_reusable_once_returned():
+    websocket = FakeWebSocket()
+
+    async def scenario():
+        session = FraudStreamSession(websocket, score, window=1, max_wait_ms=1)
+        await session._receive(frame("a"))
+        await asyncio.sleep(0.05)
+        await session._receive(frame("b"))
+        await asyncio.sleep(0.05)
+        return session
+
+    session = asyncio.run(scenario())
+    assert [message["type"] for message in websocket.sent] == ["results", "results"]
+    assert session.outstanding == 0
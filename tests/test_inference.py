@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import pytest
+from app.inference import InferenceExecutor, InferenceQueueFull
+
+
+@pytest.fixture
+def executor():
+    executor = InferenceExecutor("test", max_concurrency=1, max_queue_depth=1)
+    yield executor
+    executor.shutdown()
+
+
+def test_run_returns_result_off_the_event_loop(executor):
+    async def scenario():
+        return await executor.run(lambda: threading.current_thread().name)
+
+    assert asyncio.run(scenario()).startswith("inference-test")
+    stats = executor.stats()
+    assert stats["submitted"] == stats["completed"] == 1
+    assert stats["running"] == stats["queued"] == 0
+
+
+def test_calls_beyond_concurrency_and_queue_depth_are_rejected(executor):
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(InferenceQueueFull):
+            await executor.run(release.wait)
+        stats = executor.stats()
+        release.set()
+        await asyncio.gather(running, queued)
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert stats["running"] == 1
+    assert stats["queued"] == 1
+    assert stats["rejected"] == 1
+    assert executor.stats()["completed"] == 2
+
+
+def test_failures_are_counted_and_free_their_slot(executor):
+    def fail():
+        raise ValueError("bad input")
+
+    async def scenario():
+        with pytest.raises(ValueError):
+            await executor.run(fail)
+        return await executor.run(lambda: "ok")
+
+    assert asyncio.run(scenario()) == "ok"
+    stats = executor.stats()
+    assert stats["failed"] == 1
+    assert stats["completed"] == 1
+    assert stats["queued"] == 0
+
+
+def test_call_cancelled_while_queued_releases_its_slot(executor):
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        stats = executor.stats()
+        release.set()
+        await running
+        # The freed slot admits new calls again
+        await executor.run(lambda: None)
+        await executor.run(lambda: None)
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert stats["queued"] == 0
+    assert stats["running"] == 1
+    assert executor.stats()["queued"] == 0
+    assert executor.stats()["rejected"] == 0
@@ -0,0 +1,64 @@
+import re
+from config.metrics import Registry, stats_families
+
+
+def sample(text, name, labels=""):
+    match = re.search(rf"^{re.escape(name + labels)} (\S+)$", text, re.M)
+    return float(match.group(1)) if match else None
+
+
+def test_counter_renders_labelled_series():
+    registry = Registry()
+    counter = registry.counter("jobs_total", "Jobs", ("queue",))
+    counter.inc("a")
+    counter.inc("a", amount=2)
+    counter.inc('we"ird')
+    text = registry.render()
+    assert "# TYPE jobs_total counter" in text
+    assert sample(text, "jobs_total", '{queue="a"}') == 3.0
+    assert sample(text, "jobs_total", '{queue="we\\"ird"}') == 1.0
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "/x")
+    text = registry.render()
+    assert sample(text, "latency_seconds_bucket", '{route="/x",le="0.1"}') == 1
+    assert sample(text, "latency_seconds_bucket", '{route="/x",le="1.0"}') == 2
+    assert sample(text, "latency_seconds_bucket", '{route="/x",le="+Inf"}') == 3
+    assert sample(text, "latency_seconds_count", '{route="/x"}') == 3
+    assert sample(text, "latency_seconds_sum", '{route="/x"}') == 5.55
+
+
+def test_stats_families_split_gauges_and_counters():
+    families = stats_families("queue", "Queue", {"chat": {"queued": 4, "written": 10, "name": "chat"}}, "queue",
+                              gauges={"queued": "rows waiting"}, counters={"written": "rows written"})
+    assert families == [
+        ("queue_queued", "gauge", "Queue: rows waiting", [({"queue": "chat"}, 4)]),
+        ("queue_written_total", "counter", "Queue: rows written", [({"queue": "chat"}, 10)]),
+    ]
+
+
+def test_failing_collector_does_not_break_the_scrape():
+    registry = Registry()
+    registry.counter("ok_total", "Fine").inc()
+
+    def broken():
+        raise RuntimeError("stats unavailable")
+
+    registry.register_collector(broken)
+    assert sample(registry.render(), "ok_total") == 1.0
+
+
+def test_metrics_endpoint_labels_routes_by_template(api):
+    for session_id in ("metrics-a", "metrics-b"):
+        api.get(f"/api/v1/chat/sessions/{session_id}/messages")
+    text = api.get("/metrics").text
+
+    assert 'route="/api/v1/chat/sessions/{session_id}/messages"' in text
+    assert "metrics-a" not in text
+    assert "# TYPE model_inference_seconds histogram" in text
+    # Running totals from the stats() collectors are exported as counters
+    assert "# TYPE write_behind_written_total counter" in text
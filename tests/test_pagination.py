@@ -0,0 +1,64 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from config.database import Base
+from models.database_models import Transaction
+from app.crud import get_user_transactions_page
+from app.pagination import decode_cursor, encode_cursor, next_cursor
+
+Row = namedtuple("Row", "id timestamp")
+
+
+def test_cursor_round_trip():
+    timestamp = datetime(2024, 3, 1, 12, 30, 15, 123456)
+    cursor = encode_cursor(timestamp, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (timestamp, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(datetime(2024, 1, 1), 1)[:-3], "e30"])
+def test_malformed_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_next_cursor_points_at_the_last_row_of_the_page():
+    now = datetime(2024, 1, 1)
+    rows = [Row(i, now - timedelta(minutes=i)) for i in range(4)]
+    page, cursor = next_cursor(rows, 3)
+    assert page == rows[:3]
+    assert decode_cursor(cursor) == (rows[2].timestamp, 2)
+
+
+def test_last_page_has_no_cursor():
+    rows = [Row(1, datetime(2024, 1, 1))]
+    assert next_cursor(rows, 1) == (rows, None)
+
+
+def test_page_walk_covers_every_row_once_with_tied_timestamps():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    start = datetime(2024, 1, 1)
+    # Three rows per timestamp, so page boundaries fall inside ties
+    db.add_all(
+        Transaction(user_id=1, amount=float(i), timestamp=start + timedelta(minutes=i // 3))
+        for i in range(20)
+    )
+    db.add(Transaction(user_id=2, amount=0.0, timestamp=start))
+    db.commit()
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = get_user_transactions_page(db, 1, limit=4, cursor=cursor)
+        seen.extend(page)
+        if cursor is None:
+            break
+    db.close()
+
+    assert len(seen) == 20
+    assert len({row.id for row in seen}) == 20
+    keys = [(row.timestamp, row.id) for row in seen]
+    assert keys == sorted(keys, reverse=True)
@@ -0,0 +1,123 @@
+import asyncio
+import pytest
+from app.realtime import SLOW_CONSUMER_CLOSE_CODE, ConnectionHub, LocalPubSub
+from app.security import create_access_token
+
+
+class FakeWebSocket:
+    def __init__(self, block=False):
+        self.sent = []
+        self.closed_with = None
+        self.block = block
+
+    async def send_text(self, text):
+        if self.block:
+            await asyncio.Event().wait()
+        self.sent.append(text)
+
+    async def close(self, code):
+        self.closed_with = code
+
+
+def test_events_reach_only_the_addressed_users_connections():
+    async def scenario():
+        hub = ConnectionHub()
+        await hub.start()
+        mine, other = FakeWebSocket(), FakeWebSocket()
+        hub.connect(mine, 1)
+        hub.connect(other, 2)
+        await hub.publish(1, "balance_updated", {"balance": 10})
+        await asyncio.sleep(0)
+        await hub.stop()
+        return mine, other
+
+    mine, other = asyncio.run(scenario())
+    assert len(mine.sent) == 1 and '"balance_updated"' in mine.sent[0]
+    assert other.sent == []
+
+
+def test_hubs_sharing_a_pubsub_fan_out_across_workers():
+    async def scenario():
+        pubsub = LocalPubSub()
+        first, second = ConnectionHub(pubsub), ConnectionHub(pubsub)
+        await first.start()
+        await second.start()
+        websocket = FakeWebSocket()
+        second.connect(websocket, "7")
+        await first.publish(7, "fraud_alert", {})
+        await asyncio.sleep(0)
+        return websocket
+
+    assert len(asyncio.run(scenario()).sent) == 1
+
+
+def test_connections_per_user_are_capped():
+    hub = ConnectionHub(max_connections_per_user=1)
+    assert hub.connect(FakeWebSocket(), 1) is not None
+    assert hub.connect(FakeWebSocket(), 1) is None
+    assert hub.connect(FakeWebSocket(), 2) is not None
+
+
+def test_slow_consumer_is_disconnected_instead_of_buffering():
+    async def scenario():
+        hub = ConnectionHub(max_queue_size=2)
+        await hub.start()
+        websocket = FakeWebSocket(block=True)
+        connection = hub.connect(websocket, 1)
+        for _ in range(5):
+            await hub.publish(1, "transaction_created", {})
+        await asyncio.sleep(0)
+        await hub.stop()
+        return hub, connection, websocket
+
+    hub, connection, websocket = asyncio.run(scenario())
+    assert connection.closed
+    assert hub.slow_consumers == 1
+    assert websocket.closed_with == SLOW_CONSUMER_CLOSE_CODE
+    assert hub.stats()["connections"] == 0
+
+
+def test_websocket_without_a_valid_token_is_closed(api):
+    from starlette.websockets import WebSocketDisconnect
+
+    for url in ["/ws", "/ws?token=not-a-jwt"]:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            with api.websocket_connect(url) as websocket:
+                websocket.receive_text()
+        assert closed.value.code == 1008
+
+
+def bulk_rows(user_id, count=2):
+    return [{"user_id": user_id, "account_id": 1, "amount": 25.0, "category": "Other"} for _ in range(count)]
+
+
+def test_bulk_ingest_requires_a_token_for_the_rows_owner(api):
+    response = api.post("/api/v1/transactions/bulk", json=bulk_rows(1))
+    assert response.status_code == 401
+
+    headers = {"Authorization": f"Bearer {create_access_token(1)}"}
+    response = api.post("/api/v1/transactions/bulk", json=bulk_rows(1) + bulk_rows(2, 1), headers=headers)
+    assert response.status_code == 403
+
+
+def test_bulk_ingest_alerts_only_the_token_user(api, monkeypatch):
+    from app import routes
+
+    def flag_everything(transactions):
+        return [{"risk_score": 0.99, "is_fraudulent": True} for _ in transactions]
+
+    monkeypatch.setattr(routes.fraud_model, "predict_batch", flag_everything)
+    headers = {"Authorization": f"Bearer {create_access_token(101)}"}
+
+    with api.websocket_connect(f"/ws?token={create_access_token(101)}") as owner, \
+            api.websocket_connect(f"/ws?token={create_access_token(202)}") as bystander:
+        response = api.post("/api/v1/transactions/bulk", json=bulk_rows(101), headers=headers)
+        assert response.status_code == 200
+        assert response.json()["flagged_fraudulent"] == 2
+
+        events = [owner.receive_json()["type"] for _ in range(3)]
+        assert sorted(events) == ["fraud_alert", "fraud_alert", "transactions_created"]
+
+        # Events are delivered in order, so a pong first means nothing was queued for this user
+        bystander.send_text("ping")
+        assert bystander.receive_json() == {"type": "pong"}
@@ -0,0 +1,59 @@
+from datetime import date, datetime, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from config.database import Base
+from models.database_models import DailyCategoryRollup, Transaction
+from app import crud
+from app.rollups import DEFAULT_CATEGORY, insights_from_rows, rollup_deltas
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_deltas_collapse_rows_per_user_day_and_category():
+    rows = [
+        {"user_id": 1, "timestamp": datetime(2024, 1, 1, 9), "category": "Dining", "amount": 10.0},
+        {"user_id": 1, "timestamp": datetime(2024, 1, 1, 21), "category": "Dining", "amount": 5.0},
+        {"user_id": 1, "timestamp": datetime(2024, 1, 2, 9), "category": "Dining", "amount": 1.0},
+        {"user_id": 2, "timestamp": datetime(2024, 1, 1, 9), "category": None, "amount": 3.0},
+    ]
+    deltas = {(d["user_id"], d["day"], d["category"]): (d["total_amount"], d["transaction_count"]) for d in rollup_deltas(rows)}
+    assert deltas == {
+        (1, date(2024, 1, 1), "Dining"): (15.0, 2),
+        (1, date(2024, 1, 2), "Dining"): (1.0, 1),
+        (2, date(2024, 1, 1), DEFAULT_CATEGORY): (3.0, 1),
+    }
+
+
+def test_insights_from_rows_totals_every_category():
+    insights = insights_from_rows([("Dining", 15.0, 2), ("Travel", None, None)])
+    assert insights == {
+        "category_totals": {"Dining": 15.0, "Travel": 0.0},
+        "category_counts": {"Dining": 2, "Travel": 0},
+        "total_spending": 15.0,
+        "transaction_count": 2,
+    }
+
+
+def test_writes_keep_the_rollup_equal_to_the_transactions(db):
+    crud.create_transaction(db, 1, 1, 12.0, "debit", "Lunch", "Cafe", "Dining", "NYC")
+    crud.create_transactions_bulk(db, [
+        {"user_id": 1, "account_id": 1, "amount": 8.0, "category": "Dining"},
+        {"user_id": 1, "account_id": 1, "amount": 40.0, "category": "Travel"},
+        {"user_id": 2, "account_id": 2, "amount": 99.0, "category": "Dining"},
+    ])
+
+    # Upserts add onto the existing (user, day, category) row instead of duplicating it
+    assert db.query(DailyCategoryRollup).count() == 3
+    today = datetime.utcnow().date()
+    insights = crud.get_spending_insights_range(db, 1, today - timedelta(days=1), today)
+    assert insights["category_totals"] == {"Dining": 20.0, "Travel": 40.0}
+    assert insights["category_counts"] == {"Dining": 2, "Travel": 1}
+    assert insights["transaction_count"] == db.query(Transaction).filter(Transaction.user_id == 1).count()
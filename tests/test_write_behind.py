@@ -0,0 +1,130 @@
+import asyncio
+import pytest
+from app.write_behind import WriteBehindQueue
+
+
+def test_rows_are_written_in_order_in_bounded_batches():
+    batches = []
+
+    async def write_batch(rows):
+        batches.append(list(rows))
+
+    async def scenario():
+        queue = WriteBehindQueue(write_batch, max_batch_size=3, flush_interval_ms=5)
+        await queue.put_many(list(range(7)))
+        await queue.shutdown()
+        return queue.stats()
+
+    stats = asyncio.run(scenario())
+    assert [row for batch in batches for row in batch] == list(range(7))
+    assert all(len(batch) <= 3 for batch in batches)
+    assert stats["written"] == 7
+    assert stats["dropped"] == 0
+
+
+def test_durable_put_waits_for_the_write():
+    written = []
+
+    async def write_batch(rows):
+        await asyncio.sleep(0.01)
+        written.extend(rows)
+
+    async def scenario():
+        queue = WriteBehindQueue(write_batch, flush_interval_ms=1, durable=True)
+        await queue.put("row")
+        seen = list(written)
+        await queue.shutdown()
+        return seen
+
+    assert asyncio.run(scenario()) == ["row"]
+
+
+def test_failed_batches_are_retried():
+    attempts = []
+
+    async def write_batch(rows):
+        attempts.append(list(rows))
+        if len(attempts) == 1:
+            raise RuntimeError("deadlock")
+
+    async def scenario():
+        queue = WriteBehindQueue(write_batch, flush_interval_ms=1, max_retries=2)
+        await queue.put("row")
+        await queue.drain()
+        await queue.shutdown()
+        return queue.stats()
+
+    stats = asyncio.run(scenario())
+    assert attempts == [["row"], ["row"]]
+    assert stats["retries"] == 1
+    assert stats["written"] == 1
+
+
+def test_durable_put_raises_once_retries_are_exhausted():
+    async def write_batch(rows):
+        raise RuntimeError("disk full")
+
+    async def scenario():
+        queue = WriteBehindQueue(write_batch, flush_interval_ms=1, max_retries=0, durable=True)
+        with pytest.raises(RuntimeError, match="disk full"):
+            await queue.put("row")
+        await queue.shutdown()
+        return queue.stats()
+
+    assert asyncio.run(scenario())["dropped"] == 1
+
+
+def test_put_after_shutdown_is_refused():
+    async def write_batch(rows):
+        pass
+
+    async def scenario():
+        queue = WriteBehindQueue(write_batch)
+        await queue.put("row")
+        await queue.shutdown()
+        with pytest.raises(RuntimeError):
+            await queue.put("late")
+        return queue.stats()
+
+    assert asyncio.run(scenario())["written"] == 1
+
+
+def test_full_queue_pushes_back_on_put():
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def write_batch(rows):
+            await gate.wait()
+
+        queue = WriteBehindQueue(write_batch, max_batch_size=1, flush_interval_ms=0, max_queue_size=1)
+        await queue.put("first")
+        await asyncio.sleep(0.01)
+        # The worker holds "first"; "second" fills the queue, so "third" has to wait
+        await queue.put("second")
+        third = asyncio.ensure_future(queue.put("third"))
+        await asyncio.sleep(0.01)
+        blocked = not third.done()
+        gate.set()
+        await third
+        await queue.shutdown()
+        return blocked, queue.stats()
+
+    blocked, stats = asyncio.run(scenario())
+    assert blocked
+    assert stats["written"] == 3
+
+
+def test_chat_turns_are_persisted_in_order(api):
+    from app.routes import chat_message_writer
+
+    session_id = "write-behind-order"
+    for message in ["What's my balance?", "Help please"]:
+        assert api.post("/api/v1/chat/message", json={"message": message, "session_id": session_id}).status_code == 200
+    api.portal.call(chat_message_writer.drain)
+
+    items = api.get(f"/api/v1/chat/sessions/{session_id}/messages").json()["items"]
+    assert [(item["role"], item["intent"]) for item in items] == [
+        ("user", "balance"), ("assistant", "balance"), ("user", "help"), ("assistant", "help")
+    ]
+    assert items[0]["message"] == "What's my balance?"
+    assert chat_message_writer.stats()["dropped"] == 0